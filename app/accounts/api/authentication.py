@@ -0,0 +1,82 @@
+# Django
+from django.utils.translation import gettext_lazy as _
+
+# Django REST Framework
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Tokens
+from app.accounts.api.tokens import (
+    BUSINESS_ID_CLAIM, BUSINESS_ROLE_ID_CLAIM, PERMISSIONS_VERSION_CLAIM, get_permissions_version
+)
+
+# Services
+from app.accounts.services.user_cache_service import UserCacheService
+
+
+class BusinessJWTAuthentication(JWTAuthentication):
+    """
+    Autenticación JWT que reutiliza el token ya validado por BusinessMiddleware.
+
+    El usuario se carga desde UserCacheService con su negocio, rol y permisos.
+    Si el negocio, el rol o la versión de permisos del rol ya no coinciden con
+    los actuales, el token se rechaza para que el cliente lo refresque (el
+    refresh emite los claims actualizados).
+    """
+
+    def authenticate(self, request):
+        validated_token = getattr(request._request, 'jwt_token', None)
+        if validated_token is None:
+            result = super().authenticate(request)
+            if result is None:
+                return None
+            user, validated_token = result
+        else:
+            user = self.get_user(validated_token)
+
+        self.check_business_claims(user, validated_token)
+        return user, validated_token
+
+    @staticmethod
+    def check_business_claims(user, validated_token):
+        """
+        Comprueba que los claims del negocio del token siguen vigentes.
+
+        BusinessMiddleware enruta la petición con el business_id del token, así
+        que un token desactualizado no puede usarse.
+
+        Raises:
+            AuthenticationFailed: Si el negocio, el rol o los permisos cambiaron
+        """
+        stale = (
+            validated_token.get(BUSINESS_ID_CLAIM) != user.business_id
+            or validated_token.get(BUSINESS_ROLE_ID_CLAIM) != user.business_role_id
+            or validated_token.get(PERMISSIONS_VERSION_CLAIM)
+            != get_permissions_version(user.business_id, user.business_role_id)
+        )
+        if stale:
+            raise AuthenticationFailed(
+                _("Los permisos del usuario cambiaron; refresque el token"), code="permissions_changed"
+            )
+
+    def get_user(self, validated_token):
+        """Obtiene el usuario del token desde la caché de usuarios autenticados"""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = UserCacheService.get_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
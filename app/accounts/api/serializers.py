@@ -1,5 +1,7 @@
 # Django REST Framework
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 
 # Django
 from django.contrib.auth import authenticate
@@ -9,6 +11,9 @@ from app.business.models.business import Business
 from app.accounts.models.user import CustomUser
 from app.roles.models.role import BusinessRole
 
+# Tokens
+from app.accounts.api.tokens import BusinessRefreshToken
+
 
 class UserSerializer(serializers.ModelSerializer):
     business_role = serializers.PrimaryKeyRelatedField(
@@ -132,4 +137,24 @@ class LoginSerializer(serializers.Serializer):
         if not user:
             raise serializers.ValidationError("Credenciales inválidas")
         
-        return {"user": user}
\ No newline at end of file
+        return {"user": user}
+
+
+class BusinessTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Emite tokens con los claims del negocio del usuario"""
+    token_class = BusinessRefreshToken
+
+
+class BusinessTokenRefreshSerializer(TokenRefreshSerializer):
+    """Al refrescar, actualiza los claims con el negocio y rol actuales del usuario"""
+    token_class = BusinessRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = CustomUser.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user:
+            refresh.set_business_claims(user)
+            attrs["refresh"] = str(refresh)
+        return super().validate(attrs)
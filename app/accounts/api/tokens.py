@@ -0,0 +1,45 @@
+# Django REST Framework
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Services
+from app.roles.services.permission_cache_service import RolePermissionCache
+
+
+# Claims propios que permiten resolver el negocio sin consultar la base de datos
+BUSINESS_ID_CLAIM = 'business_id'
+BUSINESS_ROLE_ID_CLAIM = 'business_role_id'
+PERMISSIONS_VERSION_CLAIM = 'perm_version'
+
+
+def get_permissions_version(business_id, business_role_id=None):
+    """
+    Versión de los permisos del rol del usuario (BusinessRole.permissions_version).
+
+    Cambia con cualquier modificación del rol o de sus permisos;
+    BusinessJWTAuthentication rechaza los tokens emitidos con otra versión.
+
+    Returns:
+        int: Versión de los permisos o 0 si el usuario no tiene negocio o rol
+    """
+    if not business_id or not business_role_id:
+        return 0
+    return RolePermissionCache.get_role_version(business_id, business_role_id)
+
+
+class BusinessRefreshToken(RefreshToken):
+    """
+    Refresh token que incluye el negocio, el rol y la versión de permisos del usuario.
+    Los claims se copian al access token que se genera a partir de él.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_business_claims(user)
+        return token
+
+    def set_business_claims(self, user):
+        """Actualiza los claims del negocio con los datos actuales del usuario"""
+        self[BUSINESS_ID_CLAIM] = user.business_id
+        self[BUSINESS_ROLE_ID_CLAIM] = user.business_role_id
+        self[PERMISSIONS_VERSION_CLAIM] = get_permissions_version(user.business_id, user.business_role_id)
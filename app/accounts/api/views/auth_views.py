@@ -1,7 +1,6 @@
 # API views for managing user authentication, business roles, and permissions.
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 # Models    
@@ -11,6 +10,9 @@ from app.accounts.models.user import CustomUser
 # Serializers
 from app.accounts.api.serializers import UserSerializer
 
+# Tokens
+from app.accounts.api.tokens import BusinessRefreshToken
+
 # Validators
 import logging
 
@@ -27,7 +29,7 @@ class RegisterUserView(generics.CreateAPIView):
         user = serializer.save()
         print(user)
         
-        refresh = RefreshToken.for_user(user)
+        refresh = BusinessRefreshToken.for_user(user)
         
         access_token = str(refresh.access_token)
 
@@ -46,7 +48,7 @@ class CustomLoginView(TokenObtainPairView):
         user = CustomUser.objects.filter(email=identifier).first() or CustomUser.objects.filter(username=identifier).first()
 
         if user and user.check_password(password):
-            refresh = RefreshToken.for_user(user)
+            refresh = BusinessRefreshToken.for_user(user)
             return Response({
                 "access": str(refresh.access_token),
                 "refresh": str(refresh),
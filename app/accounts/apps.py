@@ -6,5 +6,9 @@ class AuthAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.accounts'
     verbose_name = 'Usuarios y Negocios'
+
+    def ready(self):
+        # Invalidación de la caché de usuarios autenticados
+        import app.accounts.signals
     
     
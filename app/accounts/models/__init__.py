@@ -1,6 +1,8 @@
 # Importar los modelos para que sean accesibles desde app.auth_app.models
 from app.accounts.models.user import CustomUser
 from app.business.models.business import Business, BusinessJoinRequest, BusinessInvitation
+from app.business.models.tenant import TenantDatabase, TenantRegistryChange, TenantArchive, TenantTombstone, TenantStorageMetrics
+from app.business.models.provisioning import ProvisioningJob
 from app.roles.models.role import BusinessRole, RolePermission
 
 # Para mantener compatibilidad con el código existente
@@ -10,5 +12,11 @@ __all__ = [
     'BusinessRole', 
     'RolePermission',
     'BusinessJoinRequest',
-    'BusinessInvitation'
+    'BusinessInvitation',
+    'TenantDatabase',
+    'TenantRegistryChange',
+    'TenantArchive',
+    'TenantTombstone',
+    'TenantStorageMetrics',
+    'ProvisioningJob'
 ]
\ No newline at end of file
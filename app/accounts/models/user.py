@@ -3,6 +3,9 @@ from django.contrib.auth.models import AbstractUser, Permission
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+# Models
+from app.roles.models.role import RolePermission
+
 
 
 class CustomUser(AbstractUser):  
@@ -85,24 +88,39 @@ class CustomUser(AbstractUser):
         Returns:
             bool: True si tiene el permiso, False en caso contrario
         """
+        return self.has_business_permissions(permission_name)
+    
+    def has_business_permissions(self, *permission_names):
+        """
+        Verifica con una sola operación de bits si el usuario tiene todos los permisos indicados.
+        
+        Args:
+            *permission_names (str): Nombres de los permisos a verificar
+            
+        Returns:
+            bool: True si tiene todos los permisos, False en caso contrario
+        """
         # El superusuario siempre tiene todos los permisos
         if self.is_superuser:
             return True
             
-        # Si no tiene negocio o rol, no tiene permisos específicos
-        if not self.business or not self.business_role:
-            return False
+        return RolePermission.bits_have_all(self.get_business_permission_bits(), *permission_names)
+    
+    def get_business_permission_bits(self):
+        """
+        Máscara de bits con los permisos efectivos del usuario en su negocio.
+        
+        Returns:
+            int: Máscara de permisos (ver RolePermission.PERMISSION_BITS)
+        """
+        if self.is_superuser:
+            return RolePermission.ALL_PERMISSIONS
             
-        # Los administradores tienen todos los permisos en su negocio
-        if self.business_role.name.lower() in ['admin']:
-            return True
+        # Si no tiene negocio o rol, no tiene permisos específicos
+        if not self.business_id or not self.business_role_id:
+            return 0
             
-        # Para otros roles, verificar el permiso específico
-        try:
-            permissions = self.business_role.role_permissions
-            if not permissions:
-                return False
-            return getattr(permissions, permission_name, False)
-        except (AttributeError, Exception):
-            return False
+        # Máscara del rol desde la caché compartida (los administradores tienen todos los permisos)
+        from app.roles.services.permission_cache_service import RolePermissionCache
+        return RolePermissionCache.get_role_bits(self.business_id, self.business_role_id)
         
\ No newline at end of file
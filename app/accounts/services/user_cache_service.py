@@ -0,0 +1,66 @@
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# Models
+from app.accounts.models.user import CustomUser
+
+# Management
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UserCacheService:
+    """
+    Caché de corta duración de los usuarios autenticados.
+
+    El usuario se guarda con su negocio, su rol y los permisos del rol ya cargados,
+    así una petición con la caché caliente se autentica sin consultas.
+    """
+
+    KEY_PREFIX = 'auth_user'
+
+    @staticmethod
+    def get_timeout():
+        """Segundos que un usuario permanece en caché"""
+        return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+    @classmethod
+    def get_key(cls, user_id):
+        return f"{cls.KEY_PREFIX}:{user_id}"
+
+    @classmethod
+    def get_user(cls, user_id):
+        """
+        Obtiene un usuario desde la caché o desde la base de datos.
+
+        Args:
+            user_id (int): ID del usuario
+
+        Returns:
+            CustomUser: Usuario con business, business_role y role_permissions cargados, o None
+        """
+        key = cls.get_key(user_id)
+        user = cache.get(key)
+        if user is not None:
+            return user
+
+        user = CustomUser.objects.select_related(
+            'business', 'business_role__role_permissions'
+        ).filter(pk=user_id).first()
+        if user is not None:
+            cache.set(key, user, cls.get_timeout())
+        return user
+
+    @classmethod
+    def invalidate(cls, user_ids):
+        """
+        Elimina de la caché a los usuarios indicados.
+
+        Args:
+            user_ids (Iterable[int]): IDs de los usuarios a invalidar
+        """
+        keys = [cls.get_key(user_id) for user_id in user_ids]
+        if keys:
+            cache.delete_many(keys)
@@ -0,0 +1,41 @@
+# Django
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from app.accounts.models.user import CustomUser
+from app.business.models.business import Business
+from app.roles.models.role import BusinessRole, RolePermission
+
+# Services
+from app.accounts.services.user_cache_service import UserCacheService
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Invalida la caché del usuario modificado"""
+    UserCacheService.invalidate([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Business)
+def invalidate_cached_business_members(sender, instance, **kwargs):
+    """Invalida la caché de los miembros de un negocio modificado"""
+    UserCacheService.invalidate(
+        CustomUser.objects.filter(business_id=instance.pk).values_list('pk', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=BusinessRole)
+def invalidate_cached_role_users(sender, instance, **kwargs):
+    """Invalida la caché de los usuarios con el rol modificado"""
+    UserCacheService.invalidate(
+        CustomUser.objects.filter(business_role_id=instance.pk).values_list('pk', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def invalidate_cached_permission_users(sender, instance, **kwargs):
+    """Invalida la caché de los usuarios cuyo rol cambió de permisos"""
+    UserCacheService.invalidate(
+        CustomUser.objects.filter(business_role_id=instance.business_role_id).values_list('pk', flat=True)
+    )
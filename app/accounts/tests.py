@@ -0,0 +1,146 @@
+# Django
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+# Django REST Framework
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Models
+from app.accounts.models import CustomUser
+from app.business.models.business import Business
+from app.roles.models.role import BusinessRole
+
+# Tokens
+from app.accounts.api.tokens import (
+    BUSINESS_ID_CLAIM, BUSINESS_ROLE_ID_CLAIM, PERMISSIONS_VERSION_CLAIM, BusinessRefreshToken,
+    get_permissions_version
+)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BusinessTokenClaimsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.create_user(
+            username='owner', email='owner@example.com', password='pass12345678'
+        )
+        self.business = Business.objects.create(name='Negocio', owner=self.owner)
+        self.owner.refresh_from_db()
+        self.viewer_role = BusinessRole.objects.get(business=self.business, name='Viewer')
+        self.member = CustomUser.objects.create_user(
+            username='member', email='member@example.com', password='pass12345678'
+        )
+        self.member.business = self.business
+        self.member.business_role = self.viewer_role
+        self.member.save()
+        self.client = APIClient()
+
+    def login(self, identifier='owner'):
+        response = self.client.post(
+            '/api/accounts/login/', {'username': identifier, 'password': 'pass12345678'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_user_info(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        try:
+            return self.client.get('/api/accounts/user-info/')
+        finally:
+            self.client.credentials()
+
+    def assertPermissionsChanged(self, access):
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.get_user_info(access)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'permissions_changed')
+
+    def test_login_issues_business_claims(self):
+        tokens = self.login()
+
+        claims = AccessToken(tokens['access'])
+        self.assertEqual(claims[BUSINESS_ID_CLAIM], self.business.id)
+        self.assertEqual(claims[BUSINESS_ROLE_ID_CLAIM], self.owner.business_role_id)
+        self.assertEqual(
+            claims[PERMISSIONS_VERSION_CLAIM], get_permissions_version(self.business.id, self.owner.business_role_id)
+        )
+        self.assertEqual(self.get_user_info(tokens['access']).status_code, 200)
+
+    def test_token_is_rejected_after_a_permission_change(self):
+        tokens = self.login('member')
+
+        permissions = self.viewer_role.role_permissions
+        with self.captureOnCommitCallbacks(execute=True):
+            permissions.can_export_data = True
+            permissions.save()
+
+        self.assertPermissionsChanged(tokens['access'])
+        # Un nuevo inicio de sesión emite la versión vigente
+        self.assertEqual(self.get_user_info(self.login('member')['access']).status_code, 200)
+
+    def test_change_to_another_role_keeps_the_token(self):
+        tokens = self.login()
+
+        permissions = self.viewer_role.role_permissions
+        with self.captureOnCommitCallbacks(execute=True):
+            permissions.can_export_data = True
+            permissions.save()
+
+        # El propietario es Admin: el cambio del rol Viewer no le afecta
+        self.assertEqual(self.get_user_info(tokens['access']).status_code, 200)
+
+    def test_cache_loss_keeps_the_token(self):
+        tokens = self.login('member')
+
+        # La versión vive en la base de datos: vaciar la caché (o usar otro host) no invalida tokens
+        cache.clear()
+
+        self.assertEqual(self.get_user_info(tokens['access']).status_code, 200)
+        self.assertEqual(
+            AccessToken(tokens['access'])[PERMISSIONS_VERSION_CLAIM],
+            BusinessRole.objects.get(pk=self.viewer_role.pk).permissions_version,
+        )
+
+    def test_token_is_rejected_after_a_role_change(self):
+        tokens = self.login()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.business_role = self.viewer_role
+            self.owner.save()
+
+        self.assertPermissionsChanged(tokens['access'])
+
+    def test_refresh_endpoint_issues_the_current_claims(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.business_role = self.viewer_role
+            self.owner.save()
+
+        response = self.client.post('/api/accounts/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        refreshed = response.json()
+        access = AccessToken(refreshed['access'])
+        self.assertEqual(access[BUSINESS_ROLE_ID_CLAIM], self.viewer_role.id)
+        self.assertEqual(BusinessRefreshToken(refreshed['refresh'])[BUSINESS_ROLE_ID_CLAIM], self.viewer_role.id)
+        self.assertEqual(self.get_user_info(refreshed['access']).status_code, 200)
+
+        # El refresh token rotado queda en la lista negra
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.client.post(
+                '/api/accounts/token/refresh/', {'refresh': tokens['refresh']}, format='json'
+            )
+        self.assertEqual(response.status_code, 401)
+
+    def test_user_without_business_has_version_zero(self):
+        CustomUser.objects.create_user(username='solo', email='solo@example.com', password='pass12345678')
+
+        tokens = self.login('solo@example.com')
+
+        claims = AccessToken(tokens['access'])
+        self.assertIsNone(claims[BUSINESS_ID_CLAIM])
+        self.assertEqual(claims[PERMISSIONS_VERSION_CLAIM], 0)
+        self.assertEqual(get_permissions_version(None), 0)
+        self.assertEqual(self.get_user_info(tokens['access']).status_code, 200)
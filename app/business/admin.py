@@ -8,6 +8,8 @@ from datetime import timedelta
 
 # Models
 from app.business.models.business import Business, BusinessJoinRequest, BusinessInvitation
+from app.business.models.tenant import TenantDatabase, TenantArchive, TenantTombstone, TenantStorageMetrics
+from app.business.models.provisioning import ProvisioningJob
 from app.accounts.models.user import CustomUser
 from app.roles.models.role import BusinessRole
 
@@ -76,17 +78,17 @@ class BusinessCoOwnersInline(admin.TabularInline):
 
 @admin.register(Business)
 class BusinessAdmin(admin.ModelAdmin):
-    list_display = ('name', 'owner', 'is_active', 'created_at', 'updated_at', 'member_count')
-    list_filter = ('is_active', 'created_at', BusinessOwnerFilter)
+    list_display = ('name', 'owner', 'is_active', 'provisioning_status', 'created_at', 'updated_at', 'member_count')
+    list_filter = ('is_active', 'provisioning_status', 'created_at', BusinessOwnerFilter)
     search_fields = ('name', 'address', 'email')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('provisioning_status', 'created_at', 'updated_at')
     # Añadir el inline a la configuración de BusinessAdmin
     inlines = [BusinessMemberInline, PendingRequestsInline, BusinessInvitationsInline, BusinessCoOwnersInline]
     exclude = ('co_owners',)
     
     fieldsets = (
         (_('Información básica'), {
-            'fields': ('name', 'owner', 'is_active')
+            'fields': ('name', 'owner', 'is_active', 'provisioning_status')
         }),
         (_('Información de contacto'), {
             'fields': ('address', 'phone', 'email', 'website')
@@ -252,4 +254,42 @@ class BusinessInvitationAdmin(admin.ModelAdmin):
     generate_new_token.short_description = _('Generar nuevos tokens')
     
     actions = ['generate_new_token']
-    
\ No newline at end of file
+
+
+@admin.register(TenantDatabase)
+class TenantDatabaseAdmin(admin.ModelAdmin):
+    list_display = ('alias', 'business', 'name', 'created_at', 'updated_at')
+    search_fields = ('alias', 'name', 'business__name')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(TenantArchive)
+class TenantArchiveAdmin(admin.ModelAdmin):
+    list_display = ('business', 'archive_path', 'original_size', 'archived_size', 'archived_at')
+    search_fields = ('business__name', 'name')
+    readonly_fields = ('archived_at',)
+
+
+@admin.register(TenantTombstone)
+class TenantTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('business_id', 'name', 'attempts', 'created_at', 'purged_at')
+    list_filter = ('purged_at',)
+    search_fields = ('name', 'alias', 'last_error')
+    readonly_fields = ('created_at', 'purged_at')
+
+
+@admin.register(TenantStorageMetrics)
+class TenantStorageMetricsAdmin(admin.ModelAdmin):
+    list_display = ('name', 'business_id', 'file_size', 'page_count', 'freelist_count', 'collected_at',
+                    'last_analyzed_at', 'last_vacuumed_at')
+    search_fields = ('name',)
+    ordering = ('-file_size',)
+    readonly_fields = ('collected_at',)
+
+
+@admin.register(ProvisioningJob)
+class ProvisioningJobAdmin(admin.ModelAdmin):
+    list_display = ('business', 'status', 'attempts', 'available_at', 'locked_by', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('business__name', 'last_error')
+    readonly_fields = ('created_at', 'updated_at')
@@ -0,0 +1,60 @@
+# Django
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+# Django REST Framework
+from rest_framework import permissions, status
+from rest_framework.exceptions import APIException
+
+# Models
+from app.business.models.business import Business
+from app.business.models.tenant import TenantArchive
+
+# Services
+from app.business.services.tenant_registry import TenantFence, TenantRegistry
+
+
+class TenantNotReady(APIException):
+    """La base de datos del negocio todavía se está creando o restaurando"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("La base de datos del negocio aún no está lista")
+    default_code = 'tenant_not_ready'
+
+    def __init__(self, provisioning_status):
+        super().__init__({
+            'detail': self.default_detail,
+            'provisioning_status': provisioning_status,
+        })
+        # DRF envía este valor en la cabecera Retry-After
+        self.wait = getattr(settings, 'TENANT_NOT_READY_RETRY_AFTER', 5)
+
+
+class IsTenantReady(permissions.BasePermission):
+    """
+    Para vistas que usan la base de datos del negocio: si aún no existe se
+    responde 503 de inmediato en lugar de esperar a que termine de crearse.
+
+    No es un permiso por defecto: las vistas que solo usan la base de datos
+    default (roles, solicitudes, invitaciones) no dependen del negocio. La
+    comprobación no conecta ni restaura la base de datos; un negocio archivado
+    lo restaura el router con la primera consulta de la vista.
+    """
+
+    def has_permission(self, request, view):
+        business_id = getattr(request.user, 'business_id', None)
+        if not business_id:
+            return True
+
+        if TenantRegistry.is_registered(business_id):
+            return True
+
+        if TenantArchive.objects.filter(business_id=business_id).exists():
+            # Recién archivado: otros procesos aún usan el archivo y no se puede restaurar
+            if TenantFence.is_fenced(business_id):
+                raise TenantNotReady('archived')
+            return True
+
+        provisioning_status = Business.objects.filter(
+            pk=business_id
+        ).values_list('provisioning_status', flat=True).first()
+        raise TenantNotReady(provisioning_status)
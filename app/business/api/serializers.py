@@ -10,6 +10,7 @@ class BusinessSerializer(serializers.ModelSerializer):
     class Meta:
         model = Business
         fields = "__all__"
+        read_only_fields = ['provisioning_status']
 
     def create(self, validated_data):
         business = Business.objects.create(**validated_data)
@@ -34,13 +34,7 @@ class BusinessViewSet(viewsets.ModelViewSet):
             self.request.user.business_role = admin_role
             self.request.user.save(update_fields=['business', 'business_role'])
         
-        # Crear base de datos para el negocio - Asegurarse que esto se ejecute
-        print(f"Creando base de datos para negocio: {business.name} ({business.id})")
-        from app.business.services.business_service import DatabaseService
-        success = DatabaseService.create_business_database(business)
-        
-        if not success:
-            print(f"Advertencia: No se pudo crear la base de datos para el negocio {business.name}")
+        # Business.save ya encoló la creación de la base de datos; el cliente consulta provisioning_status
             
 class JoinBusinessView(APIView):
     permission_classes = [permissions.IsAuthenticated]
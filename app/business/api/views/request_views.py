@@ -11,6 +11,9 @@ from app.roles.models.role import BusinessRole
 # Serializers
 from app.business.api.serializers  import BusinessJoinRequestSerializer
 
+# Permissions
+from app.roles.api.permissions import BusinessPermissionErrorMixin, HasBusinessPermission
+
 # Validators
 from django.utils import timezone
 import logging
@@ -99,14 +102,15 @@ class JoinBusinessRequestView(APIView):
         
         return Response(serializer.data)
         
-class BusinessJoinRequestManagementView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+class BusinessJoinRequestManagementView(BusinessPermissionErrorMixin, APIView):
+    permission_classes = [
+        permissions.IsAuthenticated,
+        HasBusinessPermission('can_manage_users', methods=['GET'], message="No tienes permiso para ver solicitudes"),
+        HasBusinessPermission('can_manage_users', methods=['POST'], message="No tienes permiso para gestionar solicitudes"),
+    ]
     
     def get(self, request):
         """Ver solicitudes pendientes para el negocio del usuario"""
-        if not request.user.business or not request.user.has_business_permission('can_manage_users'):
-            return Response({"error": "No tienes permiso para ver solicitudes"}, status=403)
-            
         # Filtrar por estado si se proporciona
         status_filter = request.query_params.get('status', 'pending')
         
@@ -135,9 +139,6 @@ class BusinessJoinRequestManagementView(APIView):
         if not request_id or not action:
             return Response({"error": "Se requiere request_id y action"}, status=400)
             
-        if not request.user.business or not request.user.has_business_permission('can_manage_users'):
-            return Response({"error": "No tienes permiso para gestionar solicitudes"}, status=403)
-            
         try:
             # Verificar que la solicitud pertenezca al negocio del usuario
             join_request = BusinessJoinRequest.objects.get(
@@ -163,13 +164,13 @@ class BusinessJoinRequestManagementView(APIView):
         except BusinessJoinRequest.DoesNotExist:
             return Response({"error": "Solicitud no encontrada o ya procesada"}, status=404)
         
-class BusinessInvitationCreateView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+class BusinessInvitationCreateView(BusinessPermissionErrorMixin, APIView):
+    permission_classes = [
+        permissions.IsAuthenticated,
+        HasBusinessPermission('can_manage_users', message="No tienes permiso para crear invitaciones"),
+    ]
     
     def post(self, request):
-        if not request.user.business or not request.user.has_business_permission('can_manage_users'):
-            return Response({"error": "No tienes permiso para crear invitaciones"}, status=403)
-            
         role_id = request.data.get('role_id')  # Opcional
         expiration_days = request.data.get('expiration_days', 7)  # Por defecto 7 días
         
@@ -238,16 +239,16 @@ class BusinessInvitationUseView(APIView):
         else:
             return Response({"error": result['message']}, status=400)
 
-class UserBusinessInvitationsListView(APIView):
+class UserBusinessInvitationsListView(BusinessPermissionErrorMixin, APIView):
     """
     Endpoint para listar invitaciones creadas por el usuario
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [
+        permissions.IsAuthenticated,
+        HasBusinessPermission('can_manage_users', message="No tienes permiso para ver invitaciones"),
+    ]
     
     def get(self, request):
-        if not request.user.business or not request.user.has_business_permission('can_manage_users'):
-            return Response({"error": "No tienes permiso para ver invitaciones"}, status=403)
-        
         # Obtener invitaciones activas del negocio del usuario
         invitations = BusinessInvitation.objects.filter(
             business=request.user.business,
@@ -12,3 +12,19 @@ class BusinessConfig(AppConfig):
             print("Signals de accounts cargados correctamente")
         except Exception as e:
             print(f"Error al cargar signals: {str(e)}")
+        
+        # Precompilar la tabla de rutas de BusinessRouter
+        from config.db_routers import BusinessRouter
+        BusinessRouter.build_route_table()
+        
+        # Perfil de rendimiento de SQLite en cada conexión nueva
+        from django.db.backends.signals import connection_created
+        from config.db_pragmas import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='apply_sqlite_pragmas')
+        
+        # Mantenimiento periódico (TENANT_MAINTENANCE['interval']): con la primera petición de cada proceso
+        from django.core.signals import request_started
+        from app.business.services.maintenance_service import TenantMaintenanceService
+        request_started.connect(
+            TenantMaintenanceService.start_on_request, dispatch_uid=TenantMaintenanceService.REQUEST_DISPATCH_UID
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-17 05:57
+
+import os
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, router
+
+
+def register_legacy_databases(apps, schema_editor):
+    """
+    Registra los archivos de los negocios existentes, nombrados por el negocio
+    (db_business_<nombre>.sqlite3) antes de que hubiera registro.
+
+    Sin esto el aprovisionamiento les crearía una base de datos nueva y vacía
+    y el escáner de huérfanos trataría el archivo con sus datos como huérfano.
+    Solo aplica al almacenamiento de un archivo por negocio, el único que existía.
+    """
+    Business = apps.get_model('business', 'Business')
+    TenantDatabase = apps.get_model('business', 'TenantDatabase')
+    db_alias = schema_editor.connection.alias
+    if not router.allow_migrate_model(db_alias, Business):
+        return
+    if getattr(settings, 'TENANT_STORAGE', 'sqlite') != 'sqlite':
+        return
+
+    entries = []
+    for business_id, name in Business.objects.using(db_alias).values_list('id', 'name'):
+        location = str(settings.BASE_DIR / f"db_business_{name}.sqlite3")
+        if os.path.exists(location):
+            entries.append(TenantDatabase(business_id=business_id, alias=f"business_{business_id}", name=location))
+    TenantDatabase.objects.using(db_alias).bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0003_business_co_owners_business_is_main_business_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantDatabase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True, verbose_name='Alias de conexión')),
+                ('name', models.CharField(max_length=500, verbose_name='Nombre de la base de datos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tenant_database', to='business.business', verbose_name='Negocio')),
+            ],
+            options={
+                'verbose_name': 'Base de datos de negocio',
+                'verbose_name_plural': 'Bases de datos de negocios',
+            },
+        ),
+        migrations.RunPython(register_legacy_databases, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-17 06:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models, router
+
+
+def mark_provisioned_businesses(apps, schema_editor):
+    """
+    Los negocios que ya tienen base de datos registrada quedan listos, incluidos
+    los archivos nombrados por el negocio que registra 0004. Los que no tienen
+    ninguna quedan pendientes y los aprovisiona provisioning_worker.
+    """
+    Business = apps.get_model('business', 'Business')
+    TenantDatabase = apps.get_model('business', 'TenantDatabase')
+    db_alias = schema_editor.connection.alias
+    if not router.allow_migrate_model(db_alias, Business):
+        return
+    business_ids = TenantDatabase.objects.using(db_alias).values_list('business_id', flat=True)
+    Business.objects.using(db_alias).filter(id__in=list(business_ids)).update(provisioning_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0004_tenantdatabase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='provisioning_status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('ready', 'Lista'), ('failed', 'Fallida')], default='pending', editable=False, max_length=20, verbose_name='Estado de la base de datos'),
+        ),
+        migrations.CreateModel(
+            name='ProvisioningJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'En cola'), ('running', 'En ejecución'), ('done', 'Terminado'), ('failed', 'Fallido')], default='queued', max_length=20, verbose_name='Estado')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Último error')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Disponible desde')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Tomado en')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='provisioning_jobs', to='business.business', verbose_name='Negocio')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de aprovisionamiento',
+                'verbose_name_plural': 'Trabajos de aprovisionamiento',
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='provisioning_queue_idx')],
+            },
+        ),
+        migrations.RunPython(mark_provisioned_businesses, migrations.RunPython.noop),
+    ]
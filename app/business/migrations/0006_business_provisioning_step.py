@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 06:10
+
+from django.db import migrations, models, router
+
+
+def mark_registered_businesses(apps, schema_editor):
+    """Los negocios que ya tienen base de datos registrada completaron todos los pasos"""
+    Business = apps.get_model('business', 'Business')
+    TenantDatabase = apps.get_model('business', 'TenantDatabase')
+    db_alias = schema_editor.connection.alias
+    if not router.allow_migrate_model(db_alias, Business):
+        return
+    business_ids = TenantDatabase.objects.using(db_alias).values_list('business_id', flat=True)
+    Business.objects.using(db_alias).filter(id__in=list(business_ids)).update(provisioning_step='registered')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0005_provisioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='provisioning_step',
+            field=models.CharField(blank=True, choices=[('file_created', 'Archivo creado'), ('schema_applied', 'Esquema aplicado'), ('roles_seeded', 'Roles creados'), ('registered', 'Registrada')], default='', editable=False, max_length=20, verbose_name='Último paso de aprovisionamiento'),
+        ),
+        migrations.RunPython(mark_registered_businesses, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 06:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0006_business_provisioning_step'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantRegistryChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_id', models.BigIntegerField(verbose_name='Negocio')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Fecha de creación')),
+            ],
+            options={
+                'verbose_name': 'Cambio del registro de negocios',
+                'verbose_name_plural': 'Cambios del registro de negocios',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 06:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0007_tenantregistrychange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=500, verbose_name='Ubicación original')),
+                ('archive_path', models.CharField(max_length=500, verbose_name='Archivo comprimido')),
+                ('original_size', models.BigIntegerField(default=0, verbose_name='Tamaño original')),
+                ('archived_size', models.BigIntegerField(default=0, verbose_name='Tamaño archivado')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de archivado')),
+                ('business', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tenant_archive', to='business.business', verbose_name='Negocio')),
+            ],
+            options={
+                'verbose_name': 'Base de datos archivada',
+                'verbose_name_plural': 'Bases de datos archivadas',
+            },
+        ),
+    ]
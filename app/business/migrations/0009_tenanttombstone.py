@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0008_tenantarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_id', models.BigIntegerField(blank=True, null=True, verbose_name='Negocio')),
+                ('alias', models.CharField(blank=True, max_length=100, verbose_name='Alias de conexión')),
+                ('name', models.CharField(blank=True, max_length=500, verbose_name='Ubicación')),
+                ('archive_path', models.CharField(blank=True, max_length=500, verbose_name='Archivo comprimido')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('last_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('purged_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de purga')),
+            ],
+            options={
+                'verbose_name': 'Base de datos por eliminar',
+                'verbose_name_plural': 'Bases de datos por eliminar',
+                'indexes': [models.Index(fields=['purged_at', 'created_at'], name='tenant_purge_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0009_tenanttombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantStorageMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=500, unique=True, verbose_name='Ubicación')),
+                ('business_id', models.BigIntegerField(blank=True, null=True, verbose_name='Negocio')),
+                ('page_size', models.PositiveIntegerField(default=0, verbose_name='Tamaño de página')),
+                ('page_count', models.BigIntegerField(default=0, verbose_name='Páginas')),
+                ('freelist_count', models.BigIntegerField(default=0, verbose_name='Páginas libres')),
+                ('file_size', models.BigIntegerField(default=0, verbose_name='Tamaño del archivo')),
+                ('wal_size', models.BigIntegerField(default=0, verbose_name='Tamaño del WAL')),
+                ('auto_vacuum', models.PositiveSmallIntegerField(default=0, verbose_name='auto_vacuum')),
+                ('analyzed_page_count', models.BigIntegerField(blank=True, null=True, verbose_name='Páginas en el último ANALYZE')),
+                ('collected_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de medición')),
+                ('last_analyzed_at', models.DateTimeField(blank=True, null=True, verbose_name='Último ANALYZE')),
+                ('last_vacuumed_at', models.DateTimeField(blank=True, null=True, verbose_name='Último VACUUM')),
+            ],
+            options={
+                'verbose_name': 'Métricas de base de datos de negocio',
+                'verbose_name_plural': 'Métricas de bases de datos de negocios',
+            },
+        ),
+    ]
@@ -30,6 +30,30 @@ class Business(models.Model):
     email = models.EmailField(_("Email de contacto"), null=True, blank=True)
     website = models.URLField(_("Sitio web"), null=True, blank=True)
     logo = models.ImageField(_("Logo"), upload_to="business_logos/", null=True, blank=True)
+    provisioning_status = models.CharField(
+        _("Estado de la base de datos"),
+        max_length=20,
+        choices=[
+            ('pending', _('Pendiente')),
+            ('ready', _('Lista')),
+            ('failed', _('Fallida')),
+        ],
+        default='pending',
+        editable=False
+    )
+    provisioning_step = models.CharField(
+        _("Último paso de aprovisionamiento"),
+        max_length=20,
+        choices=[
+            ('file_created', _('Archivo creado')),
+            ('schema_applied', _('Esquema aplicado')),
+            ('roles_seeded', _('Roles creados')),
+            ('registered', _('Registrada')),
+        ],
+        blank=True,
+        default='',
+        editable=False
+    )
 
     class Meta:
         verbose_name = _("Negocio")
@@ -107,45 +131,32 @@ class Business(models.Model):
             # Si tiene otro negocio y este no tiene prioridad, agregarlo como co-propietario
             elif has_other_business:
                 self.co_owners.add(self.owner)
-            
-            if is_new:
-                try:
-                    from app.business.services.business_service import DatabaseService
-                    print(f"Intentando crear base de datos para negocio: {self.name} ({self.id})")
-                    success = DatabaseService.create_business_database(self)
-                    if not success:
-                        print(f"Advertencia: No se pudo crear la base de datos para el negocio {self.name}")
-                except Exception as e:
-                    print(f"Error al crear base de datos para negocio {self.name}: {str(e)}")
+        
+        if is_new:
+            # Único punto que dispara el aprovisionamiento; la base de datos se crea en
+            # segundo plano (comando provisioning_worker) cuando se confirma la transacción
+            from django.db import transaction
+            from app.business.services.provisioning_service import ProvisioningQueueService
+            transaction.on_commit(lambda: ProvisioningQueueService.enqueue(self))
     
     def delete(self, using=None, keep_parents=False):
         """
-        Sobrescribe el método delete para eliminar la base de datos asociada al negocio
+        Elimina el negocio sin borrar su base de datos durante la petición.
+
+        La señal pre_delete deja una lápida (TenantTombstone) y el comando
+        purge_tenants borra la base de datos en segundo plano.
         """
-        # Nombre de la base de datos asociada
-        db_name = f"business_{self.name}"
-        db_path = None
-        
-        # Verificar si la base de datos existe en la configuración
-        from django.conf import settings
-        if db_name in settings.DATABASES:
-            db_path = settings.DATABASES[db_name]['NAME']
-            # Eliminar la base de datos de la configuración
-            del settings.DATABASES[db_name]
-            print(f"Eliminada configuración de base de datos {db_name}")
+        from app.business.services.tenant_registry import TenantRegistry
+
+        # Django pone el pk a None al eliminar
+        business_id = self.id
         
-        # Llamar al método delete original
+        # Django envía pre_delete dentro de la misma transacción: lápida y borrado se confirman juntos
         result = super().delete(using=using, keep_parents=keep_parents)
         
-        # Eliminar físicamente el archivo de la base de datos
-        if db_path:
-            import os
-            if os.path.exists(db_path):
-                try:
-                    os.remove(db_path)
-                    print(f"Eliminado archivo de base de datos {db_path}")
-                except Exception as e:
-                    print(f"Error al eliminar archivo de base de datos {db_path}: {str(e)}")
+        # Cerrar la conexión y olvidar el alias en este proceso (los demás lo ven por el registro)
+        TenantRegistry.unregister(business_id)
+        print(f"Negocio {business_id} eliminado; base de datos pendiente de purga")
         
         return result
     
@@ -0,0 +1,46 @@
+# Django
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ProvisioningJob(models.Model):
+    """
+    Trabajo pendiente para crear la base de datos de un negocio.
+
+    La cola vive en la base de datos default, así no hace falta un broker externo;
+    los workers (comando provisioning_worker) toman los trabajos con un UPDATE
+    condicional para que dos procesos nunca ejecuten el mismo.
+    """
+    STATUS_CHOICES = [
+        ('queued', _('En cola')),
+        ('running', _('En ejecución')),
+        ('done', _('Terminado')),
+        ('failed', _('Fallido')),
+    ]
+
+    business = models.ForeignKey(
+        'business.Business',
+        on_delete=models.CASCADE,
+        related_name='provisioning_jobs',
+        verbose_name=_("Negocio")
+    )
+    status = models.CharField(_("Estado"), max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(_("Intentos"), default=0)
+    last_error = models.TextField(_("Último error"), blank=True, default='')
+    available_at = models.DateTimeField(_("Disponible desde"), default=timezone.now)
+    locked_by = models.CharField(_("Worker"), max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(_("Tomado en"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Fecha de actualización"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Trabajo de aprovisionamiento")
+        verbose_name_plural = _("Trabajos de aprovisionamiento")
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='provisioning_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} - {self.status} ({self.attempts})"
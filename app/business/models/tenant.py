@@ -0,0 +1,130 @@
+# Django
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class TenantDatabase(models.Model):
+    """
+    Registro persistente de la base de datos de cada negocio.
+    Vive en la base de datos default y todos los procesos lo consultan para
+    registrar la conexión de un negocio la primera vez que se usa.
+    """
+    business = models.OneToOneField(
+        'business.Business',
+        on_delete=models.CASCADE,
+        related_name='tenant_database',
+        verbose_name=_("Negocio")
+    )
+    alias = models.CharField(_("Alias de conexión"), max_length=100, unique=True)
+    name = models.CharField(_("Nombre de la base de datos"), max_length=500)
+    created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Fecha de actualización"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Base de datos de negocio")
+        verbose_name_plural = _("Bases de datos de negocios")
+
+    def __str__(self):
+        return f"{self.alias} ({self.name})"
+
+
+class TenantRegistryChange(models.Model):
+    """
+    Registro de cambios de TenantDatabase; el ID más alto es la versión del registro.
+
+    Cada proceso recuerda la última versión que vio y, al encontrar una nueva,
+    descarta de su caché solo los negocios que cambiaron.
+    """
+    # Sin clave foránea: el negocio puede haberse eliminado
+    business_id = models.BigIntegerField(_("Negocio"))
+    created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Cambio del registro de negocios")
+        verbose_name_plural = _("Cambios del registro de negocios")
+
+    def __str__(self):
+        return f"{self.pk}: business_{self.business_id}"
+
+
+class TenantArchive(models.Model):
+    """
+    Base de datos de un negocio archivada (comprimida y fuera del registro).
+    Se restaura automáticamente la próxima vez que se usa el negocio.
+    """
+    business = models.OneToOneField(
+        'business.Business',
+        on_delete=models.CASCADE,
+        related_name='tenant_archive',
+        verbose_name=_("Negocio")
+    )
+    name = models.CharField(_("Ubicación original"), max_length=500)
+    archive_path = models.CharField(_("Archivo comprimido"), max_length=500)
+    original_size = models.BigIntegerField(_("Tamaño original"), default=0)
+    archived_size = models.BigIntegerField(_("Tamaño archivado"), default=0)
+    archived_at = models.DateTimeField(_("Fecha de archivado"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Base de datos archivada")
+        verbose_name_plural = _("Bases de datos archivadas")
+
+    def __str__(self):
+        return f"{self.business_id}: {self.archive_path}"
+
+
+class TenantTombstone(models.Model):
+    """
+    Base de datos pendiente de eliminar.
+
+    Eliminar un negocio solo crea la lápida; el comando purge_tenants borra
+    después los archivos (o el schema o las filas del shard) en segundo plano.
+    """
+    # Sin clave foránea: el negocio ya no existe (None para archivos huérfanos)
+    business_id = models.BigIntegerField(_("Negocio"), null=True, blank=True)
+    alias = models.CharField(_("Alias de conexión"), max_length=100, blank=True)
+    name = models.CharField(_("Ubicación"), max_length=500, blank=True)
+    archive_path = models.CharField(_("Archivo comprimido"), max_length=500, blank=True)
+    attempts = models.PositiveIntegerField(_("Intentos"), default=0)
+    last_error = models.TextField(_("Último error"), blank=True)
+    created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
+    purged_at = models.DateTimeField(_("Fecha de purga"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Base de datos por eliminar")
+        verbose_name_plural = _("Bases de datos por eliminar")
+        indexes = [
+            models.Index(fields=['purged_at', 'created_at'], name='tenant_purge_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id}: {self.name or self.archive_path}"
+
+
+class TenantStorageMetrics(models.Model):
+    """
+    Tamaño y estado de cada base de datos de negocios (maintain_tenants).
+    Una fila por archivo; con shards varios negocios comparten fila.
+    """
+    name = models.CharField(_("Ubicación"), max_length=500, unique=True)
+    business_id = models.BigIntegerField(_("Negocio"), null=True, blank=True)
+    page_size = models.PositiveIntegerField(_("Tamaño de página"), default=0)
+    page_count = models.BigIntegerField(_("Páginas"), default=0)
+    freelist_count = models.BigIntegerField(_("Páginas libres"), default=0)
+    file_size = models.BigIntegerField(_("Tamaño del archivo"), default=0)
+    wal_size = models.BigIntegerField(_("Tamaño del WAL"), default=0)
+    auto_vacuum = models.PositiveSmallIntegerField(_("auto_vacuum"), default=0)
+    analyzed_page_count = models.BigIntegerField(_("Páginas en el último ANALYZE"), null=True, blank=True)
+    collected_at = models.DateTimeField(_("Fecha de medición"), auto_now=True)
+    last_analyzed_at = models.DateTimeField(_("Último ANALYZE"), null=True, blank=True)
+    last_vacuumed_at = models.DateTimeField(_("Último VACUUM"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Métricas de base de datos de negocio")
+        verbose_name_plural = _("Métricas de bases de datos de negocios")
+
+    def __str__(self):
+        return f"{self.name}: {self.file_size} bytes"
+
+    @property
+    def freelist_ratio(self):
+        return self.freelist_count / self.page_count if self.page_count else 0.0
@@ -0,0 +1,68 @@
+# Django
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+# Contexto del negocio actual
+from config.middleware import get_current_business_id
+
+# Management
+import uuid
+
+
+class TenantContextRequired(RuntimeError):
+    """Se consultó un modelo de negocio sin un negocio activo en el contexto"""
+
+
+class TenantManager(models.Manager):
+    """
+    Manager que limita todas las consultas al negocio del contexto actual.
+
+    Con varios negocios en el mismo shard es la garantía de que una petición
+    nunca lee ni modifica filas de otro negocio.
+    """
+
+    def get_queryset(self):
+        business_id = get_current_business_id()
+        if business_id is None:
+            raise TenantContextRequired(
+                f"{self.model.__name__} requiere un negocio activo; use all_tenants para tareas de mantenimiento"
+            )
+        return super().get_queryset().filter(business_id=business_id)
+
+
+class TenantScopedModel(models.Model):
+    """
+    Base para los modelos que viven en la base de datos de los negocios.
+
+    Cada fila lleva el ID de su negocio (sin clave foránea: Business vive en otra
+    base de datos) y la clave primaria es un UUID para poder mover filas entre
+    shards sin colisiones.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    business_id = models.BigIntegerField(_("Negocio"), db_index=True, editable=False)
+
+    objects = TenantManager()
+    # Sin filtro por negocio: rebalanceo, eliminación de negocios y mantenimiento
+    all_tenants = models.Manager()
+
+    class Meta:
+        abstract = True
+        base_manager_name = 'all_tenants'
+
+    def save(self, *args, **kwargs):
+        business_id = get_current_business_id()
+        if self.business_id is None:
+            if business_id is None:
+                raise TenantContextRequired(f"No hay un negocio activo para guardar {self.__class__.__name__}")
+            self.business_id = business_id
+        elif business_id is not None and self.business_id != business_id:
+            raise TenantContextRequired(
+                f"{self.__class__.__name__} pertenece al negocio {self.business_id}, no al negocio activo {business_id}"
+            )
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def get_tenant_models(cls):
+        """Modelos instalados que heredan de TenantScopedModel"""
+        from django.apps import apps
+        return [model for model in apps.get_models() if issubclass(model, cls)]
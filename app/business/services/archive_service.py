@@ -0,0 +1,180 @@
+# Django
+from django.conf import settings
+from django.db import transaction
+
+# Models
+from app.business.models.business import Business
+from app.business.models.tenant import TenantArchive, TenantDatabase
+
+# Services
+from app.business.services.backup_service import TenantBackupService
+from app.business.services.purge_service import TenantPurgeService
+from app.business.services.tenant_provisioning import TenantLock, TenantProvisioningBusy, TenantProvisioningService
+from app.business.services.tenant_registry import TenantFence, TenantRegistry
+from app.business.services.tenant_storage import SQLiteTenantStorage, get_tenant_storage
+
+# Management
+from pathlib import Path
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantArchiveService:
+    """
+    Archiva las bases de datos de negocios inactivos o sin escrituras recientes.
+
+    Con las escrituras del negocio bloqueadas (TenantFence) la base de datos se
+    copia comprimida en TENANT_ARCHIVE_DIR y se quita del registro (el router,
+    las migraciones y las copias de seguridad dejan de considerarla). El archivo
+    lo borra después purge_tenants, cuando los demás procesos ya aplicaron el
+    cambio. La primera vez que se vuelve a usar el negocio, TenantRegistry.resolve
+    la restaura y aplica las migraciones pendientes.
+    """
+
+    @staticmethod
+    def get_archive_dir():
+        return Path(getattr(settings, 'TENANT_ARCHIVE_DIR', settings.BASE_DIR / 'tenant_archive'))
+
+    @staticmethod
+    def check_storage():
+        """Solo se archivan bases de datos de un archivo por negocio"""
+        if type(get_tenant_storage()) is not SQLiteTenantStorage:
+            raise ValueError("El archivado requiere TENANT_STORAGE='sqlite' (un archivo por negocio)")
+
+    @staticmethod
+    def get_last_write(location):
+        """Fecha (timestamp) de la última escritura en el archivo o en su -wal"""
+        mtimes = [os.path.getmtime(path) for path in (location, f"{location}-wal") if os.path.exists(path)]
+        return max(mtimes) if mtimes else None
+
+    @classmethod
+    def get_candidates(cls, idle_days=None, include_inactive=True):
+        """
+        Negocios que se pueden archivar.
+
+        Args:
+            idle_days (int): Días sin escrituras (TENANT_ARCHIVE_IDLE_DAYS)
+            include_inactive (bool): Incluir negocios desactivados con soft_delete()
+
+        Returns:
+            list: Tuplas (business_id, ubicación, motivo 'inactive' | 'idle')
+        """
+        if idle_days is None:
+            idle_days = getattr(settings, 'TENANT_ARCHIVE_IDLE_DAYS', 180)
+        cutoff = time.time() - idle_days * 86400
+
+        candidates = []
+        entries = TenantDatabase.objects.using('default').order_by('business_id').values_list(
+            'business_id', 'name', 'business__is_active'
+        )
+        for business_id, location, is_active in entries:
+            if include_inactive and not is_active:
+                candidates.append((business_id, location, 'inactive'))
+                continue
+            last_write = cls.get_last_write(location)
+            if last_write is not None and last_write < cutoff:
+                candidates.append((business_id, location, 'idle'))
+        return candidates
+
+    @classmethod
+    def archive(cls, business_id):
+        """
+        Comprime la base de datos de un negocio y la quita del registro.
+
+        Args:
+            business_id (int): ID del negocio
+
+        Returns:
+            TenantArchive: Registro del archivo creado
+
+        Raises:
+            TenantProvisioningBusy: Si el negocio se está aprovisionando o restaurando
+        """
+        cls.check_storage()
+        with TenantLock(business_id):
+            location = TenantRegistry.get_registered_path(business_id)
+            if location is None:
+                raise ValueError(f"El negocio {business_id} no tiene base de datos registrada")
+
+            archive_dir = cls.get_archive_dir()
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            archive_path = archive_dir / f"business_{business_id}.sqlite3.gz"
+
+            # Sin escrituras desde antes de la copia hasta que todos los procesos dejen de usar el archivo
+            with TenantFence.hold(business_id, 'archive'):
+                original_size = sum(
+                    os.path.getsize(path) for path in (location, f"{location}-wal") if os.path.exists(path)
+                )
+                TenantBackupService.write_snapshot(location, archive_path)
+
+                with transaction.atomic(using='default'):
+                    archive, _ = TenantArchive.objects.using('default').update_or_create(
+                        business_id=business_id,
+                        defaults={
+                            'name': location,
+                            'archive_path': str(archive_path),
+                            'original_size': original_size,
+                            'archived_size': archive_path.stat().st_size,
+                        }
+                    )
+                    # Publica el cambio: los demás procesos dejan de dirigir consultas a este archivo
+                    TenantRegistry.unregister(business_id)
+                    TenantPurgeService.defer_drop(business_id, TenantRegistry.get_alias(business_id), location)
+
+        logger.info("Negocio %s archivado en %s (%s -> %s bytes)",
+                    business_id, archive_path, original_size, archive.archived_size)
+        return archive
+
+    @staticmethod
+    def is_archived(business_id):
+        return TenantArchive.objects.using('default').filter(business_id=business_id).exists()
+
+    @classmethod
+    def restore(cls, business_id):
+        """
+        Restaura la base de datos archivada de un negocio y la vuelve a registrar.
+
+        Args:
+            business_id (int): ID del negocio
+
+        Returns:
+            str: Alias de conexión o None si el negocio no estaba archivado
+
+        Raises:
+            TenantProvisioningBusy: Si otro proceso lo está restaurando o el
+                archivado es tan reciente que otros procesos aún usan el archivo
+        """
+        with TenantLock(business_id):
+            # Otro proceso pudo restaurarlo mientras se esperaba el bloqueo
+            if TenantRegistry.get_registered_path(business_id) is not None:
+                return TenantRegistry.resolve(business_id)
+
+            archive = TenantArchive.objects.using('default').filter(business_id=business_id).first()
+            if archive is None:
+                return None
+
+            # Hasta que expire el bloqueo del archivado otros procesos pueden tener abierto el archivo anterior
+            if TenantFence.is_fenced(business_id):
+                raise TenantProvisioningBusy(f"El negocio {business_id} se acaba de archivar")
+
+            # El archivo anterior (pendiente de purga) se reemplaza: su lápida ya no aplica
+            TenantPurgeService.cancel_pending(business_id, archive.name)
+            get_tenant_storage().drop(archive.name)
+            TenantBackupService.restore_snapshot(archive.archive_path, archive.name)
+            # Las migraciones añadidas mientras estaba archivado
+            TenantProvisioningService._apply_schema(business_id, archive.name)
+
+            business = Business.objects.get(pk=business_id)
+            with transaction.atomic(using='default'):
+                alias = TenantRegistry.register(business, archive.name)
+                archive.delete()
+
+            if os.path.exists(archive.archive_path):
+                os.remove(archive.archive_path)
+
+        logger.info("Negocio %s restaurado desde %s", business_id, archive.archive_path)
+        return alias
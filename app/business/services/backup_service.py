@@ -0,0 +1,270 @@
+# Django
+from django.conf import settings
+from django.utils import timezone
+
+# Models
+from app.business.models.tenant import TenantDatabase
+
+# Services
+from app.business.services.tenant_storage import SQLiteTenantStorage, get_tenant_storage
+
+# Management
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class _BackupRestarted(Exception):
+    """La copia por pasos se reinició demasiadas veces por escrituras concurrentes"""
+
+
+class TenantBackupService:
+    """
+    Copias de seguridad en caliente de las bases de datos SQLite de los negocios.
+
+    Usa la API de backup de SQLite por bloques de páginas con una pausa entre
+    pasos para no acaparar la base de datos. Las copias se guardan comprimidas
+    y un manifiesto recuerda la firma (tamaño y fecha de modificación del archivo
+    y de su -wal) de la última copia para omitir los negocios sin cambios.
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+    # Reinicios tolerados antes de copiar en un solo paso (una transacción de lectura en WAL)
+    MAX_RESTARTS = 3
+
+    @staticmethod
+    def get_backup_dir():
+        return Path(getattr(settings, 'TENANT_BACKUP_DIR', settings.BASE_DIR / 'tenant_backups'))
+
+    @staticmethod
+    def check_storage():
+        """Las copias por archivo solo aplican a las estrategias SQLite"""
+        if not isinstance(get_tenant_storage(), SQLiteTenantStorage):
+            raise ValueError("backup_tenants solo admite almacenamiento SQLite; use pg_dump con PostgreSQL")
+
+    @staticmethod
+    def get_locations(business_ids=None):
+        """
+        Archivos de negocios a copiar (uno por archivo aunque lo compartan varios negocios).
+
+        Returns:
+            list: Rutas de las bases de datos existentes
+        """
+        entries = TenantDatabase.objects.using('default').order_by('business_id')
+        if business_ids:
+            entries = entries.filter(business_id__in=business_ids)
+        locations = []
+        for location in entries.values_list('name', flat=True):
+            if location not in locations and os.path.exists(location):
+                locations.append(location)
+        return locations
+
+    @staticmethod
+    def get_signature(location):
+        """
+        Firma del contenido actual: cambia con cualquier escritura (también las que
+        aún están en el -wal sin pasar al archivo principal).
+        """
+        signature = []
+        for path in (location, f"{location}-wal"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+                continue
+            # Abrir la base de datos (también la copia en solo lectura) crea un -wal vacío sin cambiar el contenido
+            if path != location and stat.st_size == 0:
+                signature.append(None)
+            else:
+                signature.append([stat.st_size, stat.st_mtime_ns])
+        return signature
+
+    @classmethod
+    def read_manifest(cls):
+        path = cls.get_backup_dir() / cls.MANIFEST_NAME
+        if not path.exists():
+            return {}
+        with open(path, encoding='utf-8') as manifest:
+            return json.load(manifest)
+
+    @classmethod
+    def write_manifest(cls, manifest):
+        """Escritura atómica para no dejar un manifiesto a medias"""
+        path = cls.get_backup_dir() / cls.MANIFEST_NAME
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as tmp:
+            json.dump(manifest, tmp, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def backup_all(cls, business_ids=None, workers=4, force=False):
+        """
+        Copia las bases de datos de los negocios con un pool de hilos acotado.
+
+        Args:
+            business_ids (list): Negocios a copiar; por defecto todos los registrados
+            workers (int): Copias simultáneas
+            force (bool): Copiar aunque la firma no haya cambiado
+
+        Yields:
+            tuple: (ubicación, estado 'copied' | 'skipped' | 'failed', detalle)
+        """
+        cls.check_storage()
+        backup_dir = cls.get_backup_dir()
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        manifest = cls.read_manifest()
+
+        pending = []
+        for location in cls.get_locations(business_ids):
+            key = Path(location).name
+            signature = cls.get_signature(location)
+            if not force and manifest.get(key, {}).get('signature') == signature:
+                yield location, 'skipped', manifest[key]['file']
+            else:
+                pending.append((location, key, signature))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='tenant-backup') as pool:
+            futures = {
+                pool.submit(cls.backup_tenant, location): (location, key, signature)
+                for location, key, signature in pending
+            }
+            for future in as_completed(futures):
+                location, key, signature = futures[future]
+                try:
+                    snapshot = future.result()
+                except Exception as e:
+                    logger.error("Error copiando %s: %s", location, e)
+                    yield location, 'failed', str(e)
+                    continue
+
+                # La firma es la de antes de copiar: si hubo escrituras durante la copia se repetirá
+                manifest[key] = {
+                    'file': snapshot.name,
+                    'signature': signature,
+                    'size': snapshot.stat().st_size,
+                    'created_at': timezone.now().isoformat(),
+                }
+                cls.write_manifest(manifest)
+                cls.prune(key, keep=snapshot.name)
+                yield location, 'copied', snapshot.name
+
+    @classmethod
+    def backup_tenant(cls, location):
+        """
+        Copia una base de datos en caliente y la comprime.
+
+        Args:
+            location (str): Ruta de la base de datos del negocio
+
+        Returns:
+            Path: Copia comprimida
+        """
+        stem = Path(location).name.removesuffix('.sqlite3')
+        timestamp = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+        snapshot = cls.get_backup_dir() / f"{stem}-{timestamp}.sqlite3.gz"
+        cls.write_snapshot(location, snapshot)
+        return snapshot
+
+    @classmethod
+    def write_snapshot(cls, location, snapshot):
+        """
+        Copia una base de datos en caliente y la guarda comprimida con gzip.
+
+        La copia se publica con os.replace: el archivo existe completo o no existe.
+
+        Args:
+            location (str): Ruta de la base de datos
+            snapshot (Path): Archivo .gz de destino
+        """
+        snapshot = Path(snapshot)
+        tmp_path = snapshot.with_name(f"{snapshot.name}.sqlite3.tmp")
+        gzip_tmp_path = snapshot.with_name(f"{snapshot.name}.tmp")
+        try:
+            cls.copy_database(location, tmp_path)
+            with open(tmp_path, 'rb') as source, gzip.open(gzip_tmp_path, 'wb', compresslevel=6) as target:
+                shutil.copyfileobj(source, target, length=1024 * 1024)
+            os.replace(gzip_tmp_path, snapshot)
+        finally:
+            for path in (tmp_path, gzip_tmp_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    def restore_snapshot(snapshot, location):
+        """
+        Descomprime una copia en la ubicación indicada de forma atómica.
+
+        Args:
+            snapshot (Path): Archivo .gz
+            location (str): Ruta de la base de datos restaurada
+        """
+        tmp_path = f"{location}.restore.tmp"
+        try:
+            with gzip.open(snapshot, 'rb') as source, open(tmp_path, 'wb') as target:
+                shutil.copyfileobj(source, target, length=1024 * 1024)
+            os.replace(tmp_path, location)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def copy_database(cls, location, target_path):
+        """
+        Copia consistente con la API de backup de SQLite.
+
+        Copia TENANT_BACKUP_PAGES páginas por paso y espera TENANT_BACKUP_PAUSE
+        segundos entre pasos. Si las escrituras concurrentes reinician la copia
+        más de MAX_RESTARTS veces, copia en un solo paso: en modo WAL es una
+        transacción de lectura que no bloquea a los escritores.
+        """
+        pages = getattr(settings, 'TENANT_BACKUP_PAGES', 256)
+        pause = getattr(settings, 'TENANT_BACKUP_PAUSE', 0.005)
+        state = {'remaining': None, 'restarts': 0}
+
+        def progress(status, remaining, total):
+            # Si quedan más páginas que en el paso anterior, la copia empezó de nuevo
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > cls.MAX_RESTARTS:
+                    raise _BackupRestarted()
+            state['remaining'] = remaining
+            if remaining and pause:
+                time.sleep(pause)
+
+        # as_uri escapa la ruta: '?' o '#' en el nombre no se leen como parámetros del URI
+        source = sqlite3.connect(Path(location).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            target = sqlite3.connect(target_path)
+            try:
+                try:
+                    source.backup(target, pages=pages, progress=progress)
+                except _BackupRestarted:
+                    logger.info("Copia de %s reiniciada %s veces, se copia en un solo paso", location, state['restarts'])
+                    source.backup(target, pages=-1)
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+    @classmethod
+    def prune(cls, key, keep):
+        """Borra las copias antiguas de un archivo y conserva las TENANT_BACKUP_KEEP más recientes"""
+        keep_count = getattr(settings, 'TENANT_BACKUP_KEEP', 3)
+        stem = key.removesuffix('.sqlite3')
+        # El sello de tiempo ordena las copias; el patrón exige que siga al nombre exacto
+        snapshots = sorted(
+            path for path in cls.get_backup_dir().glob(f"{stem}-*.sqlite3.gz")
+            if path.name[len(stem) + 1:len(stem) + 2].isdigit()
+        )
+        for path in snapshots[:-keep_count]:
+            if path.name != keep:
+                path.unlink()
@@ -0,0 +1,314 @@
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connections
+from django.utils import timezone
+
+# Models
+from app.business.models.tenant import TenantDatabase, TenantStorageMetrics
+
+# Services
+from app.business.services.tenant_storage import SQLiteTenantStorage, get_tenant_storage
+
+# Management
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantMaintenanceService:
+    """
+    Mantenimiento periódico de las bases de datos SQLite de los negocios.
+
+    En cada pasada mide page_count, freelist_count y el tamaño de cada archivo
+    (TenantStorageMetrics) y solo actúa sobre los negocios que superan los
+    umbrales de TENANT_MAINTENANCE:
+    - ANALYZE (la primera vez) o PRAGMA optimize cuando el tamaño cambió más
+      de analyze_growth desde el último análisis.
+    - VACUUM incremental cuando las páginas libres superan vacuum_freelist_ratio.
+    El trabajo se reparte en un pool acotado con pausas entre negocios, solo
+    dentro de la ventana horaria configurada, y un negocio ocupado se omite.
+    La pasada periódica dentro del servidor solo hace VACUUM si hay una ventana
+    configurada.
+    """
+
+    DEFAULTS = {
+        'analyze_min_pages': 64,
+        'analyze_growth': 0.25,
+        'vacuum_min_free_pages': 256,
+        'vacuum_freelist_ratio': 0.2,
+        'vacuum_step_pages': 512,
+        # Conversión a auto_vacuum incremental (VACUUM completo) solo hasta este tamaño
+        'convert_max_bytes': 256 * 1024 * 1024,
+        'pause': 0.05,
+        'busy_timeout': 200,
+        'window': None,
+        'interval': 0,
+    }
+
+    # auto_vacuum = INCREMENTAL
+    INCREMENTAL = 2
+
+    # Acciones que reescriben páginas y bloquean a los escritores
+    HEAVY_ACTIONS = ('vacuum', 'convert')
+
+    LOCK_KEY = 'tenant_maintenance_lock'
+    REQUEST_DISPATCH_UID = 'tenant_maintenance_periodic'
+
+    _periodic_thread = None
+    # Proceso que creó el hilo: un fork copia el atributo pero no el hilo
+    _periodic_pid = None
+    _periodic_lock = threading.Lock()
+
+    @classmethod
+    def get_config(cls):
+        return {**cls.DEFAULTS, **getattr(settings, 'TENANT_MAINTENANCE', {})}
+
+    @staticmethod
+    def check_storage():
+        if not isinstance(get_tenant_storage(), SQLiteTenantStorage):
+            raise ValueError("maintain_tenants solo admite almacenamiento SQLite; PostgreSQL tiene autovacuum")
+
+    @classmethod
+    def in_window(cls, now=None):
+        """
+        Indica si la hora actual está dentro de la ventana de mantenimiento ('HH:MM-HH:MM').
+        La ventana puede cruzar la medianoche ('23:00-05:00'); None = siempre.
+        """
+        window = cls.get_config()['window']
+        if not window:
+            return True
+        start, end = (datetime.strptime(value.strip(), '%H:%M').time() for value in window.split('-'))
+        current = (now or timezone.localtime()).time()
+        if start <= end:
+            return start <= current < end
+        return current >= start or current < end
+
+    @staticmethod
+    def get_locations(business_ids=None):
+        """
+        Archivos a mantener con el primer negocio de cada uno.
+
+        Returns:
+            list: Tuplas (ubicación, business_id)
+        """
+        entries = TenantDatabase.objects.using('default').order_by('business_id')
+        if business_ids:
+            entries = entries.filter(business_id__in=business_ids)
+        locations = {}
+        for business_id, location in entries.values_list('business_id', 'name'):
+            if location not in locations and os.path.exists(location):
+                locations[location] = business_id
+        return list(locations.items())
+
+    @staticmethod
+    def collect(connection, location):
+        """Métricas de tamaño de una base de datos abierta"""
+        metrics = {
+            'page_size': connection.execute("PRAGMA page_size").fetchone()[0],
+            'page_count': connection.execute("PRAGMA page_count").fetchone()[0],
+            'freelist_count': connection.execute("PRAGMA freelist_count").fetchone()[0],
+            'auto_vacuum': connection.execute("PRAGMA auto_vacuum").fetchone()[0],
+            'file_size': os.path.getsize(location),
+        }
+        wal_path = f"{location}-wal"
+        metrics['wal_size'] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        return metrics
+
+    @classmethod
+    def plan(cls, metrics, previous=None, heavy=True):
+        """
+        Acciones necesarias según los umbrales.
+
+        Args:
+            metrics (dict): Métricas actuales
+            previous (TenantStorageMetrics): Métricas guardadas o None
+            heavy (bool): Incluir VACUUM ('vacuum' y 'convert')
+
+        Returns:
+            list: 'analyze', 'optimize', 'vacuum' y/o 'convert'
+        """
+        config = cls.get_config()
+        actions = []
+
+        page_count = metrics['page_count']
+        analyzed = previous.analyzed_page_count if previous else None
+        if page_count >= config['analyze_min_pages']:
+            if not analyzed:
+                actions.append('analyze')
+            elif abs(page_count - analyzed) / analyzed > config['analyze_growth']:
+                actions.append('optimize')
+
+        free = metrics['freelist_count']
+        if not heavy:
+            return actions
+        if free >= config['vacuum_min_free_pages'] and page_count and free / page_count >= config['vacuum_freelist_ratio']:
+            if metrics['auto_vacuum'] == cls.INCREMENTAL:
+                actions.append('vacuum')
+            elif metrics['file_size'] <= config['convert_max_bytes']:
+                actions.append('convert')
+        return actions
+
+    @classmethod
+    def maintain(cls, location, business_id, previous=None, dry_run=False, force=False, heavy=True):
+        """
+        Mide una base de datos y ejecuta las acciones que correspondan.
+
+        Returns:
+            dict: location, business_id, metrics, actions, status ('ok' | 'busy' | 'window' | 'failed'), error
+        """
+        result = {'location': location, 'business_id': business_id, 'metrics': None, 'actions': [], 'error': None}
+        if not force and not cls.in_window():
+            result['status'] = 'window'
+            return result
+
+        config = cls.get_config()
+        # Timeout corto: si un escritor tiene la base de datos, el mantenimiento cede
+        connection = sqlite3.connect(location, timeout=config['busy_timeout'] / 1000, isolation_level=None)
+        try:
+            metrics = cls.collect(connection, location)
+            actions = cls.plan(metrics, previous, heavy)
+            result['metrics'] = metrics
+            result['actions'] = actions
+            if not dry_run and actions:
+                cls._perform(connection, actions, config)
+                result['metrics'] = cls.collect(connection, location)
+            result['status'] = 'ok'
+        except sqlite3.OperationalError as e:
+            result['status'] = 'busy' if 'locked' in str(e) or 'busy' in str(e) else 'failed'
+            result['error'] = str(e)
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        finally:
+            connection.close()
+            # Pausa entre negocios para no competir con el tráfico
+            time.sleep(config['pause'])
+        return result
+
+    @staticmethod
+    def _perform(connection, actions, config):
+        if 'analyze' in actions:
+            connection.execute("ANALYZE")
+        if 'optimize' in actions:
+            connection.execute("PRAGMA analysis_limit = 400")
+            # 0x10002: analiza las tablas que cambiaron aunque esta conexión no las haya consultado
+            connection.execute("PRAGMA optimize = 0x10002")
+        if 'convert' in actions:
+            # Una sola vez por archivo: VACUUM completo para activar auto_vacuum incremental
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("VACUUM")
+        if 'vacuum' in actions:
+            # Por pasos: cada paso es una transacción corta que libera el bloqueo de escritura
+            free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            while free > 0:
+                # executescript ejecuta la sentencia hasta el final; execute solo da un paso (una página)
+                connection.executescript(f"PRAGMA incremental_vacuum({int(config['vacuum_step_pages'])});")
+                remaining = connection.execute("PRAGMA freelist_count").fetchone()[0]
+                if remaining >= free:
+                    break
+                free = remaining
+                time.sleep(config['pause'])
+
+    @classmethod
+    def run(cls, business_ids=None, workers=2, dry_run=False, force=False, heavy=True):
+        """
+        Mantiene las bases de datos con un pool de hilos acotado y guarda las métricas.
+
+        Con heavy=False solo se ejecutan ANALYZE y PRAGMA optimize.
+
+        Yields:
+            dict: Resultado de maintain() por base de datos
+        """
+        cls.check_storage()
+        previous = {metrics.name: metrics for metrics in TenantStorageMetrics.objects.using('default')}
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='tenant-maintenance') as pool:
+            futures = [
+                pool.submit(cls.maintain, location, business_id, previous.get(location), dry_run, force, heavy)
+                for location, business_id in cls.get_locations(business_ids)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if result['metrics'] is not None and not dry_run:
+                    cls._save_metrics(result)
+                yield result
+
+    @staticmethod
+    def _save_metrics(result):
+        fields = dict(result['metrics'], business_id=result['business_id'])
+        now = timezone.now()
+        if {'analyze', 'optimize'} & set(result['actions']):
+            fields['last_analyzed_at'] = now
+            fields['analyzed_page_count'] = result['metrics']['page_count']
+        if {'vacuum', 'convert'} & set(result['actions']):
+            fields['last_vacuumed_at'] = now
+        TenantStorageMetrics.objects.using('default').update_or_create(name=result['location'], defaults=fields)
+
+    @classmethod
+    def start_on_request(cls, sender=None, **kwargs):
+        """
+        Receptor de request_started (conectado en BusinessConfig.ready): inicia
+        la pasada periódica con la primera petición de cada proceso del servidor.
+
+        Así el hilo se crea en los workers después del fork (gunicorn --preload
+        importa la aplicación en el proceso maestro) y nunca en comandos de
+        gestión ni herramientas que solo importan el módulo WSGI/ASGI.
+        """
+        request_started.disconnect(dispatch_uid=cls.REQUEST_DISPATCH_UID)
+        cls.start_periodic()
+
+    @classmethod
+    def start_periodic(cls):
+        """
+        Ejecuta el mantenimiento en un hilo del proceso cada TENANT_MAINTENANCE['interval'] segundos.
+
+        Un bloqueo en la caché compartida evita que varios procesos del servidor
+        hagan la misma pasada. No hace nada si el intervalo es 0 o el
+        almacenamiento no es SQLite. Sin ventana configurada la pasada puede
+        coincidir con el tráfico, así que se limita a ANALYZE / PRAGMA optimize;
+        el VACUUM queda para la ventana o para maintain_tenants.
+        """
+        config = cls.get_config()
+        interval = config['interval']
+        if not interval:
+            return
+        with cls._periodic_lock:
+            if cls._periodic_thread is not None and cls._periodic_pid == os.getpid():
+                return
+            try:
+                cls.check_storage()
+            except ValueError:
+                logger.info("Mantenimiento periódico desactivado: el almacenamiento de negocios no es SQLite")
+                return
+            if not config['window']:
+                logger.warning("TENANT_MAINTENANCE sin 'window': la pasada periódica no ejecuta VACUUM")
+            cls._periodic_thread = threading.Thread(
+                target=cls._periodic_loop, args=(interval,), name='tenant-maintenance', daemon=True
+            )
+            cls._periodic_pid = os.getpid()
+            cls._periodic_thread.start()
+
+    @classmethod
+    def _periodic_loop(cls, interval):
+        while True:
+            time.sleep(interval)
+            # El bloqueo caduca solo: una pasada por intervalo entre todos los procesos
+            if not cls.in_window() or not cache.add(cls.LOCK_KEY, os.getpid(), interval):
+                continue
+            try:
+                results = list(cls.run(workers=1, heavy=bool(cls.get_config()['window'])))
+                acted = sum(1 for result in results if result['actions'])
+                logger.info("Mantenimiento de negocios: %s bases de datos, %s con acciones", len(results), acted)
+            except Exception:
+                logger.exception("Error en el mantenimiento periódico de negocios")
+            finally:
+                connections.close_all()
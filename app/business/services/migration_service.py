@@ -0,0 +1,146 @@
+# Django
+from django.db.migrations.loader import MigrationLoader
+
+# Management
+from pathlib import Path
+import hashlib
+import logging
+import sqlite3
+
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationStateService:
+    """
+    Servicio para identificar el estado del grafo de migraciones del código.
+
+    Cada base de datos de negocio guarda en su cabecera (PRAGMA user_version) una
+    huella corta del grafo con el que se migró; compararla con la del código permite
+    saber si está al día sin leer el esquema ni construir el plan de migraciones.
+    """
+
+    # Huella cacheada por proceso: las migraciones no cambian mientras el proceso vive
+    _fingerprint = None
+
+    @staticmethod
+    def get_migration_nodes():
+        """
+        Obtiene todas las migraciones conocidas por el código, sin consultar ninguna base de datos.
+
+        Returns:
+            list: Tuplas (app_label, nombre_migración) ordenadas
+        """
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        return sorted(loader.graph.nodes)
+
+    @classmethod
+    def get_fingerprint(cls):
+        """
+        Calcula una huella (sha256) del grafo de migraciones actual.
+
+        Returns:
+            str: Huella hexadecimal; cambia cuando se agrega o elimina una migración
+        """
+        if cls._fingerprint is None:
+            digest = hashlib.sha256()
+            for app_label, name in cls.get_migration_nodes():
+                digest.update(f"{app_label}.{name}\n".encode())
+            cls._fingerprint = digest.hexdigest()
+        return cls._fingerprint
+
+    @staticmethod
+    def _connect(db_path, readonly=True):
+        """Conexión sqlite3 directa, fuera de django.db, a la base de datos de un negocio"""
+        if readonly:
+            # mode=ro evita crear el archivo si no existe
+            return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        return sqlite3.connect(str(db_path))
+
+    @classmethod
+    def get_stamp(cls):
+        """
+        Huella corta del grafo actual, en el rango de PRAGMA user_version.
+
+        Returns:
+            int: Entero positivo de 31 bits derivado de la huella (nunca 0)
+        """
+        return int(cls.get_fingerprint()[:8], 16) & 0x7FFFFFFF or 1
+
+    @classmethod
+    def read_stamp(cls, db_path):
+        """
+        Lee la huella de migraciones guardada en la base de datos de un negocio.
+
+        Args:
+            db_path (Path | str): Ruta del archivo SQLite
+
+        Returns:
+            int: Huella guardada (0 si nunca se registró) o None si no se puede leer
+        """
+        try:
+            conn = cls._connect(db_path)
+        except sqlite3.Error:
+            return None
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.Error:
+            return None
+        finally:
+            conn.close()
+
+    @classmethod
+    def write_stamp(cls, db_path, stamp=None):
+        """
+        Guarda la huella de migraciones en la base de datos de un negocio ya migrada.
+
+        Args:
+            db_path (Path | str): Ruta del archivo SQLite
+            stamp (int): Huella a guardar; por defecto la del código actual
+        """
+        conn = cls._connect(db_path, readonly=False)
+        try:
+            conn.execute(f"PRAGMA user_version = {int(stamp or cls.get_stamp())}")
+        finally:
+            conn.close()
+
+    @classmethod
+    def is_up_to_date(cls, db_path):
+        """Indica si la base de datos de un negocio ya tiene todas las migraciones del código"""
+        return cls.read_stamp(db_path) == cls.get_stamp()
+
+    @classmethod
+    def get_applied_migrations(cls, db_path):
+        """
+        Migraciones registradas en django_migrations de la base de datos de un negocio.
+
+        Args:
+            db_path (Path | str): Ruta del archivo SQLite
+
+        Returns:
+            set: Tuplas (app_label, nombre_migración) aplicadas
+        """
+        try:
+            conn = cls._connect(db_path)
+        except sqlite3.Error:
+            return set()
+        try:
+            return set(conn.execute("SELECT app, name FROM django_migrations").fetchall())
+        except sqlite3.Error:
+            # Base de datos vacía: todavía no tiene la tabla de migraciones
+            return set()
+        finally:
+            conn.close()
+
+    @classmethod
+    def get_missing_migrations(cls, applied):
+        """
+        Migraciones del código que no están en el conjunto de aplicadas.
+
+        Args:
+            applied (set): Tuplas (app_label, nombre_migración) ya aplicadas
+
+        Returns:
+            tuple: Tuplas (app_label, nombre_migración) pendientes, en orden
+        """
+        return tuple(node for node in cls.get_migration_nodes() if node not in applied)
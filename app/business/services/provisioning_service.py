@@ -0,0 +1,174 @@
+# Django
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+# Models
+from app.business.models.business import Business
+from app.business.models.provisioning import ProvisioningJob
+
+# Services
+from app.business.services.tenant_provisioning import TenantProvisioningBusy, TenantProvisioningService
+
+# Management
+from datetime import timedelta
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProvisioningQueueService:
+    """
+    Cola de creación de bases de datos de negocios respaldada por la base de datos default.
+
+    Las vistas solo encolan el trabajo y responden de inmediato; el comando
+    provisioning_worker lo ejecuta con TenantProvisioningService, que deja
+    Business.provisioning_status en 'ready' al terminar.
+    """
+
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    @staticmethod
+    def get_max_attempts():
+        """Intentos antes de marcar el negocio como fallido"""
+        return getattr(settings, 'TENANT_PROVISIONING_MAX_ATTEMPTS', 3)
+
+    @staticmethod
+    def get_stale_seconds():
+        """Segundos tras los cuales un trabajo en ejecución se considera abandonado por su worker"""
+        return getattr(settings, 'TENANT_PROVISIONING_STALE_SECONDS', 600)
+
+    @classmethod
+    def enqueue(cls, business):
+        """
+        Encola la creación de la base de datos de un negocio (idempotente).
+
+        Args:
+            business (Business): Negocio recién creado
+
+        Returns:
+            ProvisioningJob: Trabajo activo del negocio
+        """
+        job = ProvisioningJob.objects.filter(
+            business_id=business.id, status__in=cls.ACTIVE_STATUSES
+        ).first()
+        if job is None:
+            job = ProvisioningJob.objects.create(business_id=business.id)
+            Business.objects.filter(pk=business.id).update(provisioning_status='pending')
+            business.provisioning_status = 'pending'
+            logger.info("Encolado aprovisionamiento del negocio %s", business.id)
+
+        # Sin workers (desarrollo): ejecutar en la misma petición
+        if not getattr(settings, 'TENANT_PROVISIONING_ASYNC', True) and cls._claim(job, 'sync'):
+            job.refresh_from_db()
+            cls.run_job(job)
+            business.provisioning_status = Business.objects.filter(
+                pk=business.id
+            ).values_list('provisioning_status', flat=True).first()
+        return job
+
+    @classmethod
+    def enqueue_missing(cls):
+        """
+        Encola los negocios pendientes o sin base de datos que no tienen un trabajo activo.
+
+        Returns:
+            int: Número de trabajos creados
+        """
+        businesses = Business.objects.filter(
+            provisioning_status='pending'
+        ).exclude(
+            provisioning_jobs__status__in=cls.ACTIVE_STATUSES
+        ).only('id')
+        count = 0
+        for business in businesses:
+            cls.enqueue(business)
+            count += 1
+        return count
+
+    @staticmethod
+    def _claim(job, worker_id):
+        """Toma un trabajo en cola; el UPDATE condicional garantiza un solo worker por trabajo"""
+        return ProvisioningJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running',
+            locked_by=worker_id,
+            locked_at=timezone.now(),
+            attempts=F('attempts') + 1
+        ) == 1
+
+    @classmethod
+    def claim_next(cls, worker_id):
+        """
+        Toma el siguiente trabajo disponible.
+
+        Args:
+            worker_id (str): Identificador del worker
+
+        Returns:
+            ProvisioningJob: Trabajo tomado o None si la cola está vacía
+        """
+        while True:
+            job = ProvisioningJob.objects.filter(
+                status='queued', available_at__lte=timezone.now()
+            ).order_by('available_at', 'id').first()
+            if job is None:
+                return None
+            if cls._claim(job, worker_id):
+                job.refresh_from_db()
+                return job
+            # Otro worker lo tomó primero; intentar con el siguiente
+
+    @classmethod
+    def run_job(cls, job):
+        """
+        Crea la base de datos del negocio de un trabajo ya tomado.
+
+        Args:
+            job (ProvisioningJob): Trabajo en estado 'running'
+
+        Returns:
+            bool: True si la base de datos quedó lista
+        """
+        business = job.business
+        try:
+            TenantProvisioningService.provision(business)
+            ProvisioningJob.objects.filter(pk=job.pk).update(status='done', last_error='')
+            return True
+        except TenantProvisioningBusy:
+            # Otro proceso lo está aprovisionando: reintentar pronto sin contar el intento
+            ProvisioningJob.objects.filter(pk=job.pk).update(
+                status='queued',
+                attempts=F('attempts') - 1,
+                available_at=timezone.now() + timedelta(seconds=5)
+            )
+            return False
+        except Exception as e:
+            logger.exception("Error al aprovisionar el negocio %s", business.id)
+            error = str(e)
+
+        if job.attempts >= cls.get_max_attempts():
+            ProvisioningJob.objects.filter(pk=job.pk).update(status='failed', last_error=error)
+            Business.objects.filter(pk=business.id).update(provisioning_status='failed')
+            logger.error("Aprovisionamiento del negocio %s fallido tras %s intentos: %s", business.id, job.attempts, error)
+        else:
+            # Reintentar más tarde con espera exponencial
+            ProvisioningJob.objects.filter(pk=job.pk).update(
+                status='queued',
+                last_error=error,
+                available_at=timezone.now() + timedelta(seconds=2 ** job.attempts * 5)
+            )
+        return False
+
+    @classmethod
+    def requeue_stale(cls):
+        """
+        Devuelve a la cola los trabajos cuyo worker dejó de responder.
+
+        Returns:
+            int: Número de trabajos reencolados
+        """
+        limit = timezone.now() - timedelta(seconds=cls.get_stale_seconds())
+        return ProvisioningJob.objects.filter(status='running', locked_at__lt=limit).update(
+            status='queued', locked_by=''
+        )
@@ -0,0 +1,252 @@
+# Django
+from django.conf import settings
+from django.utils import timezone
+
+# Models
+from app.business.models.business import Business
+from app.business.models.tenant import TenantArchive, TenantDatabase, TenantTombstone
+
+# Services
+from app.business.services.tenant_provisioning import TenantLock, TenantProvisioningBusy
+from app.business.services.tenant_registry import TenantRegistry
+from app.business.services.tenant_storage import (
+    SQLiteTenantStorage, ShardedSQLiteTenantStorage, get_tenant_storage
+)
+
+# Management
+from datetime import timedelta
+from pathlib import Path
+import logging
+import os
+import re
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantPurgeService:
+    """
+    Eliminación diferida de las bases de datos de negocios.
+
+    Al eliminar un negocio solo se crea una lápida; purge_tenants la procesa
+    pasados TENANT_PURGE_DELAY segundos, cuando los demás procesos ya dejaron
+    de usar la base de datos (el cambio se publica en el registro). El escáner
+    de huérfanos compara los archivos en disco con el registro y crea lápidas
+    para los que no pertenecen a ningún negocio.
+    """
+
+    ARCHIVE_PATTERN = re.compile(r'^business_(\d+)\.sqlite3\.gz$')
+
+    @staticmethod
+    def create_tombstone(business_id):
+        """
+        Deja una lápida con la ubicación registrada y el archivo comprimido del negocio.
+
+        Args:
+            business_id (int): ID del negocio que se va a eliminar
+
+        Returns:
+            TenantTombstone: Lápida creada o None si el negocio no tenía base de datos
+        """
+        entry = TenantDatabase.objects.using('default').filter(
+            business_id=business_id
+        ).values_list('alias', 'name').first()
+        archive_path = TenantArchive.objects.using('default').filter(
+            business_id=business_id
+        ).values_list('archive_path', flat=True).first()
+        if entry is None and archive_path is None:
+            return None
+
+        alias, name = entry if entry else ('', '')
+        return TenantTombstone.objects.using('default').create(
+            business_id=business_id,
+            alias=alias,
+            name=name,
+            archive_path=archive_path or '',
+        )
+
+    @staticmethod
+    def defer_drop(business_id, alias, name):
+        """
+        Deja una ubicación que el negocio ya no usa para que purge_tenants la borre.
+
+        Se usa al archivar o mover un negocio: otros procesos pueden seguir
+        leyéndola hasta que apliquen el cambio del registro.
+
+        Returns:
+            TenantTombstone: Lápida creada
+        """
+        return TenantTombstone.objects.using('default').create(business_id=business_id, alias=alias, name=name)
+
+    @staticmethod
+    def cancel_pending(business_id, name):
+        """Cancela las lápidas pendientes de una ubicación que el negocio vuelve a usar (con su bloqueo)"""
+        return TenantTombstone.objects.using('default').filter(
+            business_id=business_id, name=name, purged_at__isnull=True
+        ).delete()[0]
+
+    @staticmethod
+    def get_pending(batch_size=50):
+        """Lápidas listas para purgar, de la más antigua a la más reciente"""
+        delay = getattr(settings, 'TENANT_PURGE_DELAY', 60)
+        max_attempts = getattr(settings, 'TENANT_PURGE_MAX_ATTEMPTS', 5)
+        return list(TenantTombstone.objects.using('default').filter(
+            purged_at__isnull=True,
+            attempts__lt=max_attempts,
+            created_at__lte=timezone.now() - timedelta(seconds=delay),
+        ).order_by('created_at')[:batch_size])
+
+    @classmethod
+    def purge_batch(cls, batch_size=50):
+        """
+        Purga un lote de lápidas.
+
+        Returns:
+            tuple: (purgadas, con error)
+        """
+        tombstones = cls.get_pending(batch_size)
+        if not tombstones:
+            return 0, 0
+
+        # Olvidar en este proceso las entradas que cambiaron (conexiones incluidas)
+        TenantRegistry.refresh()
+        purged = failed = 0
+        for tombstone in tombstones:
+            result = cls.purge(tombstone)
+            if result:
+                purged += 1
+            elif result is not None:
+                failed += 1
+        return purged, failed
+
+    @classmethod
+    def purge(cls, tombstone):
+        """
+        Borra la base de datos de una lápida. Repetirlo no tiene efecto.
+
+        Se hace con el bloqueo del negocio: restaurar un archivo o mover un
+        negocio de shard cancela su lápida y no puede coincidir con la purga.
+
+        Returns:
+            bool: True si quedó purgada, False si falló o None si el negocio
+            estaba ocupado (se reintenta en el próximo lote sin contar el intento)
+        """
+        if tombstone.business_id is None:
+            return cls._purge(tombstone)
+        try:
+            with TenantLock(tombstone.business_id):
+                # La lápida pudo cancelarse mientras se esperaba el bloqueo
+                if not TenantTombstone.objects.using('default').filter(
+                    pk=tombstone.pk, purged_at__isnull=True
+                ).exists():
+                    return None
+                return cls._purge(tombstone)
+        except TenantProvisioningBusy:
+            return None
+
+    @classmethod
+    def _purge(cls, tombstone):
+        storage = get_tenant_storage()
+        try:
+            if tombstone.name:
+                owners = set(TenantDatabase.objects.using('default').filter(
+                    name=tombstone.name
+                ).values_list('business_id', flat=True))
+                # Nunca se borra una base de datos registrada; con shards solo importa el negocio de la lápida
+                if isinstance(storage, ShardedSQLiteTenantStorage):
+                    in_use = tombstone.business_id in owners
+                else:
+                    in_use = bool(owners)
+                if in_use:
+                    raise ValueError(f"{tombstone.name} está registrado, no se borra")
+
+                if tombstone.alias:
+                    storage.disconnect(tombstone.alias)
+                storage.drop(tombstone.name, business_id=tombstone.business_id)
+
+            if tombstone.archive_path and os.path.exists(tombstone.archive_path):
+                os.remove(tombstone.archive_path)
+        except Exception as e:
+            logger.exception("Error purgando la lápida %s", tombstone.pk)
+            TenantTombstone.objects.using('default').filter(pk=tombstone.pk).update(
+                attempts=tombstone.attempts + 1,
+                last_error=str(e),
+            )
+            return False
+
+        TenantTombstone.objects.using('default').filter(pk=tombstone.pk).update(purged_at=timezone.now())
+        logger.info("Purgada la base de datos del negocio %s (%s)", tombstone.business_id, tombstone.name)
+        return True
+
+    @classmethod
+    def find_orphans(cls):
+        """
+        Compara los archivos de negocios en disco con el registro.
+
+        Los archivos más recientes que TENANT_ORPHAN_MIN_AGE se ignoran: pueden
+        pertenecer a un aprovisionamiento o restauración en curso.
+
+        Returns:
+            dict: 'files' (bases de datos sin negocio), 'archives' (copias sin
+            TenantArchive) y 'missing' (negocios registrados sin archivo)
+        """
+        storage = get_tenant_storage()
+        if not isinstance(storage, SQLiteTenantStorage):
+            raise ValueError("El escáner de huérfanos solo admite almacenamiento SQLite")
+
+        min_age = getattr(settings, 'TENANT_ORPHAN_MIN_AGE', 3600)
+        now = time.time()
+
+        registered = dict(TenantDatabase.objects.using('default').values_list('name', 'business_id'))
+        known = {os.path.abspath(name) for name in registered}
+        known |= {
+            os.path.abspath(name) for name in TenantTombstone.objects.using('default').filter(
+                purged_at__isnull=True
+            ).exclude(name='').values_list('name', flat=True)
+        }
+        # Negocios aún sin registrar (aprovisionándose): su archivo no es huérfano
+        for business in Business.objects.filter(tenant_database__isnull=True, tenant_archive__isnull=True):
+            known.add(os.path.abspath(storage.get_location(business)))
+        # Archivos nombrados por el negocio de antes del registro: nunca se borran mientras el negocio exista
+        known |= {
+            os.path.abspath(storage.get_legacy_location(name))
+            for name in Business.objects.values_list('name', flat=True)
+        }
+
+        files = []
+        for path in sorted(Path(settings.BASE_DIR).glob('db_business_*.sqlite3')):
+            # Los shards se reutilizan aunque no tengan negocios
+            if isinstance(storage, ShardedSQLiteTenantStorage) and path.name.startswith('db_business_shard_'):
+                continue
+            if os.path.abspath(path) in known or now - path.stat().st_mtime < min_age:
+                continue
+            files.append(str(path))
+
+        archives = []
+        archive_dir = Path(getattr(settings, 'TENANT_ARCHIVE_DIR', settings.BASE_DIR / 'tenant_archive'))
+        if archive_dir.exists():
+            archived = set(TenantArchive.objects.using('default').values_list('business_id', flat=True))
+            for path in sorted(archive_dir.glob('business_*.sqlite3.gz')):
+                match = cls.ARCHIVE_PATTERN.match(path.name)
+                if match and int(match.group(1)) not in archived and now - path.stat().st_mtime >= min_age:
+                    archives.append(str(path))
+
+        missing = [
+            (business_id, name) for name, business_id in sorted(registered.items(), key=lambda item: item[1])
+            if not storage.exists(name)
+        ]
+        return {'files': files, 'archives': archives, 'missing': missing}
+
+    @staticmethod
+    def tombstone_orphans(files=(), archives=()):
+        """
+        Crea lápidas para archivos huérfanos; purge_tenants los borra como cualquier otra.
+
+        Returns:
+            int: Lápidas creadas
+        """
+        tombstones = [TenantTombstone(name=path) for path in files]
+        tombstones += [TenantTombstone(archive_path=path) for path in archives]
+        TenantTombstone.objects.using('default').bulk_create(tombstones)
+        return len(tombstones)
@@ -0,0 +1,225 @@
+# Django
+from django.conf import settings
+
+# Models
+from app.business.models.tenant import TenantDatabase
+
+# Services
+from app.business.services.tenant_storage import SQLiteTenantStorage, get_tenant_storage
+
+# Management
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantSchemaScanService:
+    """
+    Detecta negocios con un esquema distinto al del resto o con la base de datos dañada.
+
+    Una migración que falla a medias deja al negocio con un esquema diferente
+    sin que nada lo indique. El escáner abre cada base de datos en solo lectura
+    desde un pool de hilos, calcula una huella del esquema (tablas, columnas,
+    índices, claves foráneas, vistas y triggers según sqlite_master) y ejecuta
+    PRAGMA quick_check. Los negocios se agrupan por huella y los que no tienen
+    la de referencia (la mayoritaria) se señalan con las diferencias.
+    """
+
+    # Mensajes de quick_check que se conservan por base de datos
+    CHECK_LIMIT = 10
+
+    COLUMNS_SQL = """
+        SELECT m.name, c.name, c.type, c."notnull", c.dflt_value, c.pk, c.hidden
+        FROM sqlite_master m JOIN pragma_table_xinfo(m.name) c
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    """
+    INDEXES_SQL = """
+        SELECT m.name, il.name, il."unique", il.origin, il.partial, ii.seqno, ii.name
+        FROM sqlite_master m
+        JOIN pragma_index_list(m.name) il
+        JOIN pragma_index_info(il.name) ii
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    """
+    FOREIGN_KEYS_SQL = """
+        SELECT m.name, f."from", f."table", f."to", f.on_update, f.on_delete
+        FROM sqlite_master m JOIN pragma_foreign_key_list(m.name) f
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    """
+    OBJECTS_SQL = "SELECT type, name, sql FROM sqlite_master WHERE type IN ('view', 'trigger')"
+
+    @staticmethod
+    def check_storage():
+        if not isinstance(get_tenant_storage(), SQLiteTenantStorage):
+            raise ValueError("scan_tenants solo admite almacenamiento SQLite")
+
+    @staticmethod
+    def get_tenants(business_ids=None):
+        """
+        Negocios a revisar, uno por archivo (con shards varios lo comparten).
+
+        Returns:
+            tuple: (lista de (business_id, alias, ubicación), lista de alias sin base de datos)
+        """
+        entries = TenantDatabase.objects.using('default').order_by('business_id')
+        if business_ids:
+            entries = entries.filter(business_id__in=business_ids)
+        tenants = []
+        missing = []
+        seen = set()
+        for business_id, alias, name in entries.values_list('business_id', 'alias', 'name'):
+            if name in seen:
+                continue
+            seen.add(name)
+            if os.path.exists(name):
+                tenants.append((business_id, alias, name))
+            else:
+                missing.append(alias)
+        return tenants, missing
+
+    @classmethod
+    def get_schema(cls, connection):
+        """
+        Descripción normalizada del esquema: objeto -> definición.
+
+        Se usa la estructura que informa SQLite y no el SQL de sqlite_master,
+        que cambia según la tabla se haya creado de una vez o con ALTER TABLE.
+        El orden de las columnas tampoco se tiene en cuenta.
+
+        Returns:
+            dict: Claves como 'table:business_product' o 'index:business_product:...'
+        """
+        tables = {}
+        for table, name, type_, notnull, default, pk, hidden in connection.execute(cls.COLUMNS_SQL):
+            tables.setdefault(table, {'columns': [], 'foreign_keys': []})
+            tables[table]['columns'].append([name, type_.upper(), notnull, default, pk, hidden])
+        for table, column, target, target_column, on_update, on_delete in connection.execute(cls.FOREIGN_KEYS_SQL):
+            tables[table]['foreign_keys'].append([column, target, target_column, on_update, on_delete])
+
+        schema = {}
+        for table, definition in tables.items():
+            schema[f"table:{table}"] = {key: sorted(value, key=str) for key, value in definition.items()}
+
+        indexes = {}
+        for table, name, unique, origin, partial, seqno, column in connection.execute(cls.INDEXES_SQL):
+            index = indexes.setdefault((table, name), {'unique': unique, 'origin': origin, 'partial': partial, 'columns': []})
+            index['columns'].append((seqno, column))
+        for (table, name), index in indexes.items():
+            columns = [column for _, column in sorted(index['columns'])]
+            # Los índices de UNIQUE / PRIMARY KEY tienen nombres automáticos que dependen del orden de creación
+            if index['origin'] != 'c':
+                name = index['origin']
+            schema[f"index:{table}:{name}:{','.join(map(str, columns))}"] = {
+                'unique': index['unique'], 'partial': index['partial'], 'columns': columns,
+            }
+
+        for type_, name, sql in connection.execute(cls.OBJECTS_SQL):
+            schema[f"{type_}:{name}"] = ' '.join((sql or '').split())
+        return schema
+
+    @staticmethod
+    def get_hash(schema):
+        encoded = json.dumps(schema, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()[:12]
+
+    @classmethod
+    def scan_tenant(cls, business_id, alias, location, quick_check=True):
+        """
+        Calcula la huella del esquema y revisa la integridad de una base de datos.
+
+        Returns:
+            dict: business_id, alias, location, hash, schema, check (lista de
+            errores de quick_check, vacía si está bien), error y seconds
+        """
+        start = time.perf_counter()
+        result = {
+            'business_id': business_id, 'alias': alias, 'location': location,
+            'hash': None, 'schema': None, 'check': [], 'error': None,
+        }
+        try:
+            # Solo lectura: en modo WAL no bloquea a los escritores. as_uri escapa la ruta
+            connection = sqlite3.connect(Path(location).resolve().as_uri() + "?mode=ro", uri=True, timeout=5)
+            try:
+                result['schema'] = cls.get_schema(connection)
+                result['hash'] = cls.get_hash(result['schema'])
+                if quick_check:
+                    messages = [
+                        row[0] for row in connection.execute(f"PRAGMA quick_check({cls.CHECK_LIMIT})")
+                    ]
+                    result['check'] = [] if messages == ['ok'] else messages
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            # Un archivo que no es una base de datos también es un fallo de integridad
+            result['error'] = str(e)
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    @classmethod
+    def scan(cls, tenants, workers=None, quick_check=True):
+        """
+        Revisa las bases de datos en paralelo.
+
+        Args:
+            tenants (list): Tuplas (business_id, alias, ubicación) de get_tenants()
+            workers (int): Bases de datos revisadas a la vez (TENANT_SCAN_WORKERS)
+            quick_check (bool): Ejecutar PRAGMA quick_check además de la huella
+
+        Yields:
+            dict: Resultado de scan_tenant() según terminan
+        """
+        cls.check_storage()
+        if workers is None:
+            workers = getattr(settings, 'TENANT_SCAN_WORKERS', 16)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='tenant-scan') as pool:
+            futures = [
+                pool.submit(cls.scan_tenant, business_id, alias, location, quick_check)
+                for business_id, alias, location in tenants
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def group(results, reference=None):
+        """
+        Agrupa los resultados por huella de esquema.
+
+        Args:
+            results (list): Resultados de scan()
+            reference (str): Huella esperada; por defecto la del grupo más grande
+
+        Returns:
+            tuple: (huella de referencia, dict huella -> lista de resultados ordenada por negocio)
+        """
+        groups = {}
+        for result in sorted(results, key=lambda item: item['business_id']):
+            if result['hash'] is not None:
+                groups.setdefault(result['hash'], []).append(result)
+        if reference is None and groups:
+            counts = Counter({schema_hash: len(members) for schema_hash, members in groups.items()})
+            reference = counts.most_common(1)[0][0]
+        return reference, groups
+
+    @staticmethod
+    def diff(expected, actual):
+        """
+        Diferencias entre dos esquemas de get_schema().
+
+        Returns:
+            dict: 'missing' (objetos que faltan), 'extra' (objetos de más) y
+            'changed' (objetos con otra definición)
+        """
+        return {
+            'missing': sorted(set(expected) - set(actual)),
+            'extra': sorted(set(actual) - set(expected)),
+            'changed': sorted(key for key in set(expected) & set(actual) if expected[key] != actual[key]),
+        }
@@ -0,0 +1,67 @@
+# Django
+from django.conf import settings
+
+# Management
+from bisect import bisect
+import hashlib
+
+
+class ShardRing:
+    """
+    Anillo de hash consistente que asigna negocios a shards.
+
+    Cada shard ocupa VIRTUAL_NODES posiciones en el anillo; al agregar un shard
+    solo cambia la asignación de ~1/N de los negocios. La asignación efectiva de
+    cada negocio queda guardada en el registro (TenantDatabase), el anillo solo
+    decide dónde se crea un negocio nuevo y a dónde debería moverse al rebalancear.
+    """
+
+    VIRTUAL_NODES = 64
+
+    _default = None
+
+    def __init__(self, shards):
+        self.shards = list(shards)
+        ring = sorted(
+            (self._hash(f"{shard}#{node}"), shard)
+            for shard in self.shards
+            for node in range(self.VIRTUAL_NODES)
+        )
+        self._keys = [key for key, _ in ring]
+        self._nodes = [shard for _, shard in ring]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+    def get_shard(self, business_id):
+        """
+        Shard que corresponde a un negocio según el anillo.
+
+        Args:
+            business_id (int): ID del negocio
+
+        Returns:
+            str: Nombre del shard (p. ej. 'shard_03')
+        """
+        index = bisect(self._keys, self._hash(str(business_id))) % len(self._keys)
+        return self._nodes[index]
+
+    @classmethod
+    def get_default(cls):
+        """Anillo con los TENANT_SHARDS shards configurados"""
+        count = getattr(settings, 'TENANT_SHARDS', 8)
+        if cls._default is None or len(cls._default.shards) != count:
+            cls._default = cls([f"shard_{index:02d}" for index in range(count)])
+        return cls._default
+
+    @staticmethod
+    def get_shard_path(shard):
+        """Archivo SQLite de un shard"""
+        return settings.BASE_DIR / f"db_business_{shard}.sqlite3"
+
+    @staticmethod
+    def get_shard_alias(location):
+        """Alias de conexión de un shard a partir de su archivo (db_business_shard_03 -> business_shard_03)"""
+        stem = str(location).replace('\\', '/').rsplit('/', 1)[-1].split('.', 1)[0]
+        return stem[len('db_'):] if stem.startswith('db_') else stem
@@ -0,0 +1,148 @@
+# Django
+from django.db import transaction
+
+# Models
+from app.business.models.business import Business
+from app.business.models.tenant import TenantDatabase
+from app.business.models.tenant_scoped import TenantScopedModel
+
+# Services
+from app.business.services.purge_service import TenantPurgeService
+from app.business.services.shard_ring import ShardRing
+from app.business.services.tenant_provisioning import TenantLock, TenantProvisioningService
+from app.business.services.tenant_registry import TenantFence, TenantRegistry
+from app.business.services.tenant_storage import ShardedSQLiteTenantStorage, get_tenant_storage
+
+# Management
+from collections import Counter
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShardRebalanceService:
+    """
+    Servicio para consultar y mover la asignación de negocios a shards.
+
+    La asignación vigente es la ubicación registrada en TenantDatabase; el anillo
+    indica dónde debería estar cada negocio con el número de shards configurado.
+    """
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def get_storage():
+        storage = get_tenant_storage()
+        if not isinstance(storage, ShardedSQLiteTenantStorage):
+            raise ValueError("El rebalanceo requiere TENANT_STORAGE='sqlite_sharded'")
+        return storage
+
+    @staticmethod
+    def get_shard_name(location):
+        """Nombre del shard a partir de su archivo (db_business_shard_03.sqlite3 -> shard_03)"""
+        return ShardRing.get_shard_alias(location)[len('business_'):]
+
+    @classmethod
+    def get_stats(cls):
+        """
+        Negocios por shard.
+
+        Returns:
+            Counter: shard -> número de negocios registrados
+        """
+        locations = TenantDatabase.objects.using('default').values_list('name', flat=True)
+        return Counter(cls.get_shard_name(location) for location in locations)
+
+    @classmethod
+    def get_misplaced(cls):
+        """
+        Negocios cuyo shard registrado no es el que indica el anillo.
+
+        Returns:
+            list: Tuplas (business_id, shard actual, shard destino)
+        """
+        ring = ShardRing.get_default()
+        misplaced = []
+        entries = TenantDatabase.objects.using('default').order_by('business_id').values_list('business_id', 'name')
+        for business_id, location in entries:
+            current = cls.get_shard_name(location)
+            target = ring.get_shard(business_id)
+            if current != target:
+                misplaced.append((business_id, current, target))
+        return misplaced
+
+    @classmethod
+    def move(cls, business_id, target_shard):
+        """
+        Mueve las filas de un negocio a otro shard y actualiza el registro.
+
+        Las escrituras del negocio quedan bloqueadas (TenantFence) mientras las
+        filas se copian en una transacción en el destino y hasta que todos los
+        procesos aplican el cambio del registro. Las filas del origen las borra
+        después purge_tenants con una lápida, cuando nadie las lee ya. Si el
+        proceso se interrumpe se puede repetir: las copias incompletas en el
+        destino se descartan.
+
+        Args:
+            business_id (int): ID del negocio
+            target_shard (str): Shard destino (p. ej. 'shard_03')
+
+        Returns:
+            int: Filas movidas
+
+        Raises:
+            TenantProvisioningBusy: Si el negocio se está aprovisionando o moviendo
+        """
+        storage = cls.get_storage()
+        business = Business.objects.get(pk=business_id)
+        source = TenantRegistry.get_registered_path(business_id)
+        if source is None:
+            raise ValueError(f"El negocio {business_id} no tiene base de datos registrada")
+
+        target = str(ShardRing.get_shard_path(target_shard))
+        if source == target:
+            return 0
+
+        with TenantLock(business_id), TenantFence.hold(business_id, 'move'):
+            TenantProvisioningService._create_file(target)
+            TenantProvisioningService._apply_schema(business_id, target)
+
+            source_alias = storage.connect(ShardRing.get_shard_alias(source), source)
+            target_alias = storage.connect(ShardRing.get_shard_alias(target), target)
+
+            # Si el negocio ya estuvo en el destino, la purga pendiente borraría las filas que se copian ahora
+            TenantPurgeService.cancel_pending(business_id, target)
+
+            moved = 0
+            with transaction.atomic(using=target_alias):
+                # Restos de un movimiento interrumpido (el negocio no está registrado en el destino)
+                for model in TenantScopedModel.get_tenant_models():
+                    model.all_tenants.using(target_alias).filter(business_id=business_id).delete()
+                # SQLite crea las claves foráneas DEFERRABLE: el orden de los modelos no importa
+                for model in TenantScopedModel.get_tenant_models():
+                    moved += cls._copy_model(model, business_id, source_alias, target_alias)
+
+            with transaction.atomic(using='default'):
+                TenantRegistry.register(business, target)
+                # Otros procesos pueden seguir leyendo el origen hasta refrescar el registro
+                TenantPurgeService.defer_drop(business_id, TenantRegistry.get_alias(business_id), source)
+
+        logger.info("Negocio %s movido de %s a %s (%s filas)", business_id, source, target, moved)
+        return moved
+
+    @classmethod
+    def _copy_model(cls, model, business_id, source_alias, target_alias):
+        """Copia las filas del negocio de un modelo y de sus tablas many-to-many automáticas"""
+        rows = list(model.all_tenants.using(source_alias).filter(business_id=business_id))
+        model.all_tenants.using(target_alias).bulk_create(rows, batch_size=cls.BATCH_SIZE)
+
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            links = list(through.objects.using(source_alias).filter(
+                **{f"{field.m2m_field_name()}__business_id": business_id}
+            ))
+            through.objects.using(target_alias).bulk_create(links, batch_size=cls.BATCH_SIZE)
+        return len(rows)
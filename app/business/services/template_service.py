@@ -0,0 +1,118 @@
+# Django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+
+# Services
+from app.business.services.migration_service import MigrationStateService
+from app.business.services.tenant_storage import SQLiteTenantStorage
+
+# Management
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantTemplateService:
+    """
+    Mantiene una base de datos "plantilla" ya migrada para clonar nuevos negocios.
+
+    La plantilla se identifica con la huella del grafo de migraciones, por lo que
+    se reconstruye automáticamente cuando cambian las migraciones.
+    """
+
+    # El prefijo business_ hace que el router permita migrar las apps de negocio
+    TEMPLATE_ALIAS = 'business_template'
+
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_template_dir():
+        """Directorio donde se guardan las plantillas"""
+        return Path(getattr(settings, 'TENANT_TEMPLATE_DIR', settings.BASE_DIR / 'tenant_templates'))
+
+    @classmethod
+    def get_template_path(cls):
+        """Ruta de la plantilla correspondiente a las migraciones actuales"""
+        fingerprint = MigrationStateService.get_fingerprint()
+        return cls.get_template_dir() / f"template_{fingerprint[:16]}.sqlite3"
+
+    @classmethod
+    def ensure_template(cls):
+        """
+        Devuelve la ruta de la plantilla vigente, construyéndola si no existe.
+
+        Returns:
+            Path: Ruta del archivo de plantilla
+        """
+        template_path = cls.get_template_path()
+        if template_path.exists():
+            return template_path
+
+        with cls._lock:
+            if not template_path.exists():
+                cls._build_template(template_path)
+                cls._remove_stale_templates(template_path)
+
+        return template_path
+
+    @classmethod
+    def clone_template(cls, db_path):
+        """
+        Crea la base de datos de un negocio copiando la plantilla.
+
+        La copia se escribe en un archivo temporal y se renombra de forma atómica,
+        así nunca queda una base de datos a medio copiar en db_path.
+
+        Args:
+            db_path (Path | str): Ruta de la nueva base de datos
+        """
+        template_path = cls.ensure_template()
+        tmp_path = f"{db_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(template_path, tmp_path)
+            os.replace(tmp_path, db_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def _build_template(cls, template_path):
+        """Migra una base de datos vacía y la publica como plantilla"""
+        template_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = template_path.with_name(f"{template_path.stem}.{uuid.uuid4().hex}.tmp")
+
+        logger.info("Construyendo plantilla de base de datos de negocio en %s", template_path)
+        # Los negocios clonados admiten VACUUM incremental (maintain_tenants)
+        SQLiteTenantStorage.create_empty(tmp_path)
+        config = settings.DATABASES['default'].copy()
+        config['NAME'] = tmp_path
+        settings.DATABASES[cls.TEMPLATE_ALIAS] = config
+        try:
+            call_command('migrate', database=cls.TEMPLATE_ALIAS, interactive=False, verbosity=0)
+            connections[cls.TEMPLATE_ALIAS].close()
+            # Las copias heredan la huella y migrate_all_businesses las reconoce como al día
+            MigrationStateService.write_stamp(tmp_path)
+            os.replace(tmp_path, template_path)
+        finally:
+            connections[cls.TEMPLATE_ALIAS].close()
+            del connections[cls.TEMPLATE_ALIAS]
+            settings.DATABASES.pop(cls.TEMPLATE_ALIAS, None)
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    @classmethod
+    def _remove_stale_templates(cls, current_path):
+        """Elimina plantillas generadas con migraciones anteriores"""
+        for path in cls.get_template_dir().glob('template_*.sqlite3'):
+            if path != current_path:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning("No se pudo eliminar la plantilla obsoleta %s: %s", path, e)
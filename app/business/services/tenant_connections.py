@@ -0,0 +1,113 @@
+# Django
+from django.conf import settings
+from django.db import connections
+from django.utils.connection import ConnectionDoesNotExist
+
+# Management
+import logging
+import threading
+from collections import OrderedDict
+
+from asgiref.local import Local
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantConnectionManager:
+    """
+    Limita las conexiones de negocios abiertas por hilo con una política LRU.
+
+    Django guarda una conexión por alias y por hilo y nunca cierra las de alias
+    que dejan de usarse. El router avisa cada vez que usa un alias de negocio y,
+    al superar TENANT_MAX_OPEN_CONNECTIONS, se cierran las menos usadas que estén ociosas.
+    """
+
+    # Mismo tipo de almacenamiento local que usa django.db.connections
+    _local = Local()
+    _stats_lock = threading.Lock()
+    _stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def get_max_connections():
+        """Máximo de conexiones de negocios abiertas por hilo"""
+        return getattr(settings, 'TENANT_MAX_OPEN_CONNECTIONS', 64)
+
+    @classmethod
+    def touch(cls, alias):
+        """
+        Marca un alias de negocio como usado y cierra las conexiones sobrantes.
+
+        Args:
+            alias (str): Alias de conexión del negocio
+        """
+        open_aliases = cls._get_open_aliases()
+        if alias in open_aliases:
+            open_aliases.move_to_end(alias)
+            cls._increment('hits')
+            return
+
+        cls._increment('misses')
+        open_aliases[alias] = None
+        if len(open_aliases) > cls.get_max_connections():
+            cls._evict(open_aliases, keep=alias)
+
+    @classmethod
+    def discard(cls, alias):
+        """Olvida un alias que ya fue cerrado y eliminado de DATABASES"""
+        cls._get_open_aliases().pop(alias, None)
+
+    @classmethod
+    def get_stats(cls):
+        """
+        Estadísticas del administrador de conexiones.
+
+        Returns:
+            dict: Aciertos, fallos y desalojos del proceso, y conexiones abiertas del hilo actual
+        """
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        stats['open'] = len(cls._get_open_aliases())
+        stats['max_open'] = cls.get_max_connections()
+        return stats
+
+    @classmethod
+    def _get_open_aliases(cls):
+        """Alias de negocios con conexión en el hilo actual, del menos al más reciente"""
+        open_aliases = getattr(cls._local, 'aliases', None)
+        if open_aliases is None:
+            open_aliases = OrderedDict()
+            cls._local.aliases = open_aliases
+        return open_aliases
+
+    @classmethod
+    def _evict(cls, open_aliases, keep):
+        """Cierra las conexiones ociosas menos usadas hasta volver al máximo"""
+        max_connections = cls.get_max_connections()
+        for alias in list(open_aliases):
+            if len(open_aliases) <= max_connections:
+                break
+            if alias == keep:
+                continue
+
+            try:
+                connection = connections[alias]
+            except ConnectionDoesNotExist:
+                # El alias ya fue eliminado de DATABASES
+                del open_aliases[alias]
+                continue
+
+            # Una conexión dentro de una transacción no está ociosa
+            if connection.in_atomic_block:
+                continue
+
+            connection.close()
+            del connections[alias]
+            del open_aliases[alias]
+            cls._increment('evictions')
+            logger.debug("Cerrada conexión ociosa %s", alias)
+
+    @classmethod
+    def _increment(cls, counter):
+        with cls._stats_lock:
+            cls._stats[counter] += 1
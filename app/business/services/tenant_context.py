@@ -0,0 +1,162 @@
+# Django
+from django.db import connections
+
+# Models
+from app.business.models.tenant import TenantDatabase
+
+# Services
+from app.business.services.tenant_registry import TenantRegistry
+from app.business.services.tenant_migration_service import TenantMigrationService
+
+# Contexto del negocio actual
+from config.middleware import activate_business, deactivate_business, set_current_db_alias
+
+# Management
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import functools
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantNotRegistered(LookupError):
+    """El negocio no tiene base de datos registrada"""
+
+
+class TenantBatchError(Exception):
+    """
+    Uno o más negocios fallaron en una ejecución de for_each_tenant.
+
+    Attributes:
+        errors (dict): business_id -> excepción
+        results (dict): business_id -> resultado de los negocios que terminaron bien
+    """
+
+    def __init__(self, errors, results):
+        self.errors = errors
+        self.results = results
+        super().__init__(f"{len(errors)} negocio(s) con error: {', '.join(str(business_id) for business_id in sorted(errors))}")
+
+
+@contextmanager
+def tenant(business):
+    """
+    Ejecuta un bloque con un negocio activo, como lo haría BusinessMiddleware.
+
+    Registra la conexión del negocio si hace falta, dirige las consultas de los
+    modelos de negocio a su base de datos y, al salir, restaura el negocio
+    anterior y cierra la conexión si la abrió el bloque.
+
+        with tenant(business):
+            Order.objects.count()
+
+    Args:
+        business (Business | int): Negocio o su ID
+
+    Yields:
+        str: Alias de conexión del negocio
+
+    Raises:
+        TenantNotRegistered: Si el negocio no tiene base de datos registrada
+    """
+    business_id = getattr(business, 'pk', business)
+    # Los workers y comandos no pasan por BusinessMiddleware: aplican aquí los cambios de otros procesos
+    TenantRegistry.maybe_refresh()
+    alias = TenantRegistry.resolve(business_id)
+    if alias is None:
+        raise TenantNotRegistered(f"El negocio {business_id} no tiene base de datos registrada")
+
+    # Con shards o PostgreSQL el alias es compartido: solo se cierra si lo abrió este bloque
+    was_open = connections[alias].connection is not None
+    tokens = activate_business(business_id)
+    try:
+        TenantRegistry.activate(business_id)
+        set_current_db_alias(alias)
+        yield alias
+    finally:
+        deactivate_business(tokens)
+        if not was_open and not connections[alias].in_atomic_block:
+            connections[alias].close()
+
+
+def for_each_tenant(parallel=1, processes=False):
+    """
+    Decorador que ejecuta una función una vez por negocio dentro de tenant().
+
+    La función recibe el business_id como primer argumento. La función decorada
+    acepta businesses= (IDs o negocios; por defecto todos los registrados) y
+    devuelve un diccionario business_id -> resultado. Los errores de un negocio
+    no detienen a los demás: al terminar se lanza TenantBatchError con los
+    errores y los resultados parciales.
+
+        @for_each_tenant(parallel=8)
+        def count_orders(business_id):
+            return Order.objects.count()
+
+        totals = count_orders()
+
+    Args:
+        parallel (int): Negocios procesados a la vez
+        processes (bool): Usar procesos en lugar de hilos (la función debe estar
+            definida a nivel de módulo)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, businesses=None, **kwargs):
+            if businesses is None:
+                business_ids = list(TenantDatabase.objects.using('default').order_by(
+                    'business_id'
+                ).values_list('business_id', flat=True))
+            else:
+                business_ids = [getattr(business, 'pk', business) for business in businesses]
+
+            results = {}
+            errors = {}
+            if parallel <= 1:
+                for business_id in business_ids:
+                    try:
+                        with tenant(business_id):
+                            results[business_id] = func(business_id, *args, **kwargs)
+                    except Exception as e:
+                        logger.exception("Error en %s para el negocio %s", func.__name__, business_id)
+                        errors[business_id] = e
+            else:
+                if processes:
+                    # Se envía el decorador (importable por nombre), no la función original
+                    pool = ProcessPoolExecutor(max_workers=parallel, initializer=TenantMigrationService.init_worker)
+                    target = wrapper
+                else:
+                    pool = ThreadPoolExecutor(max_workers=parallel)
+                    target = func
+                with pool:
+                    futures = {
+                        pool.submit(_run_in_tenant, target, business_id, args, kwargs): business_id
+                        for business_id in business_ids
+                    }
+                    for future in as_completed(futures):
+                        business_id = futures[future]
+                        try:
+                            results[business_id] = future.result()
+                        except Exception as e:
+                            logger.error("Error en %s para el negocio %s: %s", func.__name__, business_id, e)
+                            errors[business_id] = e
+
+            results = dict(sorted(results.items()))
+            if errors:
+                raise TenantBatchError(errors, results)
+            return results
+        return wrapper
+    return decorator
+
+
+def _run_in_tenant(func, business_id, args, kwargs):
+    """Ejecuta una función para un negocio en un hilo o proceso del pool"""
+    func = getattr(func, '__wrapped__', func)
+    try:
+        with tenant(business_id):
+            return func(business_id, *args, **kwargs)
+    finally:
+        # Las conexiones de Django son por hilo: las del hilo del pool no se reutilizan
+        connections.close_all()
@@ -0,0 +1,252 @@
+# Django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import QuerySet
+
+# Models
+from app.business.models.tenant import TenantDatabase
+from app.business.models.tenant_scoped import TenantScopedModel
+
+# Services
+from app.business.services.tenant_context import tenant
+from app.business.services.tenant_storage import ShardedSQLiteTenantStorage, get_tenant_storage
+
+# Management
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, NamedTuple, Optional
+import logging
+import sqlite3
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantQueryTimeout(Exception):
+    """La consulta de un negocio superó el tiempo máximo"""
+
+
+class TenantResult(NamedTuple):
+    """Resultado de la consulta en un negocio"""
+    business_id: int
+    result: Any = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class TenantFanoutService:
+    """
+    Ejecuta la misma consulta en muchos negocios a la vez para reportes de plataforma.
+
+    Cada negocio se consulta en un hilo de un pool acotado dentro de tenant(), y
+    los resultados se entregan a medida que terminan, etiquetados con el ID del
+    negocio. Un negocio que falla o supera el tiempo máximo no detiene a los demás:
+    su resultado lleva el error. Por defecto la conexión del negocio queda en solo
+    lectura mientras se ejecuta la consulta.
+
+    Con shards varios negocios comparten las tablas: el SQL crudo y las funciones
+    solo ven las filas del negocio consultado (_business_rows) y no pueden
+    escribir en las tablas de TenantScopedModel.
+    """
+
+    # Cada cuántas instrucciones de SQLite se comprueba el tiempo máximo
+    PROGRESS_STEPS = 1000
+
+    @staticmethod
+    def get_business_ids(businesses=None):
+        """IDs de los negocios indicados o de todos los registrados"""
+        if businesses is not None:
+            return [getattr(business, 'pk', business) for business in businesses]
+        return list(TenantDatabase.objects.using('default').order_by('business_id').values_list('business_id', flat=True))
+
+    @classmethod
+    def run(cls, query, businesses=None, params=None, workers=None, timeout=None, read_only=True):
+        """
+        Ejecuta una consulta en cada negocio y entrega los resultados según terminan.
+
+        Args:
+            query: QuerySet (se evalúa en la base de datos de cada negocio), SQL
+                crudo (devuelve las filas) o función que recibe el business_id;
+                con shards solo ven las filas del negocio
+            businesses (list): Negocios o IDs; por defecto todos los registrados
+            params (list | dict | callable): Parámetros del SQL o función
+                business_id -> parámetros
+            workers (int): Negocios consultados a la vez (TENANT_FANOUT_WORKERS)
+            timeout (float): Segundos máximos por negocio (TENANT_FANOUT_TIMEOUT)
+            read_only (bool): Rechazar las escrituras (PRAGMA query_only en
+                SQLite, SET TRANSACTION READ ONLY en PostgreSQL)
+
+        Yields:
+            TenantResult: Resultado o error de cada negocio
+        """
+        if workers is None:
+            workers = getattr(settings, 'TENANT_FANOUT_WORKERS', 16)
+        if timeout is None:
+            timeout = getattr(settings, 'TENANT_FANOUT_TIMEOUT', 10)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='tenant-fanout')
+        try:
+            futures = [
+                pool.submit(cls._run_one, query, business_id, params, timeout, read_only)
+                for business_id in cls.get_business_ids(businesses)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Si el consumidor deja de iterar no se consultan los negocios pendientes
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def collect(cls, query, **kwargs):
+        """
+        Ejecuta run() hasta el final.
+
+        Returns:
+            tuple: (dict business_id -> resultado, dict business_id -> error)
+        """
+        results = {}
+        errors = {}
+        for item in cls.run(query, **kwargs):
+            if item.ok:
+                results[item.business_id] = item.result
+            else:
+                errors[item.business_id] = item.error
+        return dict(sorted(results.items())), dict(sorted(errors.items()))
+
+    @classmethod
+    def _run_one(cls, query, business_id, params, timeout, read_only=True):
+        """Consulta un negocio; nunca lanza excepciones, el error va en el resultado"""
+        start = time.perf_counter()
+        try:
+            with tenant(business_id) as alias:
+                connection = connections[alias]
+                with cls._deadline(connection, timeout), cls._business_rows(connection, business_id):
+                    if read_only:
+                        with cls._read_only(connection):
+                            result = cls._execute(query, business_id, alias, params)
+                    else:
+                        result = cls._execute(query, business_id, alias, params)
+            return TenantResult(business_id, result, None, time.perf_counter() - start)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            if timeout and elapsed >= timeout:
+                e = TenantQueryTimeout(f"El negocio {business_id} superó {timeout}s")
+            logger.warning("Error consultando el negocio %s: %s", business_id, e)
+            return TenantResult(business_id, None, e, elapsed)
+        finally:
+            # Las conexiones de Django son por hilo: las del hilo del pool no se reutilizan
+            connections.close_all()
+
+    @staticmethod
+    def _execute(query, business_id, alias, params):
+        if isinstance(query, QuerySet):
+            queryset = query.using(alias)
+            # Con shards varios negocios comparten tablas
+            if issubclass(queryset.model, TenantScopedModel):
+                queryset = queryset.filter(business_id=business_id)
+            return list(queryset)
+
+        if isinstance(query, str):
+            if callable(params):
+                params = params(business_id)
+            with connections[alias].cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+
+        return query(business_id)
+
+    @staticmethod
+    @contextmanager
+    def _business_rows(connection, business_id):
+        """
+        Con shards, limita la conexión a las filas del negocio durante el bloque.
+
+        Cada tabla de TenantScopedModel queda tapada por una vista temporal con
+        el mismo nombre filtrada por business_id (los nombres sin schema se
+        buscan antes en temp) y el autorizador de SQLite rechaza usar las tablas
+        originales fuera de esas vistas (p. ej. main.tabla), también para escribir.
+        """
+        if not isinstance(get_tenant_storage(), ShardedSQLiteTenantStorage):
+            yield
+            return
+        tables = {model._meta.db_table for model in TenantScopedModel.get_tenant_models()}
+        if not tables:
+            yield
+            return
+
+        connection.ensure_connection()
+        raw = connection.connection
+        quote = connection.ops.quote_name
+        # Antes de PRAGMA query_only, que también impide crear vistas temporales
+        for table in tables:
+            raw.execute(
+                f"CREATE TEMP VIEW {quote(table)} AS "
+                f"SELECT * FROM main.{quote(table)} WHERE business_id = {int(business_id)}"
+            )
+        direct = (sqlite3.SQLITE_READ, sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE)
+
+        def authorize(action, table, column, database, view):
+            if action in direct and database == 'main' and table in tables and view is None:
+                return sqlite3.SQLITE_DENY
+            return sqlite3.SQLITE_OK
+
+        raw.set_authorizer(authorize)
+        try:
+            yield
+        finally:
+            raw.set_authorizer(None)
+            for table in tables:
+                raw.execute(f"DROP VIEW IF EXISTS temp.{quote(table)}")
+
+    @staticmethod
+    @contextmanager
+    def _read_only(connection):
+        """Rechaza las escrituras en la conexión durante el bloque"""
+        if connection.vendor == 'sqlite':
+            connection.ensure_connection()
+            connection.connection.execute("PRAGMA query_only = ON")
+            try:
+                yield
+            finally:
+                connection.connection.execute("PRAGMA query_only = OFF")
+        elif connection.vendor == 'postgresql':
+            # Debe ser lo primero de la transacción; al salir se descarta con ella
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION READ ONLY")
+                yield
+        else:
+            yield
+
+    @classmethod
+    @contextmanager
+    def _deadline(cls, connection, timeout):
+        """Interrumpe las consultas de la conexión que superen el tiempo máximo"""
+        if not timeout:
+            yield
+            return
+
+        connection.ensure_connection()
+        if connection.vendor == 'sqlite':
+            deadline = time.monotonic() + timeout
+            # Un valor distinto de cero aborta la consulta en curso ('interrupted')
+            connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, cls.PROGRESS_STEPS)
+            try:
+                yield
+            finally:
+                connection.connection.set_progress_handler(None, 0)
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s", [int(timeout * 1000)])
+            try:
+                yield
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET statement_timeout = 0")
+        else:
+            yield
@@ -0,0 +1,199 @@
+# Django
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+
+# Models
+from app.business.models.tenant import TenantDatabase
+
+# Services
+from app.business.services.migration_service import MigrationStateService
+from app.business.services.tenant_registry import TenantRegistry
+from app.business.services.tenant_storage import get_tenant_storage
+
+# Management
+import json
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantMigrationService:
+    """
+    Servicio para migrar las bases de datos de negocios.
+
+    Los negocios se obtienen del registro (TenantDatabase) y cada resultado se
+    guarda en un journal JSON lines junto con la huella del grafo de migraciones,
+    así una ejecución interrumpida puede retomarse sin repetir los negocios ya migrados.
+    """
+
+    @staticmethod
+    def get_tenants():
+        """
+        Obtiene los negocios registrados cuya base de datos existe.
+
+        Con shards varios negocios comparten ubicación; se devuelve uno por
+        ubicación para migrar cada shard una sola vez.
+
+        Returns:
+            tuple: (lista de (business_id, alias, ubicación), lista de alias sin base de datos)
+        """
+        storage = get_tenant_storage()
+        tenants = []
+        missing = []
+        seen = set()
+        entries = TenantDatabase.objects.using('default').order_by('business_id').values_list(
+            'business_id', 'alias', 'name'
+        )
+        for business_id, alias, name in entries:
+            if name in seen:
+                continue
+            seen.add(name)
+            if storage.exists(name):
+                tenants.append((business_id, alias, name))
+            else:
+                missing.append(alias)
+        return tenants, missing
+
+    @staticmethod
+    def get_journal_path():
+        """Ruta del journal de progreso de las migraciones"""
+        return getattr(settings, 'TENANT_MIGRATION_JOURNAL', settings.BASE_DIR / 'tenant_migrations.jsonl')
+
+    @classmethod
+    def read_completed(cls, fingerprint):
+        """
+        Alias ya migrados con éxito para la huella de migraciones indicada.
+
+        Args:
+            fingerprint (str): Huella del grafo de migraciones actual
+
+        Returns:
+            set: Alias completados
+        """
+        completed = set()
+        path = cls.get_journal_path()
+        if not os.path.exists(path):
+            return completed
+
+        with open(path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Línea truncada por una ejecución interrumpida
+                    continue
+                if entry.get('fingerprint') != fingerprint:
+                    continue
+                if entry.get('status') == 'ok':
+                    completed.add(entry['alias'])
+                else:
+                    completed.discard(entry['alias'])
+        return completed
+
+    @classmethod
+    def reset_journal(cls):
+        """Elimina el journal para migrar de nuevo todos los negocios"""
+        try:
+            os.remove(cls.get_journal_path())
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def open_journal(cls):
+        """Abre el journal en modo append, una línea por negocio procesado"""
+        return open(cls.get_journal_path(), 'a', encoding='utf-8')
+
+    @staticmethod
+    def write_entry(journal, fingerprint, result):
+        """Guarda el resultado de un negocio en el journal y lo persiste de inmediato"""
+        entry = dict(result, fingerprint=fingerprint)
+        journal.write(json.dumps(entry) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    @staticmethod
+    def split_up_to_date(tenants):
+        """
+        Separa los negocios cuya huella de migraciones coincide con la del código.
+
+        Args:
+            tenants (list): Tuplas (business_id, alias, ubicación)
+
+        Returns:
+            tuple: (negocios al día, negocios por migrar)
+        """
+        storage = get_tenant_storage()
+        up_to_date = []
+        outdated = []
+        for tenant in tenants:
+            if storage.is_schema_current(tenant[2]):
+                up_to_date.append(tenant)
+            else:
+                outdated.append(tenant)
+        return up_to_date, outdated
+
+    @staticmethod
+    def get_plan(tenants):
+        """
+        Agrupa los negocios según las migraciones que les faltan.
+
+        Args:
+            tenants (list): Tuplas (business_id, alias, ubicación) desactualizadas
+
+        Returns:
+            dict: tupla de migraciones pendientes -> lista de alias
+        """
+        storage = get_tenant_storage()
+        plan = {}
+        for business_id, alias, name in tenants:
+            missing = MigrationStateService.get_missing_migrations(storage.get_applied_migrations(name))
+            plan.setdefault(missing, []).append(alias)
+        return plan
+
+    @staticmethod
+    def init_worker():
+        """Inicializa Django en un proceso del pool sin heredar conexiones abiertas"""
+        if not apps.ready:
+            django.setup()
+        connections.close_all()
+
+    @staticmethod
+    def migrate_tenant(business_id, alias, db_path):
+        """
+        Aplica las migraciones pendientes a la base de datos de un negocio
+        y guarda la huella de migraciones al terminar.
+
+        Args:
+            business_id (int): ID del negocio
+            alias (str): Alias de conexión registrado
+            db_path (str): Ubicación registrada (archivo SQLite o schema)
+
+        Returns:
+            dict: alias, business_id, status ('ok' o 'failed'), seconds y error
+        """
+        start = time.perf_counter()
+        result = {'alias': alias, 'business_id': business_id, 'status': 'ok', 'error': None}
+        db_alias = None
+        try:
+            db_alias = TenantRegistry.resolve(business_id)
+            if db_alias is None:
+                raise RuntimeError(f"{alias} ya no está registrado")
+            TenantRegistry.activate(business_id)
+            call_command('migrate', database=db_alias, interactive=False, verbosity=0)
+            get_tenant_storage().mark_schema_current(db_path)
+        except Exception as e:
+            logger.error("Error al migrar %s: %s", alias, e)
+            result['status'] = 'failed'
+            result['error'] = str(e)
+        finally:
+            if db_alias is not None:
+                connections[db_alias].close()
+        result['seconds'] = round(time.perf_counter() - start, 3)
+        return result
+
@@ -0,0 +1,195 @@
+# Django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+
+# Models
+from app.business.models.business import Business
+from app.business.models.tenant import TenantArchive, TenantDatabase, TenantTombstone
+from app.roles.models.role import BusinessRole
+
+# Services
+from app.business.services.tenant_registry import TenantRegistry
+from app.business.services.tenant_storage import ShardedSQLiteTenantStorage, get_tenant_storage
+
+# Management
+from pathlib import Path
+import logging
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantProvisioningBusy(Exception):
+    """Otro proceso está aprovisionando la base de datos del mismo negocio"""
+
+
+class TenantLocationConflict(Exception):
+    """La ubicación de la base de datos de un negocio pertenece a otro negocio"""
+
+
+class TenantLock:
+    """
+    Bloqueo exclusivo entre procesos para aprovisionar un negocio.
+
+    Usa un archivo por negocio bloqueado con flock (o msvcrt en Windows); el
+    sistema operativo lo libera aunque el proceso termine de forma abrupta.
+    """
+
+    def __init__(self, business_id):
+        lock_dir = Path(getattr(settings, 'TENANT_LOCK_DIR', settings.BASE_DIR / 'tenant_locks'))
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        self.path = lock_dir / f"business_{business_id}.lock"
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self.fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(self.fd)
+            self.fd = None
+            raise TenantProvisioningBusy(str(self.path))
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        else:
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+        self.fd = None
+
+
+class TenantProvisioningService:
+    """
+    Máquina de estados que aprovisiona la base de datos de un negocio.
+
+    Cada paso comprueba el estado real antes de actuar, así repetirlo no tiene
+    efecto y un aprovisionamiento interrumpido se retoma desde donde quedó.
+    El último paso completado se guarda en Business.provisioning_step.
+    """
+
+    STEPS = ('file_created', 'schema_applied', 'roles_seeded', 'registered')
+
+    @staticmethod
+    def get_db_path(business):
+        """Ubicación de la base de datos del negocio (la registrada, si ya existe)"""
+        return TenantRegistry.get_registered_path(business.id) or get_tenant_storage().get_location(business)
+
+    @classmethod
+    def provision(cls, business):
+        """
+        Deja la base de datos del negocio lista para usarse.
+
+        Args:
+            business (Business): Negocio a aprovisionar
+
+        Returns:
+            bool: True cuando el negocio queda registrado
+
+        Raises:
+            TenantProvisioningBusy: Si otro proceso lo está aprovisionando o la
+                ubicación aún tiene una base de datos pendiente de purgar
+            TenantLocationConflict: Si la ubicación pertenece a otro negocio
+        """
+        # Camino rápido para llamadas duplicadas: sin bloqueo ni acceso a disco
+        if cls._get_step(business.id) == 'registered' and TenantRegistry.resolve(business.id):
+            return True
+
+        with TenantLock(business.id):
+            db_path = cls.get_db_path(business)
+            cls._check_location(business.id, db_path)
+            logger.info("Aprovisionando negocio %s en %s", business.id, db_path)
+
+            cls._create_file(db_path)
+            cls._set_step(business.id, 'file_created')
+
+            cls._apply_schema(business.id, db_path)
+            cls._set_step(business.id, 'schema_applied')
+
+            cls._seed_roles(business)
+            cls._set_step(business.id, 'roles_seeded')
+
+            TenantRegistry.register(business, db_path)
+            cls._set_step(business.id, 'registered', provisioning_status='ready')
+
+        logger.info("Negocio %s aprovisionado", business.id)
+        return True
+
+    @staticmethod
+    def _get_step(business_id):
+        return Business.objects.filter(pk=business_id).values_list('provisioning_step', flat=True).first()
+
+    @staticmethod
+    def _set_step(business_id, step, **fields):
+        # update() evita los efectos de Business.save (roles, propietario, cola)
+        Business.objects.filter(pk=business_id).update(provisioning_step=step, **fields)
+
+    @staticmethod
+    def _check_location(business_id, db_path):
+        """
+        Comprueba que la ubicación no pertenece a otro negocio antes de usarla.
+
+        Un archivo existente solo se adopta si es de un aprovisionamiento
+        interrumpido del mismo negocio: nunca el de otro negocio registrado o
+        archivado (p. ej. un archivo antiguo nombrado por el negocio) ni uno
+        pendiente de purgar.
+        """
+        # Con shards la ubicación es compartida; lo que importa son las filas del negocio
+        shared = isinstance(get_tenant_storage(), ShardedSQLiteTenantStorage)
+        if not shared:
+            for model in (TenantDatabase, TenantArchive):
+                if model.objects.using('default').filter(name=db_path).exclude(business_id=business_id).exists():
+                    raise TenantLocationConflict(f"{db_path} pertenece a otro negocio")
+
+        tombstones = TenantTombstone.objects.using('default').filter(name=db_path, purged_at__isnull=True)
+        if shared:
+            tombstones = tombstones.filter(business_id=business_id)
+        if not tombstones.exists():
+            return
+        max_attempts = getattr(settings, 'TENANT_PURGE_MAX_ATTEMPTS', 5)
+        if tombstones.filter(attempts__gte=max_attempts).exists():
+            raise TenantLocationConflict(f"{db_path} tiene una lápida que no se pudo purgar")
+        # Se reintenta cuando purge_tenants la haya borrado
+        raise TenantProvisioningBusy(f"{db_path} está pendiente de purga")
+
+    @staticmethod
+    def _create_file(db_path):
+        """Crea la base de datos (archivo o schema) si no existe"""
+        storage = get_tenant_storage()
+        if not storage.exists(db_path):
+            storage.create(db_path)
+
+    @staticmethod
+    def _apply_schema(business_id, db_path):
+        """Aplica las migraciones pendientes si la huella de la base de datos no coincide con el código"""
+        storage = get_tenant_storage()
+        if storage.is_schema_current(db_path):
+            return
+
+        alias = TenantRegistry.connect(business_id, db_path)
+        try:
+            storage.activate(alias, db_path)
+            call_command('migrate', database=alias, interactive=False, verbosity=0)
+            storage.mark_schema_current(db_path)
+        finally:
+            connections[alias].close()
+
+    @staticmethod
+    def _seed_roles(business):
+        """Crea los roles predeterminados si el negocio aún no tiene roles"""
+        if BusinessRole.objects.filter(business_id=business.id).exists():
+            return
+        from app.roles.services.role_service import BusinessRoleService
+        BusinessRoleService.create_business_roles(business)
@@ -0,0 +1,308 @@
+# Django
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Models
+from app.business.models.tenant import TenantDatabase, TenantRegistryChange
+
+# Services
+from app.business.services.tenant_storage import get_tenant_storage
+
+# Management
+from contextlib import contextmanager
+from datetime import timedelta
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TenantUnavailable(Exception):
+    """La base de datos del negocio existe pero ahora no se puede usar (restaurándose o movida)"""
+
+
+class TenantFence:
+    """
+    Bloqueo de escrituras de un negocio compartido por todos los procesos.
+
+    Se guarda en la caché compartida, así que se aplica de inmediato en todos
+    los procesos, sin esperar a que refresquen el registro. El router lo
+    comprueba en cada escritura de un modelo del negocio y responde con
+    TenantUnavailable. Se usa mientras se copia la base de datos de un negocio
+    a otra ubicación (archivado, cambio de shard).
+    """
+
+    KEY = 'tenant_fence:{business_id}'
+
+    @classmethod
+    def is_fenced(cls, business_id):
+        return cache.get(cls.KEY.format(business_id=business_id)) is not None
+
+    @classmethod
+    def check(cls, business_id):
+        """
+        Raises:
+            TenantUnavailable: Si las escrituras del negocio están bloqueadas
+        """
+        if business_id and cls.is_fenced(business_id):
+            raise TenantUnavailable(f"El negocio {business_id} no admite escrituras en este momento")
+
+    @classmethod
+    @contextmanager
+    def hold(cls, business_id, reason):
+        """
+        Bloquea las escrituras del negocio durante el bloque.
+
+        Al entrar espera TENANT_FENCE_GRACE segundos para que terminen las
+        escrituras que ya pasaron la comprobación. Si el bloque termina bien el
+        bloqueo se mantiene hasta que todos los procesos hayan aplicado el
+        cambio del registro (TENANT_REGISTRY_CHECK_SECONDS más el margen); si
+        falla se libera de inmediato porque el registro no cambió.
+        """
+        key = cls.KEY.format(business_id=business_id)
+        grace = getattr(settings, 'TENANT_FENCE_GRACE', 2)
+        # La caducidad evita un bloqueo permanente si el proceso muere
+        cache.set(key, reason, getattr(settings, 'TENANT_FENCE_TIMEOUT', 3600))
+        try:
+            time.sleep(grace)
+            yield
+        except BaseException:
+            cache.delete(key)
+            raise
+        propagation = getattr(settings, 'TENANT_REGISTRY_CHECK_SECONDS', 5) + grace
+        cache.set(key, reason, max(1, int(propagation + 0.999)))
+
+
+class TenantRegistry:
+    """
+    Registro de bases de datos de negocios compartido por todos los procesos.
+
+    Las entradas se guardan en la base de datos default (TenantDatabase) y la
+    conexión de un negocio solo se añade la primera vez que se usa, así el
+    arranque no depende del número de negocios. Cómo se conecta cada negocio lo
+    decide la estrategia de almacenamiento (TENANT_STORAGE).
+
+    Cada cambio de TenantDatabase queda en TenantRegistryChange; los procesos
+    comparan su versión con la del registro cada TENANT_REGISTRY_CHECK_REQUESTS
+    peticiones (o TENANT_REGISTRY_CHECK_SECONDS segundos) y cuando no encuentran
+    un negocio, y descartan solo las entradas que cambiaron.
+    """
+
+    _lock = threading.RLock()
+    # business_id -> alias al que el router dirige las consultas en este proceso
+    _aliases = {}
+    # business_id -> ubicación registrada (archivo o schema)
+    _locations = {}
+    # Último cambio del registro aplicado en este proceso (None = aún sin leer)
+    _version = None
+    _requests_since_check = 0
+    _last_check = 0.0
+
+    @staticmethod
+    def get_alias(business_id):
+        """Alias de conexión que usa el router para un negocio"""
+        return f"business_{business_id}"
+
+    @classmethod
+    def resolve(cls, business_id):
+        """
+        Obtiene el alias de conexión de un negocio, registrándolo si es la primera vez.
+
+        Args:
+            business_id (int): ID del negocio
+
+        Returns:
+            str: Alias de conexión o None si el negocio no tiene base de datos
+
+        Raises:
+            TenantUnavailable: Si la base de datos archivada no se puede restaurar ahora
+        """
+        alias = cls._aliases.get(business_id)
+        if alias is not None:
+            return alias
+
+        with cls._lock:
+            alias = cls._aliases.get(business_id)
+            if alias is not None:
+                return alias
+
+            # Se consulta explícitamente en default para no pasar por el router
+            entry = TenantDatabase.objects.using('default').filter(
+                business_id=business_id
+            ).values_list('alias', 'name').first()
+            if entry is not None:
+                alias, name = entry
+                route_alias = get_tenant_storage().connect(alias, name)
+                cls._locations[business_id] = name
+                cls._aliases[business_id] = route_alias
+                return route_alias
+
+            # Fallo de enrutamiento: puede que otro proceso haya cambiado el registro
+            cls.refresh()
+
+        # Fuera del bloqueo: la restauración puede tardar y no debe frenar a otros negocios
+        return cls._restore_archived(business_id)
+
+    @staticmethod
+    def _restore_archived(business_id):
+        """Restaura bajo demanda la base de datos archivada de un negocio"""
+        from app.business.services.archive_service import TenantArchiveService
+        from app.business.services.tenant_provisioning import TenantProvisioningBusy
+
+        if not TenantArchiveService.is_archived(business_id):
+            return None
+        try:
+            return TenantArchiveService.restore(business_id)
+        except TenantProvisioningBusy as e:
+            # Se está restaurando o se acaba de archivar: error explícito, nunca la base de datos default
+            raise TenantUnavailable(str(e))
+
+    @classmethod
+    def activate(cls, business_id):
+        """Prepara la conexión de un negocio ya resuelto para la petición actual"""
+        get_tenant_storage().activate(cls._aliases[business_id], cls._locations[business_id])
+
+    @classmethod
+    def is_registered(cls, business_id):
+        """Indica si el negocio tiene base de datos registrada, sin conectarla ni restaurarla"""
+        return business_id in cls._aliases or cls.get_registered_path(business_id) is not None
+
+    @staticmethod
+    def get_registered_path(business_id):
+        """Ruta registrada de la base de datos de un negocio o None"""
+        return TenantDatabase.objects.using('default').filter(
+            business_id=business_id
+        ).values_list('name', flat=True).first()
+
+    @classmethod
+    def connect(cls, business_id, db_path):
+        """
+        Añade la conexión de un negocio sin registrarlo, para prepararlo antes de publicarlo.
+
+        Returns:
+            str: Alias de conexión
+        """
+        with cls._lock:
+            return get_tenant_storage().connect(cls.get_alias(business_id), str(db_path))
+
+    @classmethod
+    def register(cls, business, db_path):
+        """
+        Guarda la base de datos de un negocio en el registro y la deja lista para usarse.
+
+        Args:
+            business (Business): Negocio propietario de la base de datos
+            db_path (Path | str): Ubicación de la base de datos (archivo SQLite o schema)
+
+        Returns:
+            str: Alias al que se dirigen las consultas del negocio
+        """
+        alias = cls.get_alias(business.id)
+        with cls._lock:
+            TenantDatabase.objects.using('default').update_or_create(
+                business_id=business.id,
+                defaults={'alias': alias, 'name': str(db_path)}
+            )
+            route_alias = get_tenant_storage().connect(alias, str(db_path))
+            cls._locations[business.id] = str(db_path)
+            cls._aliases[business.id] = route_alias
+        return route_alias
+
+    @classmethod
+    def unregister(cls, business_id):
+        """
+        Elimina la base de datos de un negocio del registro y de la configuración en runtime.
+
+        Args:
+            business_id (int): ID del negocio
+
+        Returns:
+            str: Ubicación que estaba registrada o None si no había entrada
+        """
+        with cls._lock:
+            entry = TenantDatabase.objects.using('default').filter(
+                business_id=business_id
+            ).values_list('alias', 'name').first()
+            alias = entry[0] if entry else cls.get_alias(business_id)
+
+            TenantDatabase.objects.using('default').filter(business_id=business_id).delete()
+            cls._aliases.pop(business_id, None)
+            cls._locations.pop(business_id, None)
+            get_tenant_storage().disconnect(alias)
+
+        return entry[1] if entry else None
+
+    @classmethod
+    def record_change(cls, business_id):
+        """
+        Publica un cambio de la entrada de un negocio para los demás procesos.
+
+        Args:
+            business_id (int): ID del negocio cuya entrada cambió
+        """
+        TenantRegistryChange.objects.using('default').create(business_id=business_id)
+
+        # Los cambios son poco frecuentes: la limpieza no afecta a las peticiones
+        retention = getattr(settings, 'TENANT_REGISTRY_CHANGE_RETENTION', 86400)
+        TenantRegistryChange.objects.using('default').filter(
+            created_at__lt=timezone.now() - timedelta(seconds=retention)
+        ).delete()
+
+    @classmethod
+    def needs_refresh(cls):
+        """Se llama en cada petición; indica si toca comprobar la versión (cada N peticiones o segundos)"""
+        cls._requests_since_check += 1
+        interval = getattr(settings, 'TENANT_REGISTRY_CHECK_REQUESTS', 100)
+        seconds = getattr(settings, 'TENANT_REGISTRY_CHECK_SECONDS', 5)
+        return cls._requests_since_check >= interval or time.monotonic() - cls._last_check >= seconds
+
+    @classmethod
+    def maybe_refresh(cls):
+        """Aplica los cambios de otros procesos si toca comprobar la versión"""
+        if cls.needs_refresh():
+            cls.refresh()
+
+    @classmethod
+    def refresh(cls):
+        """
+        Aplica los cambios del registro hechos por otros procesos.
+
+        Returns:
+            int: Negocios descartados de la caché de este proceso
+        """
+        with cls._lock:
+            cls._requests_since_check = 0
+            cls._last_check = time.monotonic()
+
+            changes = TenantRegistryChange.objects.using('default')
+            latest = changes.order_by('-id').values_list('id', flat=True).first() or 0
+            if latest == cls._version:
+                return 0
+
+            oldest = changes.order_by('id').values_list('id', flat=True).first()
+            if cls._version is None or (oldest is not None and oldest > cls._version + 1):
+                # Primera lectura o cambios ya purgados: no se sabe qué cambió
+                business_ids = set(cls._aliases)
+            else:
+                business_ids = set(changes.filter(
+                    id__gt=cls._version, id__lte=latest
+                ).values_list('business_id', flat=True))
+
+            for business_id in business_ids:
+                cls._forget(business_id)
+            cls._version = latest
+
+        if business_ids:
+            logger.info("Registro de negocios en versión %s: %s entradas recargadas", latest, len(business_ids))
+        return len(business_ids)
+
+    @classmethod
+    def _forget(cls, business_id):
+        """Descarta la entrada de un negocio; se vuelve a leer en el próximo resolve"""
+        cls._aliases.pop(business_id, None)
+        cls._locations.pop(business_id, None)
+        # La configuración de la conexión puede apuntar a una ubicación que ya no es válida
+        get_tenant_storage().disconnect(cls.get_alias(business_id))
@@ -0,0 +1,277 @@
+# Django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils.module_loading import import_string
+
+# Services
+from app.business.services.migration_service import MigrationStateService
+from app.business.services.shard_ring import ShardRing
+from app.business.services.tenant_connections import TenantConnectionManager
+
+# Management
+import importlib
+import logging
+import os
+import sqlite3
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteTenantStorage:
+    """
+    Un archivo SQLite por negocio, con un alias de conexión propio.
+
+    La ubicación de cada negocio es la ruta de su archivo.
+    """
+
+    name = 'sqlite'
+
+    def get_location(self, business):
+        """Ubicación para un negocio nuevo"""
+        # Por ID, como en PostgreSQL: un negocio nuevo con el mismo nombre no recibe el archivo de otro
+        return str(settings.BASE_DIR / f"db_business_{business.id}.sqlite3")
+
+    @staticmethod
+    def get_legacy_location(business_name):
+        """Archivo con el nombre del negocio, como se creaban antes del registro (la migración 0004 los registra)"""
+        return str(settings.BASE_DIR / f"db_business_{business_name}.sqlite3")
+
+    def exists(self, location):
+        return os.path.exists(location)
+
+    def create(self, location):
+        """Crea el archivo: copia de la plantilla migrada o archivo vacío según TENANT_PROVISIONING_MODE"""
+        if getattr(settings, 'TENANT_PROVISIONING_MODE', 'template') == 'template':
+            # La copia se publica con os.replace: el archivo existe completo o no existe
+            from app.business.services.template_service import TenantTemplateService
+            TenantTemplateService.clone_template(location)
+        else:
+            self.create_empty(location)
+
+    @staticmethod
+    def create_empty(location):
+        """Archivo SQLite vacío con auto_vacuum incremental (solo se puede fijar antes de crear tablas)"""
+        connection = sqlite3.connect(location)
+        try:
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
+
+    def drop(self, location, business_id=None):
+        # Un -wal huérfano podría aplicarse a un archivo nuevo con el mismo nombre
+        for path in (location, f"{location}-wal", f"{location}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def connect(self, alias, location):
+        """
+        Añade el alias a DATABASES copiando la configuración de default.
+
+        Returns:
+            str: Alias al que el router debe dirigir las consultas del negocio
+        """
+        if alias not in settings.DATABASES:
+            config = settings.DATABASES['default'].copy()
+            config['NAME'] = location
+            settings.DATABASES[alias] = config
+            logger.info("Registrada base de datos %s (%s)", alias, location)
+        return alias
+
+    def activate(self, alias, location):
+        """Se llama cuando una petición empieza a usar el negocio"""
+        # Mantener acotado el número de conexiones de negocios abiertas
+        TenantConnectionManager.touch(alias)
+
+    def disconnect(self, alias):
+        """Cierra la conexión del hilo actual y quita el alias de DATABASES"""
+        if alias not in settings.DATABASES:
+            return
+        TenantConnectionManager.discard(alias)
+        connections[alias].close()
+        del connections[alias]
+        del settings.DATABASES[alias]
+
+    def is_schema_current(self, location):
+        return MigrationStateService.is_up_to_date(location)
+
+    def mark_schema_current(self, location):
+        MigrationStateService.write_stamp(location)
+
+    def get_applied_migrations(self, location):
+        return MigrationStateService.get_applied_migrations(location)
+
+
+class PostgresSchemaTenantStorage:
+    """
+    Un schema de PostgreSQL por negocio sobre una única conexión compartida.
+
+    Todos los negocios usan el alias TENANT_POSTGRES_ALIAS (un solo pool de
+    conexiones); al activar un negocio se cambia el search_path de la conexión
+    del hilo actual a su schema. La ubicación de cada negocio es el nombre del schema.
+    """
+
+    name = 'postgres'
+
+    # Prefijo del comentario del schema donde se guarda la huella de migraciones
+    STAMP_PREFIX = 'migrations:'
+
+    def __init__(self):
+        # psycopg solo es necesario con esta estrategia
+        for module in ('psycopg', 'psycopg2'):
+            try:
+                importlib.import_module(module)
+                break
+            except ImportError:
+                continue
+        else:
+            raise ImproperlyConfigured("TENANT_STORAGE='postgres' requiere instalar psycopg")
+
+        self.alias = getattr(settings, 'TENANT_POSTGRES_ALIAS', 'business_shared')
+        if self.alias not in settings.DATABASES:
+            raise ImproperlyConfigured(f"Falta la base de datos '{self.alias}' en DATABASES")
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def _quote(self, schema):
+        return self.connection.ops.quote_name(schema)
+
+    def get_location(self, business):
+        # Por ID: el nombre del negocio puede cambiar y no siempre es un identificador válido
+        return f"business_{business.id}"
+
+    def exists(self, location):
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM information_schema.schemata WHERE schema_name = %s", [location])
+            return cursor.fetchone() is not None
+
+    def create(self, location):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {self._quote(location)}")
+
+    def drop(self, location, business_id=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {self._quote(location)} CASCADE")
+        self.connection.tenant_search_path = None
+
+    def connect(self, alias, location):
+        """Todos los negocios se dirigen al alias compartido"""
+        return self.alias
+
+    def activate(self, alias, location):
+        """Cambia el search_path de la conexión del hilo actual si apunta a otro schema"""
+        connection = self.connection
+        # Se compara también el objeto de conexión: una reconexión pierde el search_path
+        current = (id(connection.connection), location)
+        if getattr(connection, 'tenant_search_path', None) == current:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET search_path TO {self._quote(location)}, public")
+        connection.tenant_search_path = (id(connection.connection), location)
+
+    def disconnect(self, alias):
+        # La conexión es compartida: no se cierra por un negocio
+        pass
+
+    def is_schema_current(self, location):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT obj_description(oid, 'pg_namespace') FROM pg_namespace WHERE nspname = %s",
+                [location]
+            )
+            row = cursor.fetchone()
+        return bool(row) and row[0] == f"{self.STAMP_PREFIX}{MigrationStateService.get_fingerprint()}"
+
+    def mark_schema_current(self, location):
+        stamp = f"{self.STAMP_PREFIX}{MigrationStateService.get_fingerprint()}"
+        with self.connection.cursor() as cursor:
+            # COMMENT no acepta parámetros; la huella es hexadecimal
+            cursor.execute(f"COMMENT ON SCHEMA {self._quote(location)} IS '{stamp}'")
+
+    def get_applied_migrations(self, location):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.tables WHERE table_schema = %s AND table_name = 'django_migrations'",
+                [location]
+            )
+            if cursor.fetchone() is None:
+                return set()
+            cursor.execute(f"SELECT app, name FROM {self._quote(location)}.django_migrations")
+            return set(cursor.fetchall())
+
+
+class ShardedSQLiteTenantStorage(SQLiteTenantStorage):
+    """
+    Varios negocios por archivo SQLite: TENANT_SHARDS shards asignados por hash consistente.
+
+    La ubicación de cada negocio es el archivo de su shard y todos los negocios
+    de un shard comparten su alias de conexión, así que archivos, migraciones y
+    conexiones crecen con los shards y no con los negocios. Las filas se separan
+    por business_id (TenantScopedModel).
+    """
+
+    name = 'sqlite_sharded'
+
+    def get_location(self, business):
+        ring = ShardRing.get_default()
+        return str(ring.get_shard_path(ring.get_shard(business.id)))
+
+    def create(self, location):
+        """Crea el shard una sola vez aunque varios negocios se aprovisionen a la vez"""
+        tmp_location = f"{location}.{uuid.uuid4().hex}.tmp"
+        super().create(tmp_location)
+        try:
+            # link falla si el shard ya existe: nunca se reemplaza un shard con datos
+            os.link(tmp_location, location)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_location)
+
+    def drop(self, location, business_id=None):
+        """Borra solo las filas del negocio; el shard sigue en uso por los demás"""
+        if business_id is None or not os.path.exists(location):
+            return
+        from django.db import transaction
+        from app.business.models.tenant_scoped import TenantScopedModel
+
+        alias = self.connect(ShardRing.get_shard_alias(location), location)
+        with transaction.atomic(using=alias):
+            for model in TenantScopedModel.get_tenant_models():
+                model.all_tenants.using(alias).filter(business_id=business_id).delete()
+
+    def connect(self, alias, location):
+        """Todos los negocios del shard se dirigen al alias del shard"""
+        return super().connect(ShardRing.get_shard_alias(location), location)
+
+    def disconnect(self, alias):
+        # El alias del shard es compartido: se cierra por LRU, no por un negocio
+        pass
+
+
+TENANT_STORAGES = {
+    'sqlite': SQLiteTenantStorage,
+    'sqlite_sharded': ShardedSQLiteTenantStorage,
+    'postgres': PostgresSchemaTenantStorage,
+}
+
+_storage = None
+
+
+def get_tenant_storage():
+    """
+    Estrategia de almacenamiento configurada en TENANT_STORAGE.
+
+    Acepta 'sqlite', 'sqlite_sharded', 'postgres' o la ruta de una clase con la misma interfaz.
+    """
+    global _storage
+    if _storage is None:
+        name = getattr(settings, 'TENANT_STORAGE', 'sqlite')
+        storage_class = TENANT_STORAGES[name] if name in TENANT_STORAGES else import_string(name)
+        _storage = storage_class()
+    return _storage
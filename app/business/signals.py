@@ -1,37 +1,29 @@
 # Django
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.conf import settings
 
 # Models
 from app.business.models.business import Business
+from app.business.models.tenant import TenantDatabase
 
+# Services
+from app.business.services.purge_service import TenantPurgeService
+from app.business.services.tenant_registry import TenantRegistry
 
 
-@receiver(post_delete, sender=Business)
+@receiver([post_save, post_delete], sender=TenantDatabase)
+def publish_tenant_registry_change(sender, instance, **kwargs):
+    """
+    Avisa a los demás procesos de que cambió la base de datos de un negocio.
+    Cubre register/unregister, los rebalanceos y el borrado en cascada al eliminar negocios.
+    """
+    TenantRegistry.record_change(instance.business_id)
+
+
+@receiver(pre_delete, sender=Business)
 def delete_business_database(sender, instance, **kwargs):
     """
-    Signal que se activa antes de eliminar un negocio
-    Elimina la base de datos asociada
+    Signal que se activa antes de eliminar un negocio (también en borrados por queryset).
+    Deja una lápida con la ubicación registrada para que purge_tenants la elimine.
     """
-    # Nombre de la base de datos asociada
-    db_name = f"business_{instance.name}"
-    db_path = None
-    
-    # Verificar si la base de datos existe en la configuración
-    if db_name in settings.DATABASES:
-        db_config = settings.DATABASES[db_name]
-        db_path = db_config.get('NAME')
-        print(f"Path de base de datos a eliminar: {db_path}")
-        
-        # Si es un objeto Path, convertirlo a string
-        if hasattr(db_path, 'resolve'):
-            db_path = str(db_path.resolve())
-            
-        # Eliminar la base de datos de la configuración
-        del settings.DATABASES[db_name]
-        print(f"Eliminada configuración de base de datos {db_name}")
-    else:
-        # Si no está en DATABASES, construir el path manualmente
-        db_path = str(settings.BASE_DIR / f"db_{db_name}.sqlite3")
-        print(f"Base de datos no encontrada en settings, intentando path: {db_path}")
\ No newline at end of file
+    TenantPurgeService.create_tombstone(instance.id)
@@ -0,0 +1,908 @@
+# Django
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.signals import request_started
+from django.db import connection, connections
+from django.test import TransactionTestCase, override_settings
+
+# Django REST Framework
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+# Permissions
+from app.business.api.permissions import IsTenantReady
+
+# Models
+from app.accounts.models import CustomUser
+from app.business.models.business import Business
+from app.business.models.provisioning import ProvisioningJob
+from app.business.models.tenant import TenantArchive, TenantDatabase, TenantStorageMetrics, TenantTombstone
+from app.business.models.tenant_scoped import TenantScopedModel
+
+# Services
+from app.business.services import tenant_storage
+from app.business.services.archive_service import TenantArchiveService
+from app.business.services.backup_service import TenantBackupService
+from app.business.services.maintenance_service import TenantMaintenanceService
+from app.business.services.provisioning_service import ProvisioningQueueService
+from app.business.services.purge_service import TenantPurgeService
+from app.business.services.schema_scan_service import TenantSchemaScanService
+from app.business.services.shard_ring import ShardRing
+from app.business.services.shard_service import ShardRebalanceService
+from app.business.services.tenant_context import tenant
+from app.business.services.tenant_fanout import TenantFanoutService, TenantQueryTimeout
+from app.business.services.tenant_provisioning import (
+    TenantLocationConflict, TenantLock, TenantProvisioningBusy, TenantProvisioningService
+)
+from app.business.services.tenant_registry import TenantFence, TenantRegistry, TenantUnavailable
+from app.business.services.tenant_storage import SQLiteTenantStorage
+
+# Router y middleware
+from config.db_routers import TENANT, BusinessRouter
+from config.middleware import BusinessMiddleware
+
+# Management
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+import importlib
+import shutil
+import sqlite3
+import tempfile
+
+
+class TenantDatabases(frozenset):
+    """Bases de datos permitidas en las pruebas: las declaradas y las de negocios creadas durante la prueba"""
+
+    def __contains__(self, alias):
+        return super().__contains__(alias) or str(alias).startswith('business_')
+
+
+class TenantTestCase(TransactionTestCase):
+    """
+    Base para pruebas con bases de datos de negocios reales.
+
+    Cada prueba usa un directorio temporal para los archivos de negocios,
+    bloqueos, copias y archivados, una caché en memoria y aprovisionamiento
+    síncrono. TransactionTestCase: on_commit, los hilos del fan-out y la cola
+    de aprovisionamiento necesitan datos confirmados.
+    """
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.databases = TenantDatabases(cls.databases)
+        # La plantilla migrada se construye una vez por clase
+        cls.template_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.template_dir, ignore_errors=True)
+
+    def setUp(self):
+        base_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, base_dir, ignore_errors=True)
+        self.base_dir = base_dir
+        self.settings_override = override_settings(
+            BASE_DIR=base_dir,
+            TENANT_TEMPLATE_DIR=Path(self.template_dir),
+            TENANT_LOCK_DIR=base_dir / 'tenant_locks',
+            TENANT_BACKUP_DIR=base_dir / 'tenant_backups',
+            TENANT_ARCHIVE_DIR=base_dir / 'tenant_archive',
+            TENANT_PROVISIONING_ASYNC=False,
+            TENANT_FENCE_GRACE=0,
+            TENANT_PURGE_DELAY=0,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            **self.get_settings(),
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.reset_tenants()
+        self.addCleanup(self.reset_tenants)
+
+    def get_settings(self):
+        """Ajustes adicionales de la clase de pruebas"""
+        return {}
+
+    @staticmethod
+    def reset_tenants():
+        """Olvida los negocios y la estrategia de almacenamiento de la prueba anterior"""
+        # Con shards el alias es compartido y disconnect() no lo quita: se cierran todos
+        for alias in [alias for alias in settings.DATABASES if alias.startswith('business_')]:
+            SQLiteTenantStorage().disconnect(alias)
+        TenantRegistry._aliases.clear()
+        TenantRegistry._locations.clear()
+        TenantRegistry._version = None
+        tenant_storage._storage = None
+        cache.clear()
+
+    def create_business(self, name='Negocio'):
+        """Negocio con propietario; con aprovisionamiento síncrono queda registrado al crearlo"""
+        owner = CustomUser.objects.create_user(
+            username=f"owner_{name}", email=f"{name}@example.com", password='pass12345678'
+        )
+        return Business.objects.create(name=name, owner=owner)
+
+    @staticmethod
+    def execute(business, sql, params=None):
+        """Ejecuta SQL en la base de datos del negocio y devuelve las filas"""
+        with tenant(business) as alias:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+
+class TenantModel:
+    """Modelo ficticio que el router clasifica como modelo de negocio"""
+
+
+class TenantRoutingTests(TenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(BusinessRouter.route_table, {TenantModel: TENANT})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = BusinessRouter()
+
+    def test_new_business_is_registered_with_id_based_location(self):
+        business = self.create_business()
+
+        location = TenantRegistry.get_registered_path(business.id)
+        self.assertEqual(location, str(self.base_dir / f"db_business_{business.id}.sqlite3"))
+        self.assertTrue(Path(location).exists())
+        business.refresh_from_db()
+        self.assertEqual(business.provisioning_status, 'ready')
+
+    def test_tenant_models_route_to_the_active_business(self):
+        first = self.create_business('Primero')
+        second = self.create_business('Segundo')
+
+        with tenant(first):
+            self.assertEqual(self.router.db_for_write(TenantModel), TenantRegistry.get_alias(first.id))
+            with tenant(second):
+                self.assertEqual(self.router.db_for_read(TenantModel), TenantRegistry.get_alias(second.id))
+            self.assertEqual(self.router.db_for_read(TenantModel), TenantRegistry.get_alias(first.id))
+        self.assertEqual(self.router.db_for_read(Business), 'default')
+
+    def test_businesses_do_not_share_data(self):
+        first = self.create_business('Primero')
+        second = self.create_business('Segundo')
+        self.execute(first, "CREATE TABLE notes (text)")
+        self.execute(first, "INSERT INTO notes VALUES ('privada')")
+
+        self.assertEqual(self.execute(first, "SELECT text FROM notes"), [('privada',)])
+        tables = self.execute(second, "SELECT name FROM sqlite_master WHERE name = 'notes'")
+        self.assertEqual(tables, [])
+
+    def test_shared_apps_only_migrate_to_default(self):
+        alias = TenantRegistry.get_alias(1)
+        for app_label in sorted(BusinessRouter.shared_apps | {'auth', 'contenttypes'}):
+            self.assertTrue(self.router.allow_migrate('default', app_label, model_name='nuevomodelo'))
+            self.assertFalse(self.router.allow_migrate(alias, app_label, model_name='nuevomodelo'))
+        self.assertTrue(self.router.allow_migrate(alias, 'inventory', model_name='product'))
+
+        business = self.create_business()
+        tables = {row[0] for row in self.execute(business, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn(Business._meta.db_table, tables)
+        self.assertNotIn(TenantDatabase._meta.db_table, tables)
+
+    def test_registry_change_from_another_process_is_applied(self):
+        business = self.create_business()
+        TenantRegistry.resolve(business.id)
+        TenantRegistry.refresh()
+
+        # Otro proceso mueve el negocio: solo cambia la fila del registro
+        moved = self.base_dir / 'moved.sqlite3'
+        shutil.copyfile(TenantRegistry.get_registered_path(business.id), moved)
+        TenantDatabase.objects.filter(business_id=business.id).update(name=str(moved))
+        TenantRegistry.record_change(business.id)
+
+        self.assertEqual(TenantRegistry.refresh(), 1)
+        TenantRegistry.resolve(business.id)
+        self.assertEqual(TenantRegistry._locations[business.id], str(moved))
+
+
+class TenantProvisioningTests(TenantTestCase):
+
+    def test_interrupted_provisioning_resumes_from_last_step(self):
+        with mock.patch.object(TenantProvisioningService, '_seed_roles', side_effect=RuntimeError('caída')), \
+                self.assertLogs('app.business.services.provisioning_service', 'ERROR'):
+            business = self.create_business()
+
+        business.refresh_from_db()
+        self.assertEqual(business.provisioning_step, 'schema_applied')
+        self.assertEqual(business.provisioning_status, 'pending')
+        self.assertIsNone(TenantRegistry.get_registered_path(business.id))
+        location = self.base_dir / f"db_business_{business.id}.sqlite3"
+        connection = sqlite3.connect(location)
+        connection.execute("CREATE TABLE marker (x)")
+        connection.close()
+
+        self.assertTrue(TenantProvisioningService.provision(business))
+        # Se retoma sobre el mismo archivo: no se vuelve a crear
+        self.assertEqual(self.execute(business, "SELECT name FROM sqlite_master WHERE name = 'marker'"), [('marker',)])
+        business.refresh_from_db()
+        self.assertEqual(business.provisioning_step, 'registered')
+        self.assertEqual(business.provisioning_status, 'ready')
+        self.assertEqual(TenantRegistry.get_registered_path(business.id), str(location))
+
+    def test_failed_job_is_retried_by_the_queue(self):
+        with mock.patch.object(TenantProvisioningService, '_apply_schema', side_effect=RuntimeError('caída')), \
+                self.assertLogs('app.business.services.provisioning_service', 'ERROR'):
+            business = self.create_business()
+
+        job = ProvisioningJob.objects.get(business_id=business.id)
+        self.assertEqual((job.status, job.attempts, job.last_error), ('queued', 1, 'caída'))
+
+        ProvisioningJob.objects.filter(pk=job.pk).update(available_at=job.created_at)
+        job = ProvisioningQueueService.claim_next('worker')
+        self.assertTrue(ProvisioningQueueService.run_job(job))
+        business.refresh_from_db()
+        self.assertEqual(business.provisioning_status, 'ready')
+
+    def test_provisioning_is_idempotent(self):
+        business = self.create_business()
+
+        with mock.patch.object(TenantLock, '__enter__') as lock:
+            self.assertTrue(TenantProvisioningService.provision(business))
+        # Camino rápido: ya registrado, sin bloqueo ni acceso a disco
+        lock.assert_not_called()
+        self.assertEqual(TenantDatabase.objects.filter(business_id=business.id).count(), 1)
+
+    def test_busy_business_is_requeued_without_counting_the_attempt(self):
+        with mock.patch.object(ProvisioningQueueService, 'run_job'):
+            business = self.create_business()
+        job = ProvisioningJob.objects.get(business_id=business.id)
+        self.assertEqual(job.attempts, 1)
+
+        with TenantLock(business.id):
+            with self.assertRaises(TenantProvisioningBusy):
+                TenantProvisioningService.provision(business)
+            self.assertFalse(ProvisioningQueueService.run_job(job))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 0))
+
+
+class TenantView(APIView):
+    """Vista ficticia que usa la base de datos del negocio"""
+    permission_classes = [IsTenantReady]
+
+    def get(self, request):
+        return Response({})
+
+
+class TenantReadyPermissionTests(TenantTestCase):
+
+    def get_settings(self):
+        return {'TENANT_NOT_READY_RETRY_AFTER': 7}
+
+    def get(self, user):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=user)
+        return TenantView.as_view()(request)
+
+    def assertNotReady(self, response, provisioning_status):
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual(response.data['provisioning_status'], provisioning_status)
+
+    def test_pending_business_gets_503_until_provisioned(self):
+        with mock.patch.object(ProvisioningQueueService, 'run_job'):
+            business = self.create_business()
+
+        self.assertNotReady(self.get(business.owner), 'pending')
+
+        self.assertTrue(TenantProvisioningService.provision(business))
+        self.assertEqual(self.get(business.owner).status_code, 200)
+
+    def test_check_never_restores_an_archived_business(self):
+        business = self.create_business()
+        TenantArchiveService.archive(business.id)
+
+        # Recién archivado: aún no se puede restaurar
+        self.assertNotReady(self.get(business.owner), 'archived')
+
+        cache.delete(TenantFence.KEY.format(business_id=business.id))
+        with mock.patch.object(TenantArchiveService, 'restore') as restore:
+            self.assertEqual(self.get(business.owner).status_code, 200)
+        # Lo restaura el router con la primera consulta de la vista, no el permiso
+        restore.assert_not_called()
+
+    def test_user_without_business_is_not_blocked(self):
+        user = CustomUser.objects.create_user(username='solo', email='solo@example.com', password='pass12345678')
+
+        self.assertEqual(self.get(user).status_code, 200)
+
+
+class TenantPurgeTests(TenantTestCase):
+
+    def create_pending_business(self, name):
+        """Negocio creado sin aprovisionar (como si el worker aún no lo hubiera tomado)"""
+        with mock.patch.object(ProvisioningQueueService, 'run_job'):
+            return self.create_business(name)
+
+    def test_deleted_business_is_purged_later(self):
+        business = self.create_business()
+        business_id = business.id
+        location = TenantRegistry.get_registered_path(business_id)
+
+        business.delete()
+
+        # La petición solo deja la lápida: el archivo sigue hasta la purga
+        tombstone = TenantTombstone.objects.get(business_id=business_id)
+        self.assertEqual(tombstone.name, location)
+        self.assertTrue(Path(location).exists())
+        self.assertIsNone(TenantRegistry.get_registered_path(business_id))
+
+        self.assertEqual(TenantPurgeService.purge_batch(), (1, 0))
+        self.assertFalse(Path(location).exists())
+        tombstone.refresh_from_db()
+        self.assertIsNotNone(tombstone.purged_at)
+        # Repetirlo no tiene efecto
+        self.assertEqual(TenantPurgeService.purge_batch(), (0, 0))
+
+    def test_registered_database_is_never_purged(self):
+        business = self.create_business()
+        location = TenantRegistry.get_registered_path(business.id)
+        tombstone = TenantTombstone.objects.create(name=location)
+
+        with self.assertLogs('app.business.services.purge_service', 'ERROR'):
+            self.assertEqual(TenantPurgeService.purge_batch(), (0, 1))
+
+        self.assertTrue(Path(location).exists())
+        tombstone.refresh_from_db()
+        self.assertEqual(tombstone.attempts, 1)
+        self.assertIn('registrado', tombstone.last_error)
+
+    def test_busy_business_is_skipped_without_counting_the_attempt(self):
+        business = self.create_business()
+        business_id = business.id
+        business.delete()
+
+        with TenantLock(business_id):
+            self.assertEqual(TenantPurgeService.purge_batch(), (0, 0))
+        self.assertEqual(TenantTombstone.objects.get(business_id=business_id).attempts, 0)
+        self.assertEqual(TenantPurgeService.purge_batch(), (1, 0))
+
+    def test_new_business_never_adopts_a_location_pending_purge(self):
+        business = self.create_pending_business('Nuevo')
+        location = SQLiteTenantStorage().get_location(business)
+        TenantTombstone.objects.create(name=location)
+
+        with self.assertRaises(TenantProvisioningBusy):
+            TenantProvisioningService.provision(business)
+
+        # Una lápida que no se pudo purgar bloquea la ubicación de forma explícita
+        TenantTombstone.objects.filter(name=location).update(attempts=5)
+        with self.assertRaises(TenantLocationConflict):
+            TenantProvisioningService.provision(business)
+        self.assertIsNone(TenantRegistry.get_registered_path(business.id))
+
+    def test_new_business_never_adopts_another_business_location(self):
+        owner = self.create_business('Propietario')
+        location = TenantRegistry.get_registered_path(owner.id)
+        business = self.create_pending_business('Nuevo')
+
+        # Ubicación antigua que coincide con la de otro negocio registrado
+        with mock.patch.object(SQLiteTenantStorage, 'get_location', return_value=location):
+            with self.assertRaises(TenantLocationConflict):
+                TenantProvisioningService.provision(business)
+        self.assertIsNone(TenantRegistry.get_registered_path(business.id))
+
+    @override_settings(TENANT_ORPHAN_MIN_AGE=0)
+    def test_orphan_files_are_tombstoned(self):
+        business = self.create_business()
+        orphan = self.base_dir / 'db_business_999.sqlite3'
+        sqlite3.connect(orphan).close()
+
+        orphans = TenantPurgeService.find_orphans()
+        self.assertEqual(orphans['files'], [str(orphan)])
+        self.assertEqual(orphans['missing'], [])
+
+        TenantPurgeService.tombstone_orphans(files=orphans['files'])
+        self.assertEqual(TenantPurgeService.purge_batch(), (1, 0))
+        self.assertFalse(orphan.exists())
+        self.assertTrue(Path(TenantRegistry.get_registered_path(business.id)).exists())
+
+
+    @override_settings(TENANT_ORPHAN_MIN_AGE=0)
+    def test_legacy_file_of_a_live_business_is_not_an_orphan(self):
+        business = self.create_pending_business('Antiguo')
+        legacy = Path(SQLiteTenantStorage.get_legacy_location(business.name))
+        sqlite3.connect(legacy).close()
+
+        self.assertEqual(TenantPurgeService.find_orphans()['files'], [])
+
+        Business.objects.filter(pk=business.pk).delete()
+        self.assertEqual(TenantPurgeService.find_orphans()['files'], [str(legacy)])
+
+    def test_migration_registers_legacy_files(self):
+        migration = importlib.import_module('app.business.migrations.0004_tenantdatabase')
+        business = self.create_pending_business('Antiguo')
+        without_file = self.create_pending_business('Sin_archivo')
+        legacy = SQLiteTenantStorage.get_legacy_location(business.name)
+        sqlite3.connect(legacy).close()
+
+        with connection.schema_editor() as schema_editor:
+            migration.register_legacy_databases(django_apps, schema_editor)
+
+        self.assertEqual(TenantRegistry.get_registered_path(business.id), legacy)
+        self.assertIsNone(TenantRegistry.get_registered_path(without_file.id))
+        # El negocio usa su archivo con datos: el aprovisionamiento no crea otro
+        self.assertTrue(TenantProvisioningService.provision(business))
+        self.assertFalse(Path(SQLiteTenantStorage().get_location(business)).exists())
+
+class TenantArchiveTests(TenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(BusinessRouter.route_table, {TenantModel: TENANT})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.business = self.create_business()
+        self.location = TenantRegistry.get_registered_path(self.business.id)
+        self.execute(self.business, "CREATE TABLE notes (text)")
+        self.execute(self.business, "INSERT INTO notes VALUES ('antes de archivar')")
+
+    def release_fence(self):
+        """Simula que ya pasó el tiempo de propagación del registro"""
+        cache.delete(TenantFence.KEY.format(business_id=self.business.id))
+
+    def test_archive_fences_writes_and_defers_the_file_drop(self):
+        TenantArchiveService.archive(self.business.id)
+
+        self.assertIsNone(TenantRegistry.get_registered_path(self.business.id))
+        archive = TenantArchive.objects.get(business_id=self.business.id)
+        self.assertTrue(Path(archive.archive_path).exists())
+        # Otros procesos pueden seguir leyendo el archivo hasta refrescar el registro
+        self.assertTrue(Path(self.location).exists())
+        self.assertTrue(TenantTombstone.objects.filter(
+            business_id=self.business.id, name=self.location, purged_at__isnull=True
+        ).exists())
+        self.assertTrue(TenantFence.is_fenced(self.business.id))
+
+    def test_fenced_business_rejects_writes(self):
+        with TenantFence.hold(self.business.id, 'test'):
+            with tenant(self.business):
+                self.assertEqual(BusinessRouter().db_for_read(TenantModel), TenantRegistry.get_alias(self.business.id))
+                with self.assertRaises(TenantUnavailable) as raised:
+                    BusinessRouter().db_for_write(TenantModel)
+
+        response = BusinessMiddleware(lambda request: None).process_exception(None, raised.exception)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+
+    def test_failed_archive_releases_the_fence(self):
+        with mock.patch.object(TenantBackupService, 'write_snapshot', side_effect=OSError('disco lleno')):
+            with self.assertRaises(OSError):
+                TenantArchiveService.archive(self.business.id)
+
+        self.assertFalse(TenantFence.is_fenced(self.business.id))
+        self.assertEqual(TenantRegistry.get_registered_path(self.business.id), self.location)
+        self.assertFalse(TenantTombstone.objects.exists())
+
+    def test_restore_waits_for_the_fence(self):
+        TenantArchiveService.archive(self.business.id)
+
+        with self.assertRaises(TenantProvisioningBusy):
+            TenantArchiveService.restore(self.business.id)
+        # Nunca se dirige el negocio a la base de datos default
+        with self.assertRaises(TenantUnavailable):
+            TenantRegistry.resolve(self.business.id)
+
+        self.release_fence()
+        self.assertEqual(TenantRegistry.resolve(self.business.id), TenantRegistry.get_alias(self.business.id))
+        self.assertEqual(self.execute(self.business, "SELECT text FROM notes"), [('antes de archivar',)])
+        self.assertFalse(TenantArchive.objects.filter(business_id=self.business.id).exists())
+        # La lápida del archivo anterior se cancela: la purga no borra el restaurado
+        self.assertFalse(TenantTombstone.objects.filter(purged_at__isnull=True).exists())
+
+    def test_restore_after_purge(self):
+        TenantArchiveService.archive(self.business.id)
+        self.assertEqual(TenantPurgeService.purge_batch(), (1, 0))
+        self.assertFalse(Path(self.location).exists())
+
+        self.release_fence()
+        self.assertEqual(self.execute(self.business, "SELECT text FROM notes"), [('antes de archivar',)])
+        self.assertEqual(TenantRegistry.get_registered_path(self.business.id), self.location)
+
+    def test_concurrent_restore_is_reported_as_unavailable(self):
+        TenantArchiveService.archive(self.business.id)
+        self.release_fence()
+
+        with TenantLock(self.business.id):
+            with self.assertRaises(TenantUnavailable):
+                TenantRegistry.resolve(self.business.id)
+        self.assertIsNotNone(TenantRegistry.resolve(self.business.id))
+
+
+class TenantBackupTests(TenantTestCase):
+
+    def get_settings(self):
+        return {'TENANT_BACKUP_KEEP': 2}
+
+    def create_database(self, path, rows=0):
+        connection = sqlite3.connect(path, isolation_level=None)
+        connection.execute("CREATE TABLE notes (text)")
+        connection.executemany("INSERT INTO notes VALUES (?)", [('x' * 1000,)] * rows)
+        connection.close()
+
+    @staticmethod
+    def read_snapshot(snapshot, path):
+        TenantBackupService.restore_snapshot(snapshot, str(path))
+        connection = sqlite3.connect(path)
+        try:
+            return connection.execute("SELECT count(*) FROM notes").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_backup_skips_unchanged_databases_and_prunes_old_copies(self):
+        business = self.create_business()
+        location = TenantRegistry.get_registered_path(business.id)
+        self.execute(business, "CREATE TABLE notes (text)")
+
+        [(_, status, first)] = TenantBackupService.backup_all()
+        self.assertEqual(status, 'copied')
+        self.assertEqual(list(TenantBackupService.backup_all()), [(location, 'skipped', first)])
+
+        for _ in range(2):
+            self.execute(business, "INSERT INTO notes VALUES ('nueva')")
+            [(_, status, _)] = TenantBackupService.backup_all()
+            self.assertEqual(status, 'copied')
+
+        snapshots = sorted(TenantBackupService.get_backup_dir().glob('*.sqlite3.gz'))
+        self.assertEqual(len(snapshots), 2)
+        self.assertNotIn(first, [snapshot.name for snapshot in snapshots])
+        self.assertEqual(self.read_snapshot(snapshots[-1], self.base_dir / 'restored.sqlite3'), 2)
+
+    @override_settings(TENANT_BACKUP_PAGES=1)
+    def test_copy_restarted_by_writers_falls_back_to_a_single_step(self):
+        source = self.base_dir / 'source.sqlite3'
+        self.create_database(source, rows=50)
+        writer = sqlite3.connect(source, isolation_level=None)
+        self.addCleanup(writer.close)
+
+        # Cada pausa entre pasos coincide con una escritura: la copia por pasos empieza de nuevo
+        def write(seconds):
+            writer.execute("INSERT INTO notes VALUES ('durante la copia')")
+
+        target = self.base_dir / 'copy.sqlite3'
+        with mock.patch('app.business.services.backup_service.time.sleep', side_effect=write) as sleep, \
+                self.assertLogs('app.business.services.backup_service', 'INFO') as logs:
+            TenantBackupService.copy_database(str(source), target)
+
+        self.assertGreater(sleep.call_count, TenantBackupService.MAX_RESTARTS)
+        self.assertIn('reiniciada', logs.output[0])
+        copy = sqlite3.connect(target)
+        self.addCleanup(copy.close)
+        self.assertEqual(copy.execute("SELECT count(*) FROM notes").fetchone()[0], 50 + sleep.call_count)
+
+    def test_snapshot_of_a_path_with_uri_characters(self):
+        source = self.base_dir / 'negocio ?mode=rw #1.sqlite3'
+        self.create_database(source, rows=3)
+
+        snapshot = self.base_dir / 'snapshot.sqlite3.gz'
+        TenantBackupService.write_snapshot(str(source), snapshot)
+
+        self.assertEqual(self.read_snapshot(snapshot, self.base_dir / 'restored.sqlite3'), 3)
+
+
+class ShardRebalanceTests(TenantTestCase):
+
+    def get_settings(self):
+        return {'TENANT_STORAGE': 'sqlite_sharded', 'TENANT_SHARDS': 4}
+
+    def setUp(self):
+        super().setUp()
+        self.business = self.create_business()
+        self.source = TenantRegistry.get_registered_path(self.business.id)
+        self.source_shard = ShardRebalanceService.get_shard_name(self.source)
+        self.target_shard = next(shard for shard in ShardRing.get_default().shards if shard != self.source_shard)
+
+    def test_businesses_share_shard_files(self):
+        ring = ShardRing.get_default()
+        businesses = [self.business] + [self.create_business(f"Negocio_{index}") for index in range(5)]
+
+        locations = {TenantRegistry.get_registered_path(business.id) for business in businesses}
+        self.assertLessEqual(len(locations), 4)
+        for business in businesses:
+            expected = str(ring.get_shard_path(ring.get_shard(business.id)))
+            self.assertEqual(TenantRegistry.get_registered_path(business.id), expected)
+
+    def test_move_registers_the_target_and_defers_the_source_rows(self):
+        fenced = []
+        # La copia de filas ocurre con las escrituras del negocio bloqueadas
+        with mock.patch.object(
+            TenantScopedModel, 'get_tenant_models',
+            side_effect=lambda: fenced.append(TenantFence.is_fenced(self.business.id)) or [],
+        ):
+            ShardRebalanceService.move(self.business.id, self.target_shard)
+
+        self.assertTrue(fenced)
+        self.assertTrue(all(fenced))
+        target = str(ShardRing.get_shard_path(self.target_shard))
+        self.assertEqual(TenantRegistry.get_registered_path(self.business.id), target)
+        tombstone = TenantTombstone.objects.get(purged_at__isnull=True)
+        self.assertEqual((tombstone.business_id, tombstone.name), (self.business.id, self.source))
+
+        self.assertEqual(TenantPurgeService.purge_batch(), (1, 0))
+        # Solo se borran las filas del negocio: el shard sigue en uso
+        self.assertTrue(Path(self.source).exists())
+
+    def test_moving_back_cancels_the_pending_purge(self):
+        ShardRebalanceService.move(self.business.id, self.target_shard)
+        cache.delete(TenantFence.KEY.format(business_id=self.business.id))
+        ShardRebalanceService.move(self.business.id, self.source_shard)
+
+        target = str(ShardRing.get_shard_path(self.target_shard))
+        pending = TenantTombstone.objects.filter(purged_at__isnull=True)
+        self.assertEqual(list(pending.values_list('business_id', 'name')), [(self.business.id, target)])
+        self.assertEqual(TenantRegistry.get_registered_path(self.business.id), self.source)
+
+    def test_failed_copy_keeps_the_source_registered(self):
+        with mock.patch.object(TenantScopedModel, 'get_tenant_models', side_effect=RuntimeError('caída')):
+            with self.assertRaises(RuntimeError):
+                ShardRebalanceService.move(self.business.id, self.target_shard)
+
+        self.assertEqual(TenantRegistry.get_registered_path(self.business.id), self.source)
+        self.assertFalse(TenantFence.is_fenced(self.business.id))
+        self.assertFalse(TenantTombstone.objects.exists())
+
+    def test_misplaced_businesses_after_changing_the_shard_count(self):
+        self.assertEqual(ShardRebalanceService.get_misplaced(), [])
+
+        ShardRebalanceService.move(self.business.id, self.target_shard)
+        self.assertEqual(
+            ShardRebalanceService.get_misplaced(), [(self.business.id, self.target_shard, self.source_shard)]
+        )
+
+
+class TenantSchemaScanTests(TenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.businesses = [self.create_business(f"Negocio_{index}") for index in range(3)]
+        for business in self.businesses:
+            self.execute(business, "CREATE TABLE notes (id INTEGER PRIMARY KEY, code TEXT UNIQUE, text TEXT)")
+
+    def scan(self, **kwargs):
+        tenants, missing = TenantSchemaScanService.get_tenants()
+        self.assertEqual(missing, [])
+        return {result['business_id']: result for result in TenantSchemaScanService.scan(tenants, **kwargs)}
+
+    def test_identical_schemas_share_one_hash(self):
+        results = self.scan()
+
+        self.assertEqual(len({result['hash'] for result in results.values()}), 1)
+        self.assertTrue(all(result['check'] == [] and result['error'] is None for result in results.values()))
+        output = StringIO()
+        call_command('scan_tenants', stdout=output)
+        self.assertIn('mismo esquema', output.getvalue())
+
+    def test_drifted_tenant_is_reported_with_the_difference(self):
+        drifted = self.businesses[1]
+        self.execute(drifted, "ALTER TABLE notes ADD COLUMN extra TEXT")
+        self.execute(drifted, "CREATE INDEX notes_text ON notes (text)")
+
+        results = self.scan()
+        reference, groups = TenantSchemaScanService.group(results.values())
+        self.assertEqual(len(groups[reference]), 2)
+        self.assertNotEqual(results[drifted.id]['hash'], reference)
+
+        diff = TenantSchemaScanService.diff(
+            results[self.businesses[0].id]['schema'], results[drifted.id]['schema']
+        )
+        self.assertEqual(diff['changed'], ['table:notes'])
+        self.assertEqual(diff['extra'], ['index:notes:notes_text:text'])
+        self.assertEqual(diff['missing'], [])
+
+        output = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('scan_tenants', stdout=output)
+        self.assertIn(TenantRegistry.get_alias(drifted.id), output.getvalue())
+
+    def test_column_order_and_creation_history_do_not_matter(self):
+        business = self.businesses[2]
+        # Misma estructura creada de otra forma: las columnas en otro orden
+        self.execute(business, "DROP TABLE notes")
+        self.execute(business, "CREATE TABLE notes (text TEXT, code TEXT UNIQUE, id INTEGER PRIMARY KEY)")
+
+        self.assertEqual(len({result['hash'] for result in self.scan(quick_check=False).values()}), 1)
+
+    def test_unreadable_database_is_reported(self):
+        broken = self.businesses[0]
+        TenantRegistry.unregister(broken.id)
+        location = self.base_dir / 'broken.sqlite3'
+        location.write_bytes(b'esto no es una base de datos' * 100)
+        TenantDatabase.objects.create(business_id=broken.id, alias=TenantRegistry.get_alias(broken.id), name=str(location))
+
+        results = self.scan()
+        self.assertIsNotNone(results[broken.id]['error'])
+        self.assertIsNone(results[broken.id]['hash'])
+        with self.assertRaises(CommandError):
+            call_command('scan_tenants', stdout=StringIO())
+
+
+class TenantFanoutTests(TenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.businesses = [self.create_business(f"Negocio_{index}") for index in range(3)]
+        for business in self.businesses:
+            self.execute(business, "CREATE TABLE notes (business_id INTEGER)")
+            self.execute(business, "INSERT INTO notes VALUES (%s)", [business.id])
+
+    def test_results_are_tagged_with_each_business(self):
+        results, errors = TenantFanoutService.collect("SELECT business_id FROM notes")
+
+        self.assertEqual(errors, {})
+        self.assertEqual(results, {business.id: [(business.id,)] for business in self.businesses})
+
+    def test_failing_business_does_not_stop_the_others(self):
+        broken = self.businesses[0]
+        self.execute(broken, "DROP TABLE notes")
+
+        with self.assertLogs('app.business.services.tenant_fanout', 'WARNING'):
+            results, errors = TenantFanoutService.collect("SELECT count(*) FROM notes")
+        self.assertEqual(set(errors), {broken.id})
+        self.assertEqual(set(results), {business.id for business in self.businesses[1:]})
+
+    def test_queries_are_read_only_by_default(self):
+        with self.assertLogs('app.business.services.tenant_fanout', 'WARNING'):
+            results, errors = TenantFanoutService.collect("DELETE FROM notes")
+        self.assertEqual(results, {})
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(self.execute(self.businesses[0], "SELECT count(*) FROM notes"), [(1,)])
+
+        # La conexión vuelve a admitir escrituras después
+        results, errors = TenantFanoutService.collect("DELETE FROM notes", read_only=False)
+        self.assertEqual(errors, {})
+        self.assertEqual(self.execute(self.businesses[0], "SELECT count(*) FROM notes"), [(0,)])
+
+    def test_slow_query_is_interrupted(self):
+        slow = (
+            "WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter) "
+            "SELECT count(*) FROM counter"
+        )
+        with self.assertLogs('app.business.services.tenant_fanout', 'WARNING'):
+            results, errors = TenantFanoutService.collect(slow, businesses=self.businesses[:1], timeout=0.2)
+        self.assertIsInstance(errors[self.businesses[0].id], TenantQueryTimeout)
+
+    def test_tenant_query_command_rejects_several_statements(self):
+        with self.assertRaises(CommandError):
+            call_command('tenant_query', "SELECT 1; DELETE FROM notes", stdout=StringIO())
+
+        output = StringIO()
+        call_command('tenant_query', "SELECT business_id FROM notes", stdout=output)
+        self.assertIn('3 negocios consultados', output.getvalue())
+
+
+
+class ShardedFanoutTests(TenantTestCase):
+
+    def get_settings(self):
+        return {'TENANT_STORAGE': 'sqlite_sharded', 'TENANT_SHARDS': 1}
+
+    def setUp(self):
+        super().setUp()
+        self.businesses = [self.create_business(f"Negocio_{index}") for index in range(2)]
+        # Un solo shard: los dos negocios comparten la tabla
+        self.assertEqual(len({TenantRegistry.get_registered_path(business.id) for business in self.businesses}), 1)
+        self.execute(self.businesses[0], "CREATE TABLE notes (business_id INTEGER, text TEXT)")
+        for business in self.businesses:
+            self.execute(business, "INSERT INTO notes VALUES (%s, %s)", [business.id, f"nota {business.id}"])
+        model = mock.Mock(_meta=mock.Mock(db_table='notes'))
+        patcher = mock.patch.object(TenantScopedModel, 'get_tenant_models', return_value=[model])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_raw_sql_only_sees_the_business_rows(self):
+        results, errors = TenantFanoutService.collect("SELECT business_id, text FROM notes")
+
+        self.assertEqual(errors, {})
+        self.assertEqual(results, {
+            business.id: [(business.id, f"nota {business.id}")] for business in self.businesses
+        })
+
+        def count(business_id):
+            with connections[TenantRegistry.resolve(business_id)].cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM notes")
+                return cursor.fetchone()[0]
+
+        results, errors = TenantFanoutService.collect(count)
+        self.assertEqual(results, {business.id: 1 for business in self.businesses})
+
+    def test_shard_tables_cannot_be_reached_directly(self):
+        with self.assertLogs('app.business.services.tenant_fanout', 'WARNING'):
+            results, errors = TenantFanoutService.collect("SELECT count(*) FROM main.notes")
+        self.assertEqual(results, {})
+        self.assertEqual(len(errors), 2)
+
+        with self.assertLogs('app.business.services.tenant_fanout', 'WARNING'):
+            results, errors = TenantFanoutService.collect(
+                "DELETE FROM main.notes", businesses=self.businesses[:1], read_only=False
+            )
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.execute(self.businesses[0], "SELECT count(*) FROM notes"), [(2,)])
+
+class TenantMaintenanceTests(TenantTestCase):
+
+    def get_settings(self):
+        return {'TENANT_MAINTENANCE': {'pause': 0, 'vacuum_min_free_pages': 16, 'analyze_min_pages': 16}}
+
+    @staticmethod
+    def get_metrics(**metrics):
+        return {'page_count': 1000, 'freelist_count': 0, 'auto_vacuum': TenantMaintenanceService.INCREMENTAL,
+                'file_size': 4096 * 1000, **metrics}
+
+    def test_plan_follows_the_thresholds(self):
+        analyzed = TenantStorageMetrics(name='x', analyzed_page_count=1000)
+        plan = TenantMaintenanceService.plan
+
+        self.assertEqual(plan(self.get_metrics()), ['analyze'])
+        self.assertEqual(plan(self.get_metrics(), analyzed), [])
+        self.assertEqual(plan(self.get_metrics(page_count=1500), analyzed), ['optimize'])
+        self.assertEqual(plan(self.get_metrics(freelist_count=500), analyzed), ['vacuum'])
+        self.assertEqual(plan(self.get_metrics(freelist_count=500, auto_vacuum=0), analyzed), ['convert'])
+        # Sin ventana, la pasada periódica no ejecuta VACUUM
+        self.assertEqual(plan(self.get_metrics(freelist_count=500), analyzed, heavy=False), [])
+        self.assertEqual(plan(self.get_metrics(page_count=1500, freelist_count=500), analyzed, heavy=False), ['optimize'])
+
+    def test_incremental_vacuum_releases_free_pages(self):
+        location = self.base_dir / 'tenant.sqlite3'
+        connection = sqlite3.connect(location, isolation_level=None)
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("CREATE TABLE notes (text)")
+        connection.executemany("INSERT INTO notes VALUES (?)", [('x' * 2000,)] * 500)
+        connection.execute("DELETE FROM notes")
+        connection.close()
+
+        result = TenantMaintenanceService.maintain(str(location), 1, force=True)
+
+        self.assertEqual(result['status'], 'ok')
+        self.assertIn('vacuum', result['actions'])
+        self.assertEqual(result['metrics']['freelist_count'], 0)
+
+    def test_window_can_cross_midnight(self):
+        in_window = TenantMaintenanceService.in_window
+        with override_settings(TENANT_MAINTENANCE={'window': '23:00-05:00'}):
+            self.assertTrue(in_window(datetime(2026, 1, 1, 23, 30)))
+            self.assertTrue(in_window(datetime(2026, 1, 1, 4, 59)))
+            self.assertFalse(in_window(datetime(2026, 1, 1, 12, 0)))
+
+    def test_periodic_runner_is_not_started_without_sqlite_storage(self):
+        self.addCleanup(setattr, TenantMaintenanceService, '_periodic_thread', None)
+        self.addCleanup(setattr, TenantMaintenanceService, '_periodic_pid', None)
+        with override_settings(TENANT_MAINTENANCE={'interval': 60}), \
+                mock.patch('app.business.services.maintenance_service.threading.Thread') as thread:
+            with mock.patch.object(TenantMaintenanceService, 'check_storage', side_effect=ValueError):
+                TenantMaintenanceService.start_periodic()
+            thread.assert_not_called()
+
+            with self.assertLogs('app.business.services.maintenance_service', 'WARNING'):
+                TenantMaintenanceService.start_periodic()
+            thread.assert_called_once()
+
+    def test_periodic_runner_starts_with_the_first_request_of_each_process(self):
+        self.addCleanup(setattr, TenantMaintenanceService, '_periodic_thread', None)
+        self.addCleanup(setattr, TenantMaintenanceService, '_periodic_pid', None)
+        request_started.connect(
+            TenantMaintenanceService.start_on_request, dispatch_uid=TenantMaintenanceService.REQUEST_DISPATCH_UID
+        )
+        with override_settings(TENANT_MAINTENANCE={'interval': 60, 'window': '00:00-23:59'}), \
+                mock.patch('app.business.services.maintenance_service.threading.Thread') as thread:
+            request_started.send(sender=None)
+            request_started.send(sender=None)
+            thread.assert_called_once()
+            TenantMaintenanceService.start_periodic()
+            thread.assert_called_once()
+
+            # Proceso hijo de un fork: el atributo se copió pero el hilo no existe
+            TenantMaintenanceService._periodic_pid = -1
+            TenantMaintenanceService.start_periodic()
+            self.assertEqual(thread.call_count, 2)
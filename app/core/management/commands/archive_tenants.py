@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from app.business.models.tenant import TenantArchive
+from app.business.services.archive_service import TenantArchiveService
+from app.business.services.tenant_provisioning import TenantProvisioningBusy
+
+
+class Command(BaseCommand):
+    help = 'Archiva las bases de datos de negocios inactivos o sin escrituras recientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-days', type=int, help='Días sin escrituras para considerar un negocio frío')
+        parser.add_argument('--no-inactive', action='store_true', help='No archivar los negocios desactivados')
+        parser.add_argument('--business', type=int, action='append', dest='businesses',
+                            help='Archiva este negocio aunque no sea candidato (repetible)')
+        parser.add_argument('--restore', type=int, action='append', help='Restaura un negocio archivado (repetible)')
+        parser.add_argument('--list', action='store_true', help='Muestra los negocios archivados')
+        parser.add_argument('--dry-run', action='store_true', help='Muestra los candidatos sin archivarlos')
+
+    def handle(self, *args, **options):
+        try:
+            TenantArchiveService.check_storage()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['list']:
+            return self._show_archived()
+
+        if options['restore']:
+            for business_id in options['restore']:
+                alias = TenantArchiveService.restore(business_id)
+                if alias is None:
+                    self.stdout.write(self.style.WARNING(f"business_{business_id}: no está archivado"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"business_{business_id}: restaurado ({alias})"))
+            return
+
+        if options['businesses']:
+            candidates = [(business_id, None, 'manual') for business_id in options['businesses']]
+        else:
+            candidates = TenantArchiveService.get_candidates(
+                idle_days=options['idle_days'],
+                include_inactive=not options['no_inactive'],
+            )
+
+        failed = 0
+        for business_id, location, reason in candidates:
+            if options['dry_run']:
+                self.stdout.write(f"business_{business_id}: {reason} ({location})")
+                continue
+            try:
+                archive = TenantArchiveService.archive(business_id)
+                self.stdout.write(self.style.SUCCESS(
+                    f"business_{business_id}: archivado ({reason}, {archive.original_size} -> {archive.archived_size} bytes)"
+                ))
+            except TenantProvisioningBusy:
+                self.stdout.write(self.style.WARNING(f"business_{business_id}: ocupado, se omite"))
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"business_{business_id}: {str(e)}"))
+
+        self.stdout.write(f"{len(candidates)} candidato(s), {failed} con error")
+        if failed:
+            raise CommandError(f"{failed} negocio(s) no se archivaron")
+
+    def _show_archived(self):
+        archives = TenantArchive.objects.order_by('archived_at')
+        for archive in archives:
+            self.stdout.write(f"business_{archive.business_id}: {archive.archive_path} ({archive.archived_at:%Y-%m-%d})")
+        totals = archives.aggregate(original=Sum('original_size'), archived=Sum('archived_size'))
+        self.stdout.write(f"{archives.count()} archivado(s): {totals['original'] or 0} -> {totals['archived'] or 0} bytes")
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.business.services.backup_service import TenantBackupService
+
+import time
+
+
+class Command(BaseCommand):
+    help = 'Copia en caliente las bases de datos de los negocios (API de backup de SQLite, comprimidas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, action='append', dest='businesses',
+                            help='ID de negocio (repetible); por defecto todos los registrados')
+        parser.add_argument('--workers', type=int, default=4, help='Copias simultáneas')
+        parser.add_argument('--force', action='store_true', help='Copia también los negocios sin cambios')
+
+    def handle(self, *args, **options):
+        try:
+            TenantBackupService.check_storage()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        start = time.perf_counter()
+        counts = {'copied': 0, 'skipped': 0, 'failed': 0}
+
+        for location, status, detail in TenantBackupService.backup_all(
+            business_ids=options['businesses'],
+            workers=options['workers'],
+            force=options['force'],
+        ):
+            counts[status] += 1
+            if status == 'copied':
+                self.stdout.write(self.style.SUCCESS(f"{location}: {detail}"))
+            elif status == 'failed':
+                self.stdout.write(self.style.ERROR(f"{location}: {detail}"))
+            elif options['verbosity'] > 1:
+                self.stdout.write(f"{location}: sin cambios desde {detail}")
+
+        self.stdout.write(
+            f"Resumen: {counts['copied']} copiados, {counts['skipped']} sin cambios, "
+            f"{counts['failed']} con error en {time.perf_counter() - start:.2f}s "
+            f"({TenantBackupService.get_backup_dir()})"
+        )
+        if counts['failed']:
+            raise CommandError(f"{counts['failed']} base(s) de datos no se copiaron")
@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import router
+
+from app.accounts.models import CustomUser, BusinessJoinRequest
+from app.business.services.tenant_registry import TenantRegistry
+from config.db_routers import BusinessRouter, TENANT
+from config.middleware import set_current_business_id
+
+import time
+
+
+class LegacyBusinessRouter:
+    """Copia del algoritmo anterior de BusinessRouter, solo para comparar"""
+
+    django_core_apps = BusinessRouter.django_core_apps
+
+    def db_for_read(self, model, **hints):
+        app_label = model._meta.app_label
+        model_name = model._meta.model_name
+
+        if app_label in self.django_core_apps:
+            return 'default'
+
+        if app_label == 'accounts' and model_name in ['business', 'customuser', 'businessrole', 'rolepermission']:
+            return 'default'
+
+        from config.middleware import get_current_business_id
+        from django.conf import settings
+
+        business_id = get_current_business_id()
+        if business_id:
+            db_name = f'business_{business_id}'
+            if db_name in settings.DATABASES:
+                return db_name
+
+        return 'default'
+
+
+class Command(BaseCommand):
+    help = 'Mide el costo por consulta de BusinessRouter antes y después de la tabla de rutas'
+
+    # ID ficticio para no depender de negocios existentes
+    BENCHMARK_BUSINESS_ID = 999999999
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200000, help='Decisiones de ruteo por caso')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Registrar en memoria un negocio ficticio y tratar BusinessJoinRequest como modelo de negocio
+        alias = TenantRegistry.get_alias(self.BENCHMARK_BUSINESS_ID)
+        settings.DATABASES[alias] = settings.DATABASES['default'].copy()
+        TenantRegistry._locations[self.BENCHMARK_BUSINESS_ID] = settings.DATABASES[alias]['NAME']
+        TenantRegistry._aliases[self.BENCHMARK_BUSINESS_ID] = alias
+
+        current = BusinessRouter()
+        current.route_table = dict(BusinessRouter.route_table)
+        current.route_table[BusinessJoinRequest] = TENANT
+        legacy = LegacyBusinessRouter()
+
+        cases = [
+            ('core (CustomUser)', CustomUser, None),
+            ('tenant sin contexto', BusinessJoinRequest, None),
+            ('tenant con contexto', BusinessJoinRequest, self.BENCHMARK_BUSINESS_ID),
+        ]
+
+        try:
+            self.stdout.write(f"{'caso':<24}{'anterior (ns)':>16}{'actual (ns)':>16}{'mejora':>10}")
+            for label, model, business_id in cases:
+                set_current_business_id(business_id)
+                before = self._measure(legacy, model, iterations)
+                after = self._measure(current, model, iterations)
+                self.stdout.write(f"{label:<24}{before:>16.1f}{after:>16.1f}{before / after:>9.1f}x")
+
+            # Costo a través de django.db.router (incluye la capa de Django)
+            set_current_business_id(None)
+            total = self._measure(router, CustomUser, iterations)
+            self.stdout.write(f"django.db.router.db_for_read (core): {total:.1f} ns")
+        finally:
+            set_current_business_id(None)
+            TenantRegistry._aliases.pop(self.BENCHMARK_BUSINESS_ID, None)
+            TenantRegistry._locations.pop(self.BENCHMARK_BUSINESS_ID, None)
+            settings.DATABASES.pop(alias, None)
+
+    @staticmethod
+    def _measure(db_router, model, iterations):
+        """Promedio en nanosegundos por llamada a db_for_read"""
+        db_for_read = db_router.db_for_read
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            db_for_read(model)
+        return (time.perf_counter_ns() - start) / iterations
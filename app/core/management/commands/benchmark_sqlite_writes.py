@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import connections, OperationalError
+
+from config.db_pragmas import get_sqlite_profile
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = 'Mide el rendimiento de escrituras concurrentes en SQLite con y sin el perfil de PRAGMAs'
+
+    # Alias temporales: el primero no coincide con ningún perfil, el segundo usa el de negocios
+    BASELINE_ALIAS = 'benchmark_sqlite_baseline'
+    PROFILE_ALIAS = 'business_benchmark_sqlite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Escritores concurrentes (una conexión por hilo)')
+        parser.add_argument('--seconds', type=float, default=3.0, help='Duración de cada medición')
+        parser.add_argument('--baseline-timeout', type=float, default=0.1,
+                            help='Timeout de sqlite3 (s) sin perfil; el perfil usa su busy_timeout')
+
+    def handle(self, *args, **options):
+        profile = get_sqlite_profile(self.PROFILE_ALIAS)
+        self.stdout.write(f"Perfil de negocios: {profile}")
+        self.stdout.write(f"{'configuración':<16}{'commits/s':>12}{'bloqueos':>10}{'p99 (ms)':>10}")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for label, alias, timeout in (
+                ('sin perfil', self.BASELINE_ALIAS, options['baseline_timeout']),
+                ('perfil negocio', self.PROFILE_ALIAS, None),
+            ):
+                db_path = Path(tmp_dir) / f"{alias}.sqlite3"
+                config = settings.DATABASES['default'].copy()
+                config['NAME'] = db_path
+                config['OPTIONS'] = {'timeout': timeout} if timeout is not None else {}
+                settings.DATABASES[alias] = config
+                try:
+                    commits, locked, p99 = self._measure(alias, options['threads'], options['seconds'])
+                finally:
+                    connections[alias].close()
+                    del connections[alias]
+                    settings.DATABASES.pop(alias, None)
+                self.stdout.write(f"{label:<16}{commits / options['seconds']:>12.0f}{locked:>10}{p99:>10.1f}")
+
+    def _measure(self, alias, threads, seconds):
+        """Cada hilo inserta filas en autocommit (un commit por fila, como una petición)"""
+        with connections[alias].cursor() as cursor:
+            cursor.execute("CREATE TABLE benchmark (id INTEGER PRIMARY KEY, payload TEXT)")
+        connections[alias].close()
+
+        deadline = time.perf_counter() + seconds
+        latencies = []
+        counters = {'commits': 0, 'locked': 0}
+        lock = threading.Lock()
+
+        def writer():
+            commits = locked = 0
+            local_latencies = []
+            connection = connections[alias]
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        with connection.cursor() as cursor:
+                            cursor.execute("INSERT INTO benchmark (payload) VALUES (%s)", ['x' * 200])
+                        commits += 1
+                        local_latencies.append(time.perf_counter() - start)
+                    except OperationalError:
+                        # 'database is locked'
+                        locked += 1
+            finally:
+                connection.close()
+            with lock:
+                counters['commits'] += commits
+                counters['locked'] += locked
+                latencies.extend(local_latencies)
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for _ in range(threads):
+                pool.submit(writer)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+        return counters['commits'], counters['locked'], p99
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.business.models.tenant import TenantStorageMetrics
+from app.business.services.maintenance_service import TenantMaintenanceService
+
+import time
+
+
+class Command(BaseCommand):
+    help = 'Mide las bases de datos de negocios y ejecuta ANALYZE / VACUUM incremental según umbrales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, action='append', dest='businesses',
+                            help='ID de negocio (repetible); por defecto todos los registrados')
+        parser.add_argument('--workers', type=int, default=2, help='Bases de datos mantenidas a la vez')
+        parser.add_argument('--dry-run', action='store_true', help='Solo mide y muestra las acciones previstas')
+        parser.add_argument('--force', action='store_true', help='Ignora la ventana horaria de mantenimiento')
+        parser.add_argument('--top', type=int, help='Muestra las N bases de datos más grandes según las últimas métricas')
+
+    def handle(self, *args, **options):
+        if options['top']:
+            return self._show_top(options['top'])
+
+        try:
+            TenantMaintenanceService.check_storage()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not options['force'] and not TenantMaintenanceService.in_window():
+            self.stdout.write(self.style.WARNING(
+                f"Fuera de la ventana de mantenimiento ({TenantMaintenanceService.get_config()['window']}); use --force"
+            ))
+            return
+
+        start = time.perf_counter()
+        counts = {'ok': 0, 'busy': 0, 'window': 0, 'failed': 0}
+        acted = 0
+        for result in TenantMaintenanceService.run(
+            business_ids=options['businesses'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+            force=options['force'],
+        ):
+            counts[result['status']] += 1
+            if result['status'] == 'failed':
+                self.stdout.write(self.style.ERROR(f"{result['location']}: {result['error']}"))
+            elif result['status'] == 'busy':
+                self.stdout.write(self.style.WARNING(f"{result['location']}: ocupada, se omite"))
+            elif result['actions']:
+                acted += 1
+                metrics = result['metrics']
+                self.stdout.write(
+                    f"{result['location']}: {', '.join(result['actions'])} "
+                    f"({metrics['page_count']} páginas, {metrics['freelist_count']} libres)"
+                )
+
+        self.stdout.write(
+            f"Resumen: {sum(counts.values())} bases de datos, {acted} con acciones, {counts['busy']} ocupadas, "
+            f"{counts['window']} fuera de ventana, {counts['failed']} con error en {time.perf_counter() - start:.2f}s"
+        )
+        if counts['failed']:
+            raise CommandError(f"{counts['failed']} base(s) de datos fallaron")
+
+    def _show_top(self, limit):
+        for metrics in TenantStorageMetrics.objects.order_by('-file_size')[:limit]:
+            self.stdout.write(
+                f"{metrics.name}: {metrics.file_size / 1024 / 1024:.1f} MB, "
+                f"{metrics.freelist_ratio:.0%} libre, analizada {metrics.last_analyzed_at or 'nunca'}"
+            )
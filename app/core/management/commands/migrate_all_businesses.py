@@ -1,25 +1,101 @@
-from django.core.management.base import BaseCommand
-from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
+from django.db import connections
+
+from app.business.services.migration_service import MigrationStateService
+from app.business.services.tenant_migration_service import TenantMigrationService
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import time
+
 
 class Command(BaseCommand):
     help = 'Ejecuta migraciones en todas las bases de datos de negocios'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Procesos que migran negocios en paralelo')
+        parser.add_argument('--restart', action='store_true', help='Ignora el journal y migra todos los negocios')
+        parser.add_argument('--skip-default', action='store_true', help='No migra la base de datos default')
+        parser.add_argument('--plan', action='store_true', help='Muestra los negocios agrupados por migraciones pendientes sin migrar')
+
     def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+
+        if options['plan']:
+            return self._show_plan()
+
         # Migrar primero la base de datos default
-        self.stdout.write("Migrando base de datos default...")
-        call_command('migrate', database='default')
-        
-        # Migrar todas las bases de datos que comienzan con 'business_'
-        for db_name in settings.DATABASES:
-            if db_name.startswith('business_'):
-                self.stdout.write(f"Migrando {db_name}...")
-                try:
-                    call_command('migrate', database=db_name)
-                    self.stdout.write(self.style.SUCCESS(f"Migración de {db_name} completada."))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(
-                        f"Error al migrar {db_name}: {str(e)}"
-                    ))
-                
-        self.stdout.write(self.style.SUCCESS('Migración de todas las bases de datos completada.'))
\ No newline at end of file
+        if not options['skip_default']:
+            self.stdout.write("Migrando base de datos default...")
+            call_command('migrate', database='default', interactive=False)
+
+        fingerprint = MigrationStateService.get_fingerprint()
+        if options['restart']:
+            TenantMigrationService.reset_journal()
+
+        tenants, missing = TenantMigrationService.get_tenants()
+        for alias in missing:
+            self.stdout.write(self.style.WARNING(f"{alias}: registrado pero sin archivo de base de datos, se omite"))
+
+        # Los negocios con la huella actual no necesitan construir el plan de migraciones
+        up_to_date, outdated = TenantMigrationService.split_up_to_date(tenants)
+        completed = TenantMigrationService.read_completed(fingerprint)
+        pending = [tenant for tenant in outdated if tenant[1] not in completed]
+        self.stdout.write(
+            f"{len(tenants)} negocios: {len(up_to_date)} al día, {len(outdated) - len(pending)} ya migrados "
+            f"según el journal, {len(pending)} pendientes ({workers} procesos)"
+        )
+
+        start = time.perf_counter()
+        failures = []
+        with TenantMigrationService.open_journal() as journal:
+            for result in self._run(pending, workers):
+                TenantMigrationService.write_entry(journal, fingerprint, result)
+                if result['status'] == 'ok':
+                    self.stdout.write(self.style.SUCCESS(f"{result['alias']}: migrado en {result['seconds']:.2f}s"))
+                else:
+                    failures.append(result)
+                    self.stdout.write(self.style.ERROR(f"{result['alias']}: error en {result['seconds']:.2f}s - {result['error']}"))
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Resumen: {len(pending) - len(failures)} migrados, {len(failures)} con error, "
+            f"{len(tenants) - len(pending)} omitidos en {elapsed:.2f}s"
+        )
+        if failures:
+            for result in failures:
+                self.stdout.write(self.style.ERROR(f"  {result['alias']}: {result['error']}"))
+            raise CommandError(f"{len(failures)} negocios no se pudieron migrar; vuelva a ejecutar el comando para reintentarlos")
+
+        self.stdout.write(self.style.SUCCESS('Migración de todas las bases de datos completada.'))
+
+    @staticmethod
+    def _run(pending, workers):
+        """Migra los negocios pendientes y devuelve cada resultado apenas termina"""
+        if workers == 1:
+            for tenant in pending:
+                yield TenantMigrationService.migrate_tenant(*tenant)
+            return
+
+        # Los procesos hijos no deben compartir las conexiones abiertas del padre
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=TenantMigrationService.init_worker) as pool:
+            futures = [pool.submit(TenantMigrationService.migrate_tenant, *tenant) for tenant in pending]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _show_plan(self):
+        """Muestra los negocios desactualizados agrupados por las migraciones que les faltan"""
+        tenants, missing = TenantMigrationService.get_tenants()
+        up_to_date, outdated = TenantMigrationService.split_up_to_date(tenants)
+        self.stdout.write(f"{len(tenants)} negocios: {len(up_to_date)} al día, {len(outdated)} por migrar")
+        for alias in missing:
+            self.stdout.write(self.style.WARNING(f"{alias}: registrado pero sin archivo de base de datos"))
+
+        plan = TenantMigrationService.get_plan(outdated)
+        for migrations, aliases in sorted(plan.items(), key=lambda item: -len(item[1])):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{len(aliases)} negocios: {', '.join(aliases)}"))
+            if not migrations:
+                self.stdout.write("  Sin migraciones pendientes (falta registrar la huella)")
+            for app_label, name in migrations:
+                self.stdout.write(f"  {app_label}.{name}")
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app.business.services.provisioning_service import ProvisioningQueueService
+
+import os
+import socket
+import time
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de creación de bases de datos de negocios'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Termina cuando la cola queda vacía')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Segundos de espera cuando no hay trabajos')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Termina después de N trabajos (0 = sin límite)')
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+
+        created = ProvisioningQueueService.enqueue_missing()
+        if created:
+            self.stdout.write(f"Encolados {created} negocios pendientes sin trabajo")
+
+        self.stdout.write(f"Worker {worker_id} esperando trabajos...")
+        while True:
+            close_old_connections()
+            requeued = ProvisioningQueueService.requeue_stale()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Reencolados {requeued} trabajos abandonados"))
+
+            job = ProvisioningQueueService.claim_next(worker_id)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            start = time.perf_counter()
+            if ProvisioningQueueService.run_job(job):
+                self.stdout.write(self.style.SUCCESS(
+                    f"Negocio {job.business_id} listo en {time.perf_counter() - start:.2f}s"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f"Negocio {job.business_id}: intento {job.attempts} fallido"
+                ))
+
+            processed += 1
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(f"Trabajos procesados: {processed}")
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from app.business.services.purge_service import TenantPurgeService
+
+import time
+
+
+class Command(BaseCommand):
+    help = 'Borra en segundo plano las bases de datos de negocios eliminados y detecta archivos huérfanos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Termina cuando no quedan lápidas pendientes')
+        parser.add_argument('--sleep', type=float, default=10.0, help='Segundos de espera cuando no hay lápidas')
+        parser.add_argument('--batch-size', type=int, default=50, help='Lápidas procesadas por lote')
+        parser.add_argument('--scan', action='store_true', help='Compara los archivos en disco con el registro y termina')
+        parser.add_argument('--fix', action='store_true', help='Con --scan: crea lápidas para los archivos huérfanos')
+
+    def handle(self, *args, **options):
+        if options['scan']:
+            return self._scan(options['fix'])
+
+        total = 0
+        self.stdout.write("Purgando bases de datos de negocios eliminados...")
+        while True:
+            close_old_connections()
+            purged, failed = TenantPurgeService.purge_batch(options['batch_size'])
+            total += purged
+            if purged or failed:
+                self.stdout.write(f"Lote: {purged} purgadas, {failed} con error")
+
+            if not purged and not failed:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(f"Bases de datos purgadas: {total}")
+
+    def _scan(self, fix):
+        try:
+            orphans = TenantPurgeService.find_orphans()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for path in orphans['files']:
+            self.stdout.write(self.style.WARNING(f"Archivo sin negocio: {path}"))
+        for path in orphans['archives']:
+            self.stdout.write(self.style.WARNING(f"Archivo comprimido sin negocio: {path}"))
+        for business_id, name in orphans['missing']:
+            self.stdout.write(self.style.ERROR(f"business_{business_id}: registrado pero {name} no existe"))
+
+        self.stdout.write(
+            f"{len(orphans['files'])} archivo(s) huérfano(s), {len(orphans['archives'])} copia(s) huérfana(s), "
+            f"{len(orphans['missing'])} negocio(s) sin base de datos"
+        )
+        if fix:
+            created = TenantPurgeService.tombstone_orphans(orphans['files'], orphans['archives'])
+            self.stdout.write(self.style.SUCCESS(f"{created} lápida(s) creadas; purge_tenants las borrará"))
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.business.services.shard_ring import ShardRing
+from app.business.services.shard_service import ShardRebalanceService
+from app.business.services.tenant_provisioning import TenantProvisioningBusy
+
+
+class Command(BaseCommand):
+    help = 'Muestra la distribución de negocios por shard y mueve negocios entre shards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, help='ID del negocio a mover')
+        parser.add_argument('--to', dest='target', help='Shard destino para --business (p. ej. shard_03)')
+        parser.add_argument('--auto', action='store_true',
+                            help='Mueve los negocios cuyo shard no coincide con el anillo (tras cambiar TENANT_SHARDS)')
+        parser.add_argument('--dry-run', action='store_true', help='Muestra los movimientos sin ejecutarlos')
+
+    def handle(self, *args, **options):
+        try:
+            ShardRebalanceService.get_storage()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        ring = ShardRing.get_default()
+
+        if options['business'] is not None:
+            if options['target'] not in ring.shards:
+                raise CommandError(f"Shard destino inválido: {options['target']} (disponibles: {', '.join(ring.shards)})")
+            moves = [(options['business'], None, options['target'])]
+        elif options['auto']:
+            moves = ShardRebalanceService.get_misplaced()
+        else:
+            return self._show_stats(ring)
+
+        if not moves:
+            self.stdout.write(self.style.SUCCESS("Todos los negocios están en su shard"))
+            return
+
+        failed = 0
+        for business_id, current, target in moves:
+            if options['dry_run']:
+                self.stdout.write(f"business_{business_id}: {current} -> {target}")
+                continue
+            try:
+                moved = ShardRebalanceService.move(business_id, target)
+                self.stdout.write(self.style.SUCCESS(f"business_{business_id}: movido a {target} ({moved} filas)"))
+            except TenantProvisioningBusy:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"business_{business_id}: ocupado, se omite"))
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"business_{business_id}: {str(e)}"))
+
+        if failed:
+            raise CommandError(f"{failed} negocio(s) no se movieron")
+
+    def _show_stats(self, ring):
+        stats = ShardRebalanceService.get_stats()
+        for shard in sorted(set(ring.shards) | set(stats)):
+            marker = '' if shard in ring.shards else ' (fuera del anillo)'
+            self.stdout.write(f"{shard}: {stats.get(shard, 0)} negocio(s){marker}")
+        misplaced = len(ShardRebalanceService.get_misplaced())
+        if misplaced:
+            self.stdout.write(self.style.WARNING(f"{misplaced} negocio(s) fuera de su shard; use --auto para moverlos"))
@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.business.services.schema_scan_service import TenantSchemaScanService
+
+import time
+
+
+class Command(BaseCommand):
+    help = 'Revisa en paralelo el esquema (huella) y la integridad (quick_check) de las bases de datos de negocios'
+
+    # Negocios y diferencias que se muestran por grupo
+    SHOW_LIMIT = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument('--business', type=int, action='append', dest='businesses',
+                            help='ID de negocio (repetible); por defecto todos los registrados')
+        parser.add_argument('--workers', type=int, help='Bases de datos revisadas a la vez (TENANT_SCAN_WORKERS)')
+        parser.add_argument('--reference', type=int,
+                            help='Negocio con el esquema correcto; por defecto el esquema mayoritario')
+        parser.add_argument('--skip-check', action='store_true', help='Solo compara esquemas, sin PRAGMA quick_check')
+
+    def handle(self, *args, **options):
+        try:
+            TenantSchemaScanService.check_storage()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        tenants, missing = TenantSchemaScanService.get_tenants(options['businesses'])
+        if options['reference'] and options['reference'] not in {tenant[0] for tenant in tenants}:
+            tenants += TenantSchemaScanService.get_tenants([options['reference']])[0]
+
+        start = time.perf_counter()
+        results = []
+        # Un esquema completo por huella: con miles de negocios no se guardan todos
+        schemas = {}
+        for result in TenantSchemaScanService.scan(
+            tenants, workers=options['workers'], quick_check=not options['skip_check']
+        ):
+            schema = result.pop('schema')
+            if result['hash'] is not None:
+                schemas.setdefault(result['hash'], schema)
+            results.append(result)
+        elapsed = time.perf_counter() - start
+
+        for alias in missing:
+            self.stdout.write(self.style.ERROR(f"{alias}: registrado pero sin archivo de base de datos"))
+
+        failed = [result for result in results if result['error']]
+        for result in failed:
+            self.stdout.write(self.style.ERROR(f"{result['alias']}: no se pudo leer - {result['error']}"))
+
+        corrupt = [result for result in results if result['check']]
+        for result in corrupt:
+            self.stdout.write(self.style.ERROR(f"{result['alias']}: quick_check falló"))
+            for message in result['check']:
+                self.stdout.write(f"    {message}")
+
+        reference = None
+        if options['reference']:
+            reference = next(
+                (result['hash'] for result in results if result['business_id'] == options['reference']), None
+            )
+            if reference is None:
+                raise CommandError(f"No se pudo leer el esquema del negocio {options['reference']}")
+        reference, groups = TenantSchemaScanService.group(results, reference)
+
+        drifted = 0
+        if groups:
+            expected = schemas[reference]
+            self.stdout.write(f"Esquema de referencia {reference}: {len(groups[reference])} negocios")
+            for schema_hash, members in sorted(groups.items(), key=lambda item: -len(item[1])):
+                if schema_hash == reference:
+                    continue
+                drifted += len(members)
+                aliases = ', '.join(member['alias'] for member in members[:self.SHOW_LIMIT])
+                if len(members) > self.SHOW_LIMIT:
+                    aliases += f" y {len(members) - self.SHOW_LIMIT} más"
+                self.stdout.write(self.style.WARNING(f"Esquema {schema_hash}: {len(members)} negocios ({aliases})"))
+                self._show_diff(TenantSchemaScanService.diff(expected, schemas[schema_hash]))
+
+        self.stdout.write(
+            f"Resumen: {len(results)} bases de datos, {len(groups)} esquemas, {drifted} con esquema distinto, "
+            f"{len(corrupt)} con errores de integridad, {len(failed) + len(missing)} ilegibles en {elapsed:.2f}s"
+        )
+        problems = drifted + len(corrupt) + len(failed) + len(missing)
+        if problems:
+            raise CommandError(f"{problems} base(s) de datos con problemas")
+        self.stdout.write(self.style.SUCCESS("Todas las bases de datos tienen el mismo esquema y están íntegras"))
+
+    def _show_diff(self, diff):
+        labels = {'missing': 'falta', 'extra': 'sobra', 'changed': 'distinto'}
+        for kind, label in labels.items():
+            for key in diff[kind][:self.SHOW_LIMIT]:
+                self.stdout.write(f"    {label}: {key}")
+            if len(diff[kind]) > self.SHOW_LIMIT:
+                self.stdout.write(f"    {label}: ... y {len(diff[kind]) - self.SHOW_LIMIT} más")
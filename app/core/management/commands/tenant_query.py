@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.business.services.tenant_fanout import TenantFanoutService
+
+import sqlparse
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta una consulta SQL en las bases de datos de los negocios de forma concurrente. '
+        'Solo lectura: las escrituras fallan en cada negocio'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sql', help='Una sola consulta SQL (se ejecuta igual en cada negocio)')
+        parser.add_argument('--business', type=int, action='append', dest='businesses',
+                            help='ID de negocio (repetible); por defecto todos los registrados')
+        parser.add_argument('--workers', type=int, help='Negocios consultados a la vez')
+        parser.add_argument('--timeout', type=float, help='Segundos máximos por negocio')
+
+    def handle(self, *args, **options):
+        # Varias sentencias permitirían quitar el modo de solo lectura antes de escribir
+        if len([statement for statement in sqlparse.split(options['sql']) if statement.strip()]) != 1:
+            raise CommandError("Indique una sola sentencia SQL")
+
+        start = time.perf_counter()
+        total = 0
+        errors = {}
+
+        for item in TenantFanoutService.run(
+            options['sql'],
+            businesses=options['businesses'],
+            workers=options['workers'],
+            timeout=options['timeout'],
+            read_only=True,
+        ):
+            total += 1
+            if not item.ok:
+                errors[item.business_id] = item.error
+                continue
+            for row in item.result:
+                self.stdout.write('\t'.join([str(item.business_id)] + [str(value) for value in row]))
+
+        elapsed = time.perf_counter() - start
+        for business_id, error in sorted(errors.items()):
+            self.stdout.write(self.style.ERROR(f"business_{business_id}: {error}"))
+        self.stdout.write(f"{total} negocios consultados en {elapsed:.2f}s, {len(errors)} con error")
+
+        if errors:
+            raise CommandError(f"{len(errors)} negocio(s) fallaron")
@@ -0,0 +1,75 @@
+# Django REST Framework
+from rest_framework import exceptions, permissions
+
+# Models
+from app.roles.models.role import RolePermission
+
+
+def get_request_permission_bits(request):
+    """
+    Máscara de permisos del usuario de la petición, calculada una sola vez por petición.
+
+    Returns:
+        int: Máscara de permisos (0 si el usuario no pertenece a un negocio)
+    """
+    try:
+        return request._business_permission_bits
+    except AttributeError:
+        pass
+
+    user = request.user
+    if user.is_authenticated and user.business_id:
+        bits = user.get_business_permission_bits()
+    else:
+        bits = 0
+    request._business_permission_bits = bits
+    return bits
+
+
+class HasBusinessPermission(permissions.BasePermission):
+    """
+    Exige que el usuario tenga todos los permisos indicados en su negocio.
+
+    Se usa como instancia dentro de permission_classes:
+
+        permission_classes = [
+            permissions.IsAuthenticated,
+            HasBusinessPermission('can_manage_roles', methods=['POST', 'PATCH']),
+        ]
+
+    Si se indican métodos, la comprobación solo se aplica a ellos.
+    """
+
+    message = "No tienes permiso para realizar esta acción"
+
+    def __init__(self, *permission_names, methods=None, message=None):
+        self.permission_names = permission_names
+        # La máscara se calcula aquí para que cada petición solo haga una operación de bits
+        self.mask = RolePermission.get_mask(*permission_names)
+        self.methods = {method.upper() for method in methods} if methods else None
+        if message is not None:
+            self.message = message
+
+    def __call__(self):
+        # DRF instancia cada elemento de permission_classes; la instancia ya está configurada
+        return self
+
+    def has_permission(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        return get_request_permission_bits(request) & self.mask == self.mask
+
+
+class BusinessPermissionErrorMixin:
+    """
+    Responde a los permisos denegados con {"error": ...}, el formato que usan
+    las vistas de roles y solicitudes, en lugar del {"detail": ...} de DRF.
+    """
+
+    def permission_denied(self, request, message=None, code=None):
+        # Sin autenticar se mantiene la respuesta 401 de DRF
+        if request.authenticators and not request.successful_authenticator:
+            super().permission_denied(request, message=message, code=code)
+        raise exceptions.PermissionDenied(
+            {'error': message or exceptions.PermissionDenied.default_detail}, code=code
+        )
@@ -9,7 +9,7 @@ from app.roles.models.role import RolePermission, BusinessRole
 class RolePermissionSerializer(serializers.ModelSerializer):
     class Meta:
         model = RolePermission
-        exclude = ['id', 'business_role', 'created_at', 'updated_at']
+        exclude = ['id', 'business_role', 'permission_bits', 'created_at', 'updated_at']
         
 
 class BusinessRoleSerializer(serializers.ModelSerializer):
@@ -1,5 +1,5 @@
 # API views for managing user authentication, business roles, and permissions.
-from rest_framework import viewsets, permissions, status
+from rest_framework import exceptions, viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -10,20 +10,30 @@ from app.roles.models.role import BusinessRole
 # Serializers
 from app.roles.api.serializers import (BusinessRoleSerializer, RolePermissionSerializer,BusinessRoleUpdateSerializer)
 
+# Permissions
+from app.roles.api.permissions import BusinessPermissionErrorMixin, HasBusinessPermission
+
 # Validators
-from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.exceptions import ValidationError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class BusinessRoleViewSet(viewsets.ModelViewSet):
+class BusinessRoleViewSet(BusinessPermissionErrorMixin, viewsets.ModelViewSet):
     """
     Endpoints para gestionar roles personalizados de un negocio.
     Solo los administradores pueden crear, modificar y eliminar roles.
     """
     serializer_class = BusinessRoleSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [
+        permissions.IsAuthenticated,
+        HasBusinessPermission('can_manage_roles', methods=['POST'], message="No tienes permiso para crear roles"),
+        HasBusinessPermission(
+            'can_manage_roles', methods=['PUT', 'PATCH'], message="No tienes permiso para modificar roles"
+        ),
+        HasBusinessPermission('can_manage_roles', methods=['DELETE'], message="No tienes permiso para eliminar roles"),
+    ]
 
     def get_queryset(self):
         # Solo mostrar roles del negocio del usuario autenticado
@@ -43,35 +53,22 @@ class BusinessRoleViewSet(viewsets.ModelViewSet):
         return BusinessRoleSerializer
     
     def perform_create(self, serializer):
-        # Verificar que el usuario tiene permiso para gestionar roles
-        user = self.request.user
-        if not user.has_business_permission('can_manage_roles'):
-            raise PermissionDenied("No tienes permiso para crear roles")
-            
-        serializer.save(business=user.business)
+        # El permiso para gestionar roles lo verifica HasBusinessPermission
+        serializer.save(business=self.request.user.business)
     
     def perform_update(self, serializer):
-        # Verificar que el usuario tiene permiso y que el rol se puede modificar
-        user = self.request.user
+        # Verificar que el rol se puede modificar
         instance = self.get_object()
         
-        if not user.has_business_permission('can_manage_roles'):
-            raise PermissionDenied("No tienes permiso para modificar roles")
-            
         if not instance.can_modify:
-            raise PermissionDenied("Este rol no se puede modificar")
+            raise exceptions.PermissionDenied({'error': "Este rol no se puede modificar"})
             
         serializer.save()
     
     def perform_destroy(self, instance):
-        # Verificar que el usuario tiene permiso y que el rol se puede eliminar
-        user = self.request.user
-        
-        if not user.has_business_permission('can_manage_roles'):
-            raise PermissionDenied("No tienes permiso para eliminar roles")
-            
+        # Verificar que el rol se puede eliminar
         if not instance.can_modify:
-            raise PermissionDenied("Este rol no se puede eliminar")
+            raise exceptions.PermissionDenied({'error': "Este rol no se puede eliminar"})
             
         # Verificar que no haya usuarios con este rol
         if instance.users.exists():
@@ -79,12 +76,15 @@ class BusinessRoleViewSet(viewsets.ModelViewSet):
             
         instance.delete()
 
-class AssignRoleToUserView(APIView):
+class AssignRoleToUserView(BusinessPermissionErrorMixin, APIView):
     """
     Endpoint para asignar un rol específico a un usuario dentro del mismo negocio.
     Solo los administradores pueden asignar roles.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [
+        permissions.IsAuthenticated,
+        HasBusinessPermission('can_manage_users', message="No tienes permiso para asignar roles"),
+    ]
     
     def post(self, request):
         user_id = request.data.get('user_id')
@@ -96,13 +96,6 @@ class AssignRoleToUserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Verificar permisos del usuario autenticado
-        if not request.user.has_business_permission('can_manage_users'):
-            return Response(
-                {"error": "No tienes permiso para asignar roles"}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
         try:
             # Obtener el usuario y el rol, verificando que pertenezcan al mismo negocio
             target_user = CustomUser.objects.get(
@@ -139,21 +132,17 @@ class AssignRoleToUserView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class RolePermissionUpdateView(APIView):
+class RolePermissionUpdateView(BusinessPermissionErrorMixin, APIView):
     """
     Endpoint para actualizar los permisos de un rol específico.
     Solo los administradores pueden modificar permisos.
     """
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [
+        permissions.IsAuthenticated,
+        HasBusinessPermission('can_manage_roles', message="No tienes permiso para modificar permisos de roles"),
+    ]
     
     def patch(self, request, role_id):
-        # Verificar permisos del usuario autenticado
-        if not request.user.has_business_permission('can_manage_roles'):
-            return Response(
-                {"error": "No tienes permiso para modificar permisos de roles"}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
         try:
             # Obtener el rol, verificando que pertenezca al negocio del usuario
             role = BusinessRole.objects.get(
@@ -213,11 +202,8 @@ class UserPermissionsView(APIView):
             role = user.business_role
             permissions = role.role_permissions
             
-            # Convertir el modelo de permisos a diccionario
-            permission_dict = {}
-            for field in permissions._meta.get_fields():
-                if field.name.startswith('can_'):
-                    permission_dict[field.name] = getattr(permissions, field.name)
+            # Convertir la máscara de permisos a diccionario
+            permission_dict = permissions.as_dict()
                     
             return Response({
                 "role": {
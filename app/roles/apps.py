@@ -5,3 +5,7 @@ class RolesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.roles'
     verbose_name = 'Roles y Permisos'
+
+    def ready(self):
+        # Invalidación de la caché de permisos de roles
+        import app.roles.signals
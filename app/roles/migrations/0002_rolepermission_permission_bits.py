@@ -0,0 +1,47 @@
+# Generated by Django 5.2 on 2026-10-17 06:02
+
+from django.db import migrations, models
+
+
+# Copia del orden de RolePermission.PERMISSION_FIELDS al momento de esta migración
+PERMISSION_FIELDS = (
+    'can_view_dashboard',
+    'can_manage_users',
+    'can_manage_roles',
+    'can_view_orders',
+    'can_create_orders',
+    'can_update_orders',
+    'can_delete_orders',
+    'can_view_inventory',
+    'can_manage_inventory',
+    'can_view_reports',
+    'can_export_data',
+)
+
+
+def fill_permission_bits(apps, schema_editor):
+    """Calcula la máscara de bits de los permisos existentes"""
+    RolePermission = apps.get_model('roles', 'RolePermission')
+    db_alias = schema_editor.connection.alias
+    for permission in RolePermission.objects.using(db_alias).all():
+        bits = 0
+        for index, name in enumerate(PERMISSION_FIELDS):
+            if getattr(permission, name):
+                bits |= 1 << index
+        RolePermission.objects.using(db_alias).filter(pk=permission.pk).update(permission_bits=bits)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rolepermission',
+            name='permission_bits',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Máscara de permisos'),
+        ),
+        migrations.RunPython(fill_permission_bits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roles', '0002_rolepermission_permission_bits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessrole',
+            name='permissions_version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versión de permisos'),
+        ),
+    ]
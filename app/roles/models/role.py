@@ -19,6 +19,8 @@ class BusinessRole(models.Model):
     description = models.TextField(_("Descripción"), blank=True, null=True)
     is_default = models.BooleanField(_("Es rol predeterminado"), default=False)
     can_modify = models.BooleanField(_("Se puede modificar"), default=True)
+    # Se incrementa con cada cambio del rol o de sus permisos; los tokens la llevan en perm_version
+    permissions_version = models.PositiveIntegerField(_("Versión de permisos"), default=1, editable=False)
     created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Fecha de actualización"), auto_now=True)
     
@@ -31,6 +33,18 @@ class BusinessRole(models.Model):
     def __str__(self):
         return f"{self.business.name} - {self.name}"
     
+    def get_permission_bits(self):
+        """
+        Máscara de permisos efectiva del rol.
+        Los administradores tienen todos los permisos en su negocio.
+        """
+        if self.name.lower() in ['admin']:
+            return RolePermission.ALL_PERMISSIONS
+        try:
+            return self.role_permissions.permission_bits
+        except RolePermission.DoesNotExist:
+            return 0
+    
     def save(self, *args, **kwargs):
         """Sobrescrito para manejar roles predeterminados"""
         creating = self.pk is None
@@ -102,8 +116,31 @@ class RolePermission(models.Model):
     """
     Permisos específicos para cada rol de negocio.
     Define las acciones que pueden realizar los usuarios con este rol.
+    
+    Además de los campos booleanos se mantiene una máscara de bits
+    (permission_bits) sincronizada en save(), para verificar uno o varios
+    permisos con una sola operación.
     """
     
+    # Orden fijo de los bits: los permisos nuevos siempre se agregan al final
+    PERMISSION_FIELDS = (
+        'can_view_dashboard',
+        'can_manage_users',
+        'can_manage_roles',
+        'can_view_orders',
+        'can_create_orders',
+        'can_update_orders',
+        'can_delete_orders',
+        'can_view_inventory',
+        'can_manage_inventory',
+        'can_view_reports',
+        'can_export_data',
+    )
+    PERMISSION_BITS = {name: 1 << index for index, name in enumerate(PERMISSION_FIELDS)}
+    ALL_PERMISSIONS = (1 << len(PERMISSION_FIELDS)) - 1
+    # Bit que ningún rol tiene: los permisos desconocidos nunca se conceden
+    UNKNOWN_PERMISSION = 1 << len(PERMISSION_FIELDS)
+    
     business_role = models.OneToOneField(
         'roles.BusinessRole', 
         on_delete=models.CASCADE, 
@@ -132,6 +169,9 @@ class RolePermission(models.Model):
     can_view_reports = models.BooleanField(_("Puede ver reportes"), default=False)
     can_export_data = models.BooleanField(_("Puede exportar datos"), default=False)
     
+    # Máscara de bits de los permisos anteriores
+    permission_bits = models.PositiveIntegerField(_("Máscara de permisos"), default=0, editable=False)
+    
     # Fechas de auditoría
     created_at = models.DateTimeField(_("Fecha de creación"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Fecha de actualización"), auto_now=True)
@@ -142,4 +182,63 @@ class RolePermission(models.Model):
     
     def __str__(self):
         return f"Permisos para {self.business_role.name}"
-    
\ No newline at end of file
+    
+    def save(self, *args, **kwargs):
+        """Sincroniza la máscara de bits con los campos booleanos"""
+        self.permission_bits = self.compute_bits()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'permission_bits' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'permission_bits']
+        super().save(*args, **kwargs)
+    
+    def compute_bits(self):
+        """Calcula la máscara de bits a partir de los campos booleanos"""
+        bits = 0
+        for name, bit in self.PERMISSION_BITS.items():
+            if getattr(self, name):
+                bits |= bit
+        return bits
+    
+    @classmethod
+    def get_mask(cls, *permission_names):
+        """
+        Máscara con los bits de los permisos indicados.
+        
+        Args:
+            *permission_names (str): Nombres de permisos (ej: 'can_view_orders')
+            
+        Returns:
+            int: Máscara de bits
+        """
+        mask = 0
+        for name in permission_names:
+            mask |= cls.PERMISSION_BITS.get(name, cls.UNKNOWN_PERMISSION)
+        return mask
+    
+    @classmethod
+    def bits_have_all(cls, bits, *permission_names):
+        """Verifica que una máscara tenga todos los permisos indicados"""
+        mask = cls.get_mask(*permission_names)
+        return bits & mask == mask
+    
+    @classmethod
+    def bits_have_any(cls, bits, *permission_names):
+        """Verifica que una máscara tenga al menos uno de los permisos indicados"""
+        return bits & cls.get_mask(*permission_names) != 0
+    
+    @classmethod
+    def bits_to_dict(cls, bits):
+        """Convierte una máscara en un diccionario {permiso: bool}"""
+        return {name: bits & bit != 0 for name, bit in cls.PERMISSION_BITS.items()}
+    
+    def has_permissions(self, *permission_names):
+        """Verifica que el rol tenga todos los permisos indicados"""
+        return self.bits_have_all(self.permission_bits, *permission_names)
+    
+    def has_any_permission(self, *permission_names):
+        """Verifica que el rol tenga al menos uno de los permisos indicados"""
+        return self.bits_have_any(self.permission_bits, *permission_names)
+    
+    def as_dict(self):
+        """Permisos del rol como diccionario {permiso: bool}"""
+        return self.bits_to_dict(self.permission_bits)
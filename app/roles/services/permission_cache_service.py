@@ -0,0 +1,124 @@
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# Models
+from app.roles.models.role import BusinessRole
+
+# Management
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RolePermissionCache:
+    """
+    Caché compartida de la máscara de permisos efectiva y la versión de cada rol.
+
+    Las claves incluyen un contador de versión por negocio; cualquier cambio en
+    los roles o permisos del negocio incrementa la versión y deja obsoletas todas
+    sus entradas a la vez. Usa el framework de caché de Django, así todos los
+    procesos que compartan el backend ven los cambios de inmediato.
+    """
+
+    VERSION_KEY = 'role_perms_version:{business_id}'
+    BITS_KEY = 'role_perms:{business_id}:{version}:{role_id}'
+
+    @staticmethod
+    def get_timeout():
+        """Segundos que se conserva la máscara de un rol"""
+        return getattr(settings, 'ROLE_PERMISSION_CACHE_TIMEOUT', 3600)
+
+    @staticmethod
+    def _initial_version():
+        # Si el contador se pierde de la caché no debe volver a un valor ya usado
+        return time.time_ns()
+
+    @classmethod
+    def get_version(cls, business_id):
+        """
+        Versión actual de los permisos de un negocio.
+
+        Args:
+            business_id (int): ID del negocio
+
+        Returns:
+            int: Versión vigente
+        """
+        key = cls.VERSION_KEY.format(business_id=business_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, cls._initial_version(), None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def bump_version(cls, business_id):
+        """
+        Invalida todos los permisos cacheados de un negocio.
+
+        Args:
+            business_id (int): ID del negocio
+        """
+        key = cls.VERSION_KEY.format(business_id=business_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # La versión no existía: cualquier valor nuevo deja obsoletas las entradas anteriores
+            cache.set(key, cls._initial_version(), None)
+
+    @classmethod
+    def get_role_entry(cls, business_id, role_id):
+        """
+        Máscara de permisos y versión de un rol, consultando la base de datos solo si no están en caché.
+
+        La versión del rol se guarda en la base de datos (BusinessRole.permissions_version);
+        la caché solo evita la consulta, así que perderla no cambia el resultado.
+
+        Args:
+            business_id (int): ID del negocio del rol
+            role_id (int): ID del rol
+
+        Returns:
+            tuple: (máscara de permisos, versión de permisos), (0, 0) si el rol no existe
+        """
+        key = cls.BITS_KEY.format(
+            business_id=business_id,
+            version=cls.get_version(business_id),
+            role_id=role_id
+        )
+        entry = cache.get(key)
+        if entry is None:
+            role = BusinessRole.objects.select_related('role_permissions').filter(pk=role_id).first()
+            entry = (role.get_permission_bits(), role.permissions_version) if role else (0, 0)
+            cache.set(key, entry, cls.get_timeout())
+        return entry
+
+    @classmethod
+    def get_role_bits(cls, business_id, role_id):
+        """
+        Máscara de permisos efectiva de un rol.
+
+        Args:
+            business_id (int): ID del negocio del rol
+            role_id (int): ID del rol
+
+        Returns:
+            int: Máscara de permisos (0 si el rol no existe)
+        """
+        return cls.get_role_entry(business_id, role_id)[0]
+
+    @classmethod
+    def get_role_version(cls, business_id, role_id):
+        """
+        Versión de permisos de un rol.
+
+        Args:
+            business_id (int): ID del negocio del rol
+            role_id (int): ID del rol
+
+        Returns:
+            int: Versión de permisos (0 si el rol no existe)
+        """
+        return cls.get_role_entry(business_id, role_id)[1]
@@ -0,0 +1,53 @@
+# Django
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Models
+from app.roles.models.role import BusinessRole, RolePermission
+
+# Services
+from app.roles.services.permission_cache_service import RolePermissionCache
+
+
+def bump_version_on_commit(business_id, using):
+    """
+    Invalida los permisos cacheados cuando la transacción se confirma.
+
+    Antes del commit otra petición podría volver a cachear los permisos antiguos
+    con la versión nueva, y un rollback invalidaría la caché sin motivo.
+    """
+    transaction.on_commit(lambda: RolePermissionCache.bump_version(business_id), using=using)
+
+
+def bump_role_version(role_id, using):
+    """
+    Incrementa la versión de permisos guardada en el rol.
+
+    Se actualiza en la misma transacción que el cambio: la versión vive en la base
+    de datos default y los tokens de los demás roles del negocio siguen vigentes.
+    """
+    BusinessRole.objects.using(using).filter(pk=role_id).update(
+        permissions_version=F('permissions_version') + 1
+    )
+
+
+@receiver([post_save, post_delete], sender=BusinessRole)
+def bump_role_permissions_version(sender, instance, using, created=False, **kwargs):
+    """Invalida los permisos cacheados del negocio del rol modificado"""
+    if not created:
+        bump_role_version(instance.pk, using)
+    bump_version_on_commit(instance.business_id, using)
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def bump_permissions_version(sender, instance, using, created=False, **kwargs):
+    """Invalida los permisos cacheados del negocio cuyo rol cambió de permisos"""
+    if not created:
+        bump_role_version(instance.business_role_id, using)
+    business_id = BusinessRole.objects.using(using).filter(
+        pk=instance.business_role_id
+    ).values_list('business_id', flat=True).first()
+    if business_id:
+        bump_version_on_commit(business_id, using)
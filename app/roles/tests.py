@@ -0,0 +1,272 @@
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+# Django REST Framework
+from rest_framework.test import APIClient
+
+# Tests
+from app.business.tests import TenantTestCase
+
+# Models
+from app.accounts.models import CustomUser
+from app.business.models.business import Business
+from app.roles.models.role import BusinessRole, RolePermission
+
+# Services
+from app.accounts.api.tokens import BusinessRefreshToken
+from app.business.services.archive_service import TenantArchiveService
+from app.business.services.provisioning_service import ProvisioningQueueService
+from app.roles.services.permission_cache_service import RolePermissionCache
+
+# Management
+from unittest import mock
+
+
+def api_client(user):
+    """Cliente autenticado con un token de acceso del usuario (claims del negocio incluidos)"""
+    client = APIClient()
+    token = BusinessRefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RoleTestCase(TestCase):
+    """Negocio con sus roles predeterminados (Admin y Viewer); la base de datos del negocio no se crea"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.create_user(
+            username='owner', email='owner@example.com', password='pass12345678'
+        )
+        self.business = Business.objects.create(name='Negocio', owner=self.owner)
+        self.viewer_role = BusinessRole.objects.get(business=self.business, name='Viewer')
+        self.member = CustomUser.objects.create_user(
+            username='member', email='member@example.com', password='pass12345678'
+        )
+        self.member.business = self.business
+        self.member.business_role = self.viewer_role
+        self.member.save()
+
+
+class RolePermissionBitsTests(RoleTestCase):
+
+    def test_bits_follow_the_boolean_fields(self):
+        permissions = self.viewer_role.role_permissions
+
+        self.assertEqual(permissions.permission_bits, permissions.compute_bits())
+        self.assertTrue(permissions.has_permissions('can_view_dashboard', 'can_view_orders'))
+        self.assertFalse(permissions.has_permissions('can_view_orders', 'can_delete_orders'))
+        self.assertTrue(permissions.has_any_permission('can_view_orders', 'can_delete_orders'))
+        self.assertEqual(
+            permissions.as_dict(),
+            {name: getattr(permissions, name) for name in RolePermission.PERMISSION_FIELDS},
+        )
+
+    def test_save_with_update_fields_keeps_the_mask_in_sync(self):
+        permissions = self.viewer_role.role_permissions
+        permissions.can_export_data = True
+        permissions.save(update_fields=['can_export_data'])
+
+        permissions.refresh_from_db()
+        self.assertTrue(permissions.has_permissions('can_export_data'))
+        self.assertEqual(permissions.permission_bits, permissions.compute_bits())
+
+    def test_unknown_permissions_are_never_granted(self):
+        all_bits = RolePermission.ALL_PERMISSIONS
+
+        self.assertFalse(RolePermission.bits_have_all(all_bits, 'can_fly'))
+        self.assertFalse(RolePermission.bits_have_all(all_bits, 'can_view_orders', 'can_fly'))
+        self.assertFalse(RolePermission.bits_have_any(all_bits, 'can_fly'))
+
+    def test_admin_role_has_every_permission(self):
+        self.assertEqual(self.owner.get_business_permission_bits(), RolePermission.ALL_PERMISSIONS)
+        self.assertTrue(self.owner.has_business_permissions(*RolePermission.PERMISSION_FIELDS))
+        self.assertFalse(self.member.has_business_permissions('can_manage_roles'))
+        self.assertTrue(self.member.has_business_permission('can_view_orders'))
+
+
+class RolePermissionCacheTests(RoleTestCase):
+
+    def test_role_bits_are_cached_until_the_version_changes(self):
+        permissions = self.viewer_role.role_permissions
+        bits = RolePermissionCache.get_role_bits(self.business.id, self.viewer_role.id)
+        self.assertEqual(bits, permissions.permission_bits)
+
+        # Un update directo no dispara señales: la caché sigue devolviendo la máscara anterior
+        RolePermission.objects.filter(pk=permissions.pk).update(permission_bits=0)
+        self.assertEqual(RolePermissionCache.get_role_bits(self.business.id, self.viewer_role.id), bits)
+
+        RolePermissionCache.bump_version(self.business.id)
+        self.assertEqual(RolePermissionCache.get_role_bits(self.business.id, self.viewer_role.id), 0)
+
+    def test_version_is_bumped_only_after_commit(self):
+        version = RolePermissionCache.get_version(self.business.id)
+        permissions = self.viewer_role.role_permissions
+
+        with self.captureOnCommitCallbacks(execute=True):
+            permissions.can_export_data = True
+            permissions.save()
+            # Dentro de la transacción otros procesos aún leerían el permiso anterior
+            self.assertEqual(RolePermissionCache.get_version(self.business.id), version)
+
+        self.assertGreater(RolePermissionCache.get_version(self.business.id), version)
+        self.assertTrue(self.member.has_business_permissions('can_export_data'))
+
+    def test_rolled_back_change_keeps_the_version(self):
+        version = RolePermissionCache.get_version(self.business.id)
+        permissions = self.viewer_role.role_permissions
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    permissions.can_export_data = True
+                    permissions.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(RolePermissionCache.get_version(self.business.id), version)
+
+    def test_role_version_is_stored_per_role(self):
+        admin_role = BusinessRole.objects.get(business=self.business, name='Admin')
+        admin_version = admin_role.permissions_version
+        viewer_version = self.viewer_role.permissions_version
+        permissions = self.viewer_role.role_permissions
+
+        with self.captureOnCommitCallbacks(execute=True):
+            permissions.can_export_data = True
+            permissions.save()
+        cache.clear()
+
+        self.assertEqual(RolePermissionCache.get_role_version(self.business.id, self.viewer_role.id), viewer_version + 1)
+        self.assertEqual(RolePermissionCache.get_role_version(self.business.id, admin_role.id), admin_version)
+
+    def test_deleting_a_role_bumps_the_version(self):
+        role = BusinessRole.objects.create(business=self.business, name='Temporal')
+        version = RolePermissionCache.get_version(self.business.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            role.delete()
+
+        self.assertGreater(RolePermissionCache.get_version(self.business.id), version)
+
+
+class BusinessPermissionApiTests(TenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.business = self.create_business()
+        self.owner = self.business.owner
+        self.viewer_role = BusinessRole.objects.get(business=self.business, name='Viewer')
+        self.member = CustomUser.objects.create_user(
+            username='member', email='member@example.com', password='pass12345678'
+        )
+        self.member.business = self.business
+        self.member.business_role = self.viewer_role
+        self.member.save()
+
+    def test_denied_permission_keeps_the_error_payload(self):
+        client = api_client(self.member)
+        with self.assertLogs('django.request', 'WARNING'):
+            response = client.patch(
+                f"/api/roles/roles/{self.viewer_role.id}/permissions/", {'can_export_data': True}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': "No tienes permiso para modificar permisos de roles"})
+
+        with self.assertLogs('django.request', 'WARNING'):
+            response = client.post(
+                '/api/roles/assign-role/', {'user_id': self.member.id, 'role_id': self.viewer_role.id}, format='json'
+            )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': "No tienes permiso para asignar roles"})
+
+    def test_unauthenticated_request_gets_401(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            response = APIClient().patch(
+                f"/api/roles/roles/{self.viewer_role.id}/permissions/", {'can_export_data': True}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_allowed_permission_reaches_the_view(self):
+        response = api_client(self.owner).patch(
+            f"/api/roles/roles/{self.viewer_role.id}/permissions/", {'can_export_data': True}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.member.has_business_permissions('can_export_data'))
+
+    def test_method_filter_only_checks_the_listed_methods(self):
+        client = api_client(self.member)
+
+        self.assertEqual(client.get('/api/roles/roles/').status_code, 200)
+        with self.assertLogs('django.request', 'WARNING'):
+            response = client.post('/api/roles/roles/', {'name': 'Nuevo'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': "No tienes permiso para crear roles"})
+
+    def test_each_role_action_has_its_own_denial(self):
+        client = api_client(self.member)
+        url = f"/api/roles/roles/{self.viewer_role.id}/"
+
+        with self.assertLogs('django.request', 'WARNING'):
+            response = client.patch(url, {'name': 'Lector'}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': "No tienes permiso para modificar roles"})
+
+        with self.assertLogs('django.request', 'WARNING'):
+            response = client.delete(url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': "No tienes permiso para eliminar roles"})
+
+    def test_protected_role_keeps_the_error_payload(self):
+        admin_role = BusinessRole.objects.get(business=self.business, name='Admin')
+
+        with self.assertLogs('django.request', 'WARNING'):
+            response = api_client(self.owner).delete(f"/api/roles/roles/{admin_role.id}/")
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': "Este rol no se puede eliminar"})
+
+    def test_permission_bits_are_computed_once_per_request(self):
+        with mock.patch.object(
+            CustomUser, 'get_business_permission_bits', autospec=True, return_value=0
+        ) as get_bits, self.assertLogs('django.request', 'WARNING'):
+            api_client(self.member).patch(
+                f"/api/roles/roles/{self.viewer_role.id}/permissions/", {'can_export_data': True}, format='json'
+            )
+
+        get_bits.assert_called_once()
+
+
+class TenantReadyApiTests(TenantTestCase):
+    """Las vistas de roles solo usan la base de datos default: no esperan a la del negocio"""
+
+    def test_pending_business_can_manage_roles(self):
+        with mock.patch.object(ProvisioningQueueService, 'run_job'):
+            business = self.create_business()
+        client = api_client(business.owner)
+
+        response = client.get('/api/roles/permissions/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['role']['name'], 'Admin')
+        viewer_role = BusinessRole.objects.get(business=business, name='Viewer')
+        response = client.patch(
+            f"/api/roles/roles/{viewer_role.id}/permissions/", {'can_export_data': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_archived_business_is_not_restored_by_role_views(self):
+        business = self.create_business()
+        TenantArchiveService.archive(business.id)
+
+        response = api_client(business.owner).get('/api/roles/permissions/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(TenantArchiveService.is_archived(business.id))
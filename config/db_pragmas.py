@@ -0,0 +1,59 @@
+# Django
+from django.conf import settings
+
+# Management
+from fnmatch import fnmatchcase
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# PRAGMAs que se pueden configurar en SQLITE_PRAGMAS, en el orden en que se aplican
+# (journal_mode primero: cambia el modo del archivo antes de ajustar el resto)
+ALLOWED_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+
+def get_sqlite_profile(alias):
+    """
+    Perfil de PRAGMAs para un alias de conexión.
+
+    Se busca primero el alias exacto en SQLITE_PRAGMAS y luego el primer patrón
+    (fnmatch) que coincida, p. ej. 'business_*' para las bases de datos de negocios.
+
+    Returns:
+        dict: PRAGMAs a aplicar (vacío si no hay perfil)
+    """
+    profiles = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if alias in profiles:
+        return profiles[alias]
+    for pattern, profile in profiles.items():
+        if fnmatchcase(alias, pattern):
+            return profile
+    return {}
+
+
+def get_pragma_statements(profile):
+    """Sentencias PRAGMA del perfil en el orden de ALLOWED_PRAGMAS"""
+    statements = []
+    for name in ALLOWED_PRAGMAS:
+        if name in profile:
+            value = profile[name]
+            if not isinstance(value, int) and not str(value).isalnum():
+                raise ValueError(f"Valor inválido para PRAGMA {name}: {value!r}")
+            statements.append(f"PRAGMA {name} = {value}")
+    unknown = set(profile) - set(ALLOWED_PRAGMAS)
+    if unknown:
+        logger.warning("PRAGMAs no soportados en SQLITE_PRAGMAS: %s", ', '.join(sorted(unknown)))
+    return statements
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Receptor de connection_created: aplica el perfil de rendimiento a cada conexión SQLite nueva"""
+    if connection.vendor != 'sqlite':
+        return
+    statements = get_pragma_statements(get_sqlite_profile(connection.alias))
+    if not statements:
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
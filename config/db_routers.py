@@ -1,4 +1,17 @@
 
+# Django
+from django.apps import apps
+
+# Contexto del negocio actual
+from config.middleware import get_current_business_id, get_current_db_alias, set_current_db_alias
+
+# Services
+from app.business.services.tenant_registry import TenantFence, TenantRegistry
+
+# Valor de la tabla de rutas para los modelos que viven en la base de datos del negocio
+TENANT = None
+
+
 class BusinessRouter:
     """
     Router para dirigir consultas a la base de datos correcta según el business.
@@ -8,39 +21,71 @@ class BusinessRouter:
     django_core_apps = {
         'admin', 'auth', 'contenttypes', 'sessions', 'messages', 
         'staticfiles', 'rest_framework', 'rest_framework_simplejwt',
-        'corsheaders', 'django_filters'
+        'token_blacklist', 'corsheaders', 'django_filters'
     }
     
+    # Aplicaciones compartidas por todos los negocios (usuarios, negocios, roles y tokens)
+    shared_apps = {'accounts', 'business', 'roles', 'authtoken'}
+    
+    # Tabla precompilada: clase de modelo -> 'default' o TENANT
+    route_table = {}
+    
+    @classmethod
+    def build_route_table(cls):
+        """Clasifica todos los modelos instalados; se llama una vez cuando las apps están listas"""
+        cls.route_table = {
+            model: cls.classify(model)
+            for model in apps.get_models(include_auto_created=True)
+        }
+    
+    @classmethod
+    def classify(cls, model):
+        """Devuelve 'default' para modelos compartidos o TENANT para modelos de negocio"""
+        return cls.classify_app(model._meta.app_label)
+    
+    @classmethod
+    def classify_app(cls, app_label):
+        """Igual que classify, por app: todos los modelos de una app van a la misma base de datos"""
+        if app_label in cls.django_core_apps or app_label in cls.shared_apps:
+            return 'default'
+        return TENANT
+    
     def db_for_read(self, model, **hints):
         """Determina qué base de datos usar para lecturas"""
-        app_label = model._meta.app_label
-        model_name = model._meta.model_name
+        try:
+            route = self.route_table[model]
+        except KeyError:
+            # Modelos no instalados (p. ej. modelos históricos de migraciones)
+            route = self.route_table[model] = self.classify(model)
         
-        # Los modelos de Django core siempre a default
-        if app_label in self.django_core_apps:
-            return 'default'
-        
-        # Todos los modelos de accounts van a default
-        if app_label == 'accounts' and model_name in ['business', 'customuser', 'businessrole', 'rolepermission']:
-            return 'default'
-        
-        # MODIFICAR ESTA PARTE - Verificar que la conexión exista antes de intentar usarla
-        from config.middleware import get_current_business_id
-        from django.conf import settings
+        if route is not TENANT:
+            return route
         
+        # El alias del negocio se resuelve una sola vez por contexto de petición
+        return get_current_db_alias() or self._resolve_tenant_alias()
+    
+    def db_for_write(self, model, **hints):
+        """Misma lógica que para lectura; las escrituras de un negocio bloqueado se rechazan"""
+        db_name = self.db_for_read(model, **hints)
+        if db_name != 'default':
+            # Archivado o cambio de shard en curso: TenantUnavailable (503 en BusinessMiddleware)
+            TenantFence.check(get_current_business_id())
+        return db_name
+    
+    @staticmethod
+    def _resolve_tenant_alias():
+        """Busca el alias del negocio actual en el registro y lo guarda en el contexto"""
+        db_name = 'default'
         business_id = get_current_business_id()
         if business_id:
-            db_name = f'business_{business_id}'
-            # Verificar si la base de datos existe en la configuración
-            if db_name in settings.DATABASES:
-                return db_name
+            # Si no hay business en el contexto o la bd no existe, usar default
+            db_name = TenantRegistry.resolve(business_id) or 'default'
+            if db_name != 'default':
+                # SQLite: acotar las conexiones abiertas; PostgreSQL: cambiar el search_path
+                TenantRegistry.activate(business_id)
         
-        # Si no hay business en el contexto o la bd no existe, usar default
-        return 'default'
-    
-    def db_for_write(self, model, **hints):
-        """Misma lógica que para lectura"""
-        return self.db_for_read(model, **hints)
+        set_current_db_alias(db_name)
+        return db_name
     
     def allow_relation(self, obj1, obj2, **hints):
         """Permitir relaciones entre objetos"""
@@ -58,17 +103,13 @@ class BusinessRouter:
     
     def allow_migrate(self, db, app_label, model_name=None, **hints):
         """Controla qué tablas se crean en qué bases de datos"""
-        # Apps core de Django solo migran a default
-        if app_label in self.django_core_apps:
-            return db == 'default'
-            
-        # Modelos de accounts migran a default
-        if app_label == 'business' and model_name in ['business', 'customuser', 'businessrole', 'rolepermission']:
+        # Apps core de Django y apps compartidas solo migran a default (sin lista de modelos)
+        if self.classify_app(app_label) is not TENANT:
             return db == 'default'
             
-        # En etapa inicial, permitimos migrar todos los demás modelos a business_1
-        if db.startswith('business_') and app_label not in self.django_core_apps:
+        # Modelos de negocio: en las bases de datos de los negocios
+        if db.startswith('business_'):
             return True
             
         # Por defecto, permitir migración a default
-        return db == 'default'
\ No newline at end of file
+        return db == 'default'
@@ -1,35 +1,143 @@
-import threading
+from contextvars import ContextVar
 
-# Variable thread-local para almacenar el business_id actual
-_thread_local = threading.local()
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+# Variables de contexto para el negocio actual: cada petición tiene su propio valor
+# tanto en hilos (WSGI) como en tareas concurrentes del mismo hilo (ASGI)
+_current_business_id = ContextVar('current_business_id', default=None)
+_current_db_alias = ContextVar('current_db_alias', default=None)
 
 def get_current_business_id():
-    """Obtiene el business_id almacenado en el hilo actual"""
-    return getattr(_thread_local, 'business_id', None)
+    """Obtiene el business_id del contexto actual"""
+    return _current_business_id.get()
 
 def set_current_business_id(business_id):
-    """Establece el business_id en el hilo actual"""
-    _thread_local.business_id = business_id
+    """Establece el business_id en el contexto actual"""
+    _current_business_id.set(business_id)
+    # El alias resuelto pertenecía al negocio anterior
+    _current_db_alias.set(None)
+
+def get_current_db_alias():
+    """Obtiene el alias de base de datos ya resuelto para el negocio del contexto actual"""
+    return _current_db_alias.get()
+
+def set_current_db_alias(db_alias):
+    """Guarda el alias resuelto por el router para no repetir la búsqueda en cada consulta"""
+    _current_db_alias.set(db_alias)
+
+def activate_business(business_id):
+    """
+    Activa un negocio en el contexto actual.
+
+    Returns:
+        tuple: Tokens para restaurar el contexto anterior con deactivate_business
+    """
+    return (_current_business_id.set(business_id), _current_db_alias.set(None))
+
+def deactivate_business(tokens):
+    """Restaura el negocio que estaba activo antes de activate_business"""
+    business_token, alias_token = tokens
+    _current_db_alias.reset(alias_token)
+    _current_business_id.reset(business_token)
+
 
-# Actualización en middleware.py
 class BusinessMiddleware:
+    """
+    Establece el negocio de la petición durante su ejecución.
+
+    Para peticiones con JWT el negocio se toma de los claims del token, sin
+    consultar la base de datos; en otro caso se usa el usuario de la sesión.
+    Funciona en modo síncrono (WSGI) y asíncrono (ASGI).
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
+        from app.accounts.api.tokens import BUSINESS_ID_CLAIM
+        from app.business.services.tenant_registry import TenantRegistry, TenantUnavailable
+
         self.get_response = get_response
+        self.business_id_claim = BUSINESS_ID_CLAIM
+        self.tenant_registry = TenantRegistry
+        self.tenant_unavailable = TenantUnavailable
+        self.jwt_authentication = JWTAuthentication()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Limpiar al inicio
-        set_current_business_id(None)
-        
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Aplicar los cambios del registro de negocios hechos por otros procesos
+        self.tenant_registry.maybe_refresh()
+
+        token = self.get_validated_token(request)
+        if token is not None:
+            business_id = token.get(self.business_id_claim)
+        else:
+            business_id = self.get_business_id(request.user)
+
+        tokens = activate_business(business_id)
+        try:
+            return self.get_response(request)
+        finally:
+            # Restaurar el contexto al final (asegurarse de que siempre se ejecute)
+            deactivate_business(tokens)
+
+    async def __acall__(self, request):
+        if self.tenant_registry.needs_refresh():
+            await sync_to_async(self.tenant_registry.refresh)()
+
+        token = self.get_validated_token(request)
+        if token is not None:
+            business_id = token.get(self.business_id_claim)
+        else:
+            business_id = self.get_business_id(await request.auser())
+
+        tokens = activate_business(business_id)
         try:
-            # Obtener el business_id del usuario autenticado
-            if request.user.is_authenticated and hasattr(request.user, 'business'):
-                if request.user.business:
-                    business_id = request.user.business.id
-                    set_current_business_id(business_id)
-            
-            response = self.get_response(request)
-            
-            return response
+            return await self.get_response(request)
         finally:
-            # Limpiar al final (asegurarse de que siempre se ejecute)
-            set_current_business_id(None)
\ No newline at end of file
+            deactivate_business(tokens)
+
+    def get_validated_token(self, request):
+        """
+        Valida el JWT del header Authorization sin cargar el usuario.
+        El token se guarda en la petición para que DRF no lo vuelva a validar.
+        """
+        header = self.jwt_authentication.get_header(request)
+        if header is None:
+            return None
+
+        try:
+            raw_token = self.jwt_authentication.get_raw_token(header)
+            if raw_token is None:
+                return None
+            token = self.jwt_authentication.get_validated_token(raw_token)
+        except (AuthenticationFailed, InvalidToken):
+            # DRF responderá con el error de autenticación correspondiente
+            return None
+
+        request.jwt_token = token
+        return token
+
+    def process_exception(self, request, exception):
+        """El negocio se está restaurando o moviendo: 503 para que el cliente reintente"""
+        if not isinstance(exception, self.tenant_unavailable):
+            return None
+        response = JsonResponse(
+            {'detail': str(exception), 'provisioning_status': 'unavailable'}, status=503
+        )
+        response['Retry-After'] = str(getattr(settings, 'TENANT_NOT_READY_RETRY_AFTER', 5))
+        return response
+
+    @staticmethod
+    def get_business_id(user):
+        """Obtiene el business_id del usuario autenticado sin consultar el negocio"""
+        if user.is_authenticated:
+            return getattr(user, 'business_id', None)
+        return None
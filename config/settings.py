@@ -37,6 +37,8 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken',
     'rest_framework_simplejwt',
+    # Registro de refresh tokens rotados (BLACKLIST_AFTER_ROTATION)
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'app.accounts',
@@ -100,9 +102,133 @@ DATABASES = {
         'PORT': '',
     },
 }
+# Perfil de rendimiento de SQLite aplicado a cada conexión nueva (config/db_pragmas.py).
+# Las claves son alias o patrones fnmatch; el alias exacto tiene prioridad sobre los patrones.
+# WAL permite lecturas concurrentes con un escritor y busy_timeout espera en vez de fallar
+# con 'database is locked'. Las bases de negocios usan menos caché porque hay muchas abiertas.
+SQLITE_PRAGMAS = {
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+        'cache_size': -20000,  # KiB (negativo) = 20 MB
+        'mmap_size': 128 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'business_*': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+        'cache_size': -4000,  # 4 MB
+        'mmap_size': 32 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+# Almacenamiento de las bases de datos de negocios:
+# 'sqlite' = un archivo por negocio; 'sqlite_sharded' = varios negocios por archivo (TENANT_SHARDS);
+# 'postgres' = un schema por negocio sobre una conexión compartida
+TENANT_STORAGE = os.getenv('TENANT_STORAGE', 'sqlite')
+# Número de shards del anillo de hash consistente (rebalance_shards --auto tras cambiarlo)
+TENANT_SHARDS = int(os.getenv('TENANT_SHARDS', 8))
+TENANT_POSTGRES_ALIAS = 'business_shared'
+if TENANT_STORAGE == 'postgres':
+    DATABASES[TENANT_POSTGRES_ALIAS] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('TENANT_POSTGRES_DB', 'amb_tenants'),
+        'USER': os.getenv('TENANT_POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('TENANT_POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('TENANT_POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('TENANT_POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('TENANT_POSTGRES_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
 # Router para dirigir consultas a la base de datos correcta
 DATABASE_ROUTERS = ['config.db_routers.BusinessRouter']
 
+# Provisión de bases de datos de negocios:
+# 'template' clona una plantilla ya migrada, 'migrate' ejecuta todas las migraciones por negocio
+TENANT_PROVISIONING_MODE = os.getenv('TENANT_PROVISIONING_MODE', 'template')
+TENANT_TEMPLATE_DIR = BASE_DIR / 'tenant_templates'
+
+# Cola de aprovisionamiento: con TENANT_PROVISIONING_ASYNC=False la base de datos se crea
+# dentro de la petición (útil en desarrollo sin ejecutar provisioning_worker)
+TENANT_PROVISIONING_ASYNC = os.getenv('TENANT_PROVISIONING_ASYNC', 'True') == 'True'
+TENANT_PROVISIONING_MAX_ATTEMPTS = int(os.getenv('TENANT_PROVISIONING_MAX_ATTEMPTS', 3))
+TENANT_PROVISIONING_STALE_SECONDS = int(os.getenv('TENANT_PROVISIONING_STALE_SECONDS', 600))
+TENANT_NOT_READY_RETRY_AFTER = 5
+
+# Copias de seguridad de negocios (backup_tenants): páginas por paso, pausa entre pasos
+# para no acaparar la base de datos y copias que se conservan por negocio
+TENANT_BACKUP_DIR = Path(os.getenv('TENANT_BACKUP_DIR', BASE_DIR / 'tenant_backups'))
+TENANT_BACKUP_PAGES = 256
+TENANT_BACKUP_PAUSE = 0.005
+TENANT_BACKUP_KEEP = int(os.getenv('TENANT_BACKUP_KEEP', 3))
+
+# Archivado de negocios fríos (archive_tenants); se restauran solos al volver a usarse
+TENANT_ARCHIVE_DIR = Path(os.getenv('TENANT_ARCHIVE_DIR', BASE_DIR / 'tenant_archive'))
+TENANT_ARCHIVE_IDLE_DAYS = int(os.getenv('TENANT_ARCHIVE_IDLE_DAYS', 180))
+
+# Eliminación diferida (purge_tenants): segundos antes de borrar la base de datos de un negocio
+# eliminado (los demás procesos deben haber visto el cambio del registro), intentos máximos y
+# antigüedad mínima de un archivo para considerarlo huérfano
+TENANT_PURGE_DELAY = int(os.getenv('TENANT_PURGE_DELAY', 60))
+TENANT_PURGE_MAX_ATTEMPTS = 5
+TENANT_ORPHAN_MIN_AGE = int(os.getenv('TENANT_ORPHAN_MIN_AGE', 3600))
+
+# Mantenimiento de bases de datos de negocios (maintain_tenants). Umbrales: ANALYZE / PRAGMA optimize
+# cuando el tamaño cambia más de analyze_growth y VACUUM incremental cuando las páginas libres
+# superan vacuum_freelist_ratio. window = 'HH:MM-HH:MM' (hora local) o None; interval > 0 activa
+# la pasada periódica dentro de los procesos del servidor, desde su primera petición (sin window
+# solo hace ANALYZE / optimize); con interval = 0 se programa maintain_tenants (cron)
+TENANT_MAINTENANCE = {
+    'analyze_min_pages': 64,
+    'analyze_growth': 0.25,
+    'vacuum_min_free_pages': 256,
+    'vacuum_freelist_ratio': 0.2,
+    'vacuum_step_pages': 512,
+    'pause': 0.05,
+    'busy_timeout': 200,
+    'window': os.getenv('TENANT_MAINTENANCE_WINDOW') or None,
+    'interval': int(os.getenv('TENANT_MAINTENANCE_INTERVAL', 0)),
+}
+
+# Escáner de esquema e integridad (scan_tenants): bases de datos revisadas a la vez
+TENANT_SCAN_WORKERS = int(os.getenv('TENANT_SCAN_WORKERS', 16))
+
+# Bloqueo de escrituras de un negocio mientras se archiva o se cambia de shard (TenantFence):
+# segundos de espera para las escrituras en curso y caducidad si el proceso muere
+TENANT_FENCE_GRACE = float(os.getenv('TENANT_FENCE_GRACE', 2))
+TENANT_FENCE_TIMEOUT = 3600
+
+# Cada proceso comprueba si otro cambió el registro de negocios cada N peticiones o segundos
+# (y siempre que un negocio no está en su caché); los cambios se conservan TENANT_REGISTRY_CHANGE_RETENTION s
+TENANT_REGISTRY_CHECK_REQUESTS = int(os.getenv('TENANT_REGISTRY_CHECK_REQUESTS', 100))
+TENANT_REGISTRY_CHECK_SECONDS = float(os.getenv('TENANT_REGISTRY_CHECK_SECONDS', 5))
+TENANT_REGISTRY_CHANGE_RETENTION = 86400
+
+# Consultas a varios negocios a la vez (TenantFanoutService): hilos y segundos máximos por negocio
+TENANT_FANOUT_WORKERS = int(os.getenv('TENANT_FANOUT_WORKERS', 16))
+TENANT_FANOUT_TIMEOUT = float(os.getenv('TENANT_FANOUT_TIMEOUT', 10))
+
+# Máximo de conexiones a bases de datos de negocios abiertas por hilo (se cierran por LRU)
+TENANT_MAX_OPEN_CONNECTIONS = int(os.getenv('TENANT_MAX_OPEN_CONNECTIONS', 64))
+
+# Caché compartida por todos los procesos del servidor (usar Redis/Memcached con varios servidores)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+    }
+}
+
+# Segundos que un usuario autenticado por JWT permanece en caché
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Segundos que se conserva la máscara de permisos de un rol (se invalida al modificar roles)
+ROLE_PERMISSION_CACHE_TIMEOUT = int(os.getenv('ROLE_PERMISSION_CACHE_TIMEOUT', 3600))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -148,7 +274,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Rest Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'app.accounts.api.authentication.BusinessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -171,6 +297,9 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": os.getenv('JWT_SIGNING_KEY', SECRET_KEY),
+    # Tokens con claims del negocio (business_id, business_role_id, perm_version)
+    "TOKEN_OBTAIN_SERIALIZER": "app.accounts.api.serializers.BusinessTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "app.accounts.api.serializers.BusinessTokenRefreshSerializer",
 }
 
 